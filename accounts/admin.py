@@ -1,5 +1,7 @@
 from django.contrib import admin
 
+from divanru_vetclinic.paginators import EstimatedCountPaginator
+
 from .models import Account
 
 
@@ -13,6 +15,8 @@ class AccountAdmin(admin.ModelAdmin):
     list_filter = ['is_active', 'is_staff', 'is_superuser']
     search_fields = ['username', 'last_name', 'first_name']
     readonly_fields = ['last_login', 'date_joined']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     fieldsets = (
         (None, {'fields': ('username', 'password')}),
         ('Персональная информация', {'fields': (
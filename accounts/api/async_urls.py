@@ -0,0 +1,9 @@
+from django.urls import path
+from accounts.api.async_views import AccountRegistrationAsyncAPIView, UserAsyncAPIView
+
+app_name = 'accounts-async'
+
+urlpatterns = [
+    path('users/<int:user_id>/', UserAsyncAPIView.as_view(), name='user-detail'),
+    path('register/', AccountRegistrationAsyncAPIView.as_view(), name='account-registration'),
+]
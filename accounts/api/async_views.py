@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.http import HttpRequest, JsonResponse
+from rest_framework import status
+
+from accounts.services import aregister_account
+from divanru_vetclinic.async_api import AsyncAPIView, json_response, parse_json
+from divanru_vetclinic.db_routers import read_from_replica
+
+from .serializers import AccountSerializer
+
+
+class UserAsyncAPIView(AsyncAPIView):
+    """ Async-версия UserAPIView. """
+
+    @read_from_replica
+    async def get(self, request: HttpRequest, user_id: int) -> JsonResponse:
+        """
+        GET-запрос для получения информации о пользователе по его ID (ответы как у UserAPIView).
+        """
+        try:
+            user = await get_user_model().objects.aget(id=user_id)
+        except get_user_model().DoesNotExist:
+            return json_response('Пользователь не найден', status=status.HTTP_404_NOT_FOUND)
+        return json_response(AccountSerializer(user).data, status=status.HTTP_200_OK)
+
+
+class AccountRegistrationAsyncAPIView(AsyncAPIView):
+    """ Async-версия AccountRegistrationAPIView. """
+
+    async def post(self, request: HttpRequest) -> JsonResponse:
+        """
+        POST-запрос на регистрацию клиента (параметры и ответы как у AccountRegistrationAPIView).
+        Проверка данных сериализатором не обращается к БД, поэтому выполняется прямо в цикле событий.
+        """
+        serializer = AccountSerializer(data=parse_json(request))
+        if serializer.is_valid():
+            account, created = await aregister_account(serializer.validated_data)
+            return json_response(AccountSerializer(account).data,
+                                 status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+        return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -1,6 +1,9 @@
+from typing import Optional
+
 from rest_framework import serializers
 
 from accounts.models import Account
+from accounts.services import MIN_SEARCH_QUERY_LENGTH
 
 
 class AccountSerializer(serializers.ModelSerializer):
@@ -11,5 +14,25 @@ class AccountSerializer(serializers.ModelSerializer):
             'first_name': {'required': True},
             'last_name': {'required': True},
             'phone': {'required': True},
-            'telegram_chat_id': {'required': False}
+            # Повторная регистрация с тем же ID чата обновляет аккаунт, а не считается ошибкой.
+            'telegram_chat_id': {'required': False, 'validators': []}
         }
+
+    def validate_telegram_chat_id(self, value: Optional[str]) -> Optional[str]:
+        """
+        Пустой ID телеграм чата хранится как NULL, чтобы не конфликтовать с уникальным индексом.
+        """
+        return value or None
+
+
+class AccountSearchQuerySerializer(serializers.Serializer):
+    """
+    Сериализатор query-параметров поиска клиентов.
+    """
+    DEFAULT_LIMIT: int = 20
+    MAX_LIMIT: int = 100
+
+    q = serializers.CharField(min_length=MIN_SEARCH_QUERY_LENGTH, max_length=100,
+                              help_text='Имя и/или фамилия либо начало номера телефона')
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=MAX_LIMIT, default=DEFAULT_LIMIT,
+                                     help_text='Максимальное количество результатов')
@@ -1,9 +1,12 @@
 from django.urls import path
-from accounts.api.views import AccountRegistrationAPIView, UserAPIView
+from accounts.api.views import (AccountRegistrationAPIView, AccountRegistrationBatchAPIView, AccountSearchAPIView,
+                                UserAPIView)
 
 app_name = 'accounts'
 
 urlpatterns = [
     path('users/<int:user_id>/', UserAPIView.as_view(), name='user-detail'),
     path('register/', AccountRegistrationAPIView.as_view(), name='account-registration'),
+    path('register/batch/', AccountRegistrationBatchAPIView.as_view(), name='account-registration-batch'),
+    path('search/', AccountSearchAPIView.as_view(), name='account-search'),
 ]
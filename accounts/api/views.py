@@ -1,10 +1,16 @@
+from typing import Any, Dict, List, Optional
+
 from django.contrib.auth import get_user_model
-from rest_framework import status
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from drf_yasg.utils import swagger_auto_schema
 
-from .serializers import AccountSerializer
+from accounts.services import MAX_REGISTRATION_BATCH_SIZE, register_account, search_accounts, upsert_accounts
+from divanru_vetclinic.db_routers import read_from_replica
+
+from .serializers import AccountSearchQuerySerializer, AccountSerializer
 
 ACCOUNTS = 'Аккаунты (клиенты)'
 
@@ -18,6 +24,7 @@ class UserAPIView(APIView):
         },
         operation_summary='Получение информации о пользователе по его ID',
     )
+    @read_from_replica
     def get(self, request, user_id):
         """
         GET-запрос для получения информации о пользователе по его ID.
@@ -51,6 +58,7 @@ class AccountRegistrationAPIView(APIView):
         request_body=AccountSerializer,
         responses={
             status.HTTP_201_CREATED: AccountSerializer(),
+            status.HTTP_200_OK: AccountSerializer(),
             status.HTTP_400_BAD_REQUEST: 'Неверные данные были предоставлены'
         },
         operation_summary='Регистрация клиента',
@@ -74,7 +82,9 @@ class AccountRegistrationAPIView(APIView):
             }
 
         Пример ответа:
-        Если пользователь успешно создан, возвращается статус 201 CREATED и данные нового пользователя:
+        Если пользователь успешно создан, возвращается статус 201 CREATED и данные нового пользователя.
+        Если пользователь с таким telegram_chat_id уже зарегистрирован, его имя, фамилия и телефон обновляются
+        и возвращается статус 200 OK и данные существующего пользователя:
         -   {
                 "id": 1,
                 "first_name": "Имя",
@@ -87,11 +97,111 @@ class AccountRegistrationAPIView(APIView):
         """
         serializer = AccountSerializer(data=request.data)
         if serializer.is_valid():
-            username = serializer.validated_data.get('username')
-            if not username:
-                User = get_user_model()
-                username = User.objects.make_random_password(length=10)
-                serializer.validated_data['username'] = username
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            account, created = register_account(serializer.validated_data)
+            return Response(AccountSerializer(account).data,
+                            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AccountRegistrationBatchAPIView(APIView):
+    # Пакетная регистрация обновляет сотни аккаунтов за запрос и отдает их телефоны: только для сотрудников.
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        tags=[ACCOUNTS],
+        request_body=AccountSerializer(many=True),
+        responses={
+            status.HTTP_200_OK: 'Результат регистрации по каждому клиенту',
+            status.HTTP_400_BAD_REQUEST: 'Ожидается непустой список клиентов',
+            status.HTTP_403_FORBIDDEN: 'Доступно только сотрудникам (is_staff)',
+        },
+        operation_summary='Пакетная регистрация клиентов',
+    )
+    def post(self, request):
+        """
+        POST-запрос на регистрацию нескольких клиентов одним запросом (не более 500). Доступен только
+        сотрудникам клиники (is_staff).
+
+        Параметры запроса - JSON-список клиентов той же структуры, что и для одиночной регистрации.
+        Клиент с уже зарегистрированным ID телеграм чата не создается повторно, а обновляется.
+
+        Пример ответа:
+        Возвращается статус 200 OK и результат по каждому клиенту в порядке запроса:
+        -   [
+                {"index": 0, "status": 201, "data": {"id": 1, "first_name": "Имя", ...}},
+                {"index": 1, "status": 200, "data": {"id": 2, "first_name": "Имя", ...}},
+                {"index": 2, "status": 400, "errors": {"phone": ["Обязательное поле."]}}
+            ]
+
+        Если передан не список или список пуст либо слишком длинный, возвращается статус 400 BAD REQUEST.
+        """
+        items = request.data
+        if not isinstance(items, list) or not 0 < len(items) <= MAX_REGISTRATION_BATCH_SIZE:
+            return Response(f'Ожидается список от 1 до {MAX_REGISTRATION_BATCH_SIZE} клиентов',
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        valid: List[int] = []
+        validated_data: List[dict] = []
+        serializer = AccountSerializer()
+        for index, item in enumerate(items):
+            try:
+                validated_data.append(serializer.run_validation(item))
+                valid.append(index)
+            except serializers.ValidationError as e:
+                results[index] = {'index': index, 'status': status.HTTP_400_BAD_REQUEST, 'errors': e.detail}
+
+        if validated_data:
+            for index, (account, created) in zip(valid, upsert_accounts(validated_data)):
+                results[index] = {
+                    'index': index,
+                    'status': status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+                    'data': serializer.to_representation(account),
+                }
+        return Response(results, status=status.HTTP_200_OK)
+
+
+class AccountSearchAPIView(APIView):
+    # Поиск отдает телефоны и ID телеграм чатов пачками, поэтому доступен только сотрудникам клиники.
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        tags=[ACCOUNTS],
+        query_serializer=AccountSearchQuerySerializer,
+        responses={
+            status.HTTP_200_OK: AccountSerializer(many=True),
+            status.HTTP_400_BAD_REQUEST: 'Неверные параметры поиска',
+            status.HTTP_403_FORBIDDEN: 'Доступно только сотрудникам (is_staff)',
+        },
+        operation_summary='Поиск клиентов по имени или телефону',
+    )
+    def get(self, request):
+        """
+        GET-запрос на поиск клиентов (выполняется одним запросом к БД по индексам). Доступен только сотрудникам
+        клиники (is_staff), анонимный запрос и запрос клиента получают 401/403.
+
+        Параметры запроса:
+        - q (str): Имя и/или фамилия (регистр и 'ё' не учитываются, допускаются опечатки в PostgreSQL)
+          либо начало номера телефона в любом формате: '+7 (900) 12', '790012'. Не короче 3 символов.
+        - limit (int): Максимальное количество результатов, по умолчанию 20, не более 100.
+
+        Пример ответа:
+        Возвращается статус 200 OK и список клиентов, самые подходящие - первыми:
+        -   [
+                {
+                    "id": 1,
+                    "first_name": "Имя",
+                    "last_name": "Фамилия",
+                    "phone": "+1111111111",
+                    "telegram_chat_id": "1111111111"
+                }
+            ]
+
+        Если параметры некорректны, возвращается статус 400 BAD REQUEST и соответствующее сообщение об ошибке.
+        """
+        query_serializer = AccountSearchQuerySerializer(data=request.query_params)
+        if not query_serializer.is_valid():
+            return Response(query_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params: dict = query_serializer.validated_data
+        accounts = search_accounts(params['q'], params['limit'])
+        return Response(AccountSerializer(accounts, many=True).data, status=status.HTTP_200_OK)
@@ -0,0 +1,65 @@
+"""
+Нормализованные поля аккаунта для поиска клиентов.
+
+Значение вычисляется из полей-источников в pre_save, который Django вызывает и при save(),
+и при bulk_create (в том числе INSERT ... ON CONFLICT), и в COPY-импорте, поэтому поля не нужно
+заполнять вручную. QuerySet.update() и bulk_update() pre_save не вызывают.
+"""
+import re
+from typing import Any, Sequence, Tuple
+
+from django.db import models
+
+NON_DIGITS_RE = re.compile(r'[^0-9]')
+
+
+def normalize_search_text(value: str) -> str:
+    """
+    Приводит текст к виду для поиска: нижний регистр, 'ё' заменена на 'е', пробелы схлопнуты.
+    """
+    return ' '.join(value.lower().replace('ё', 'е').split())
+
+
+def phone_digits(value: str) -> str:
+    """ Оставляет в номере телефона только цифры. """
+    return NON_DIGITS_RE.sub('', value)
+
+
+class NormalizedFieldMixin:
+    """
+    Поле, значение которого вычисляется из полей-источников той же модели и не редактируется вручную.
+    """
+
+    def __init__(self, *args: Any, source_fields: Sequence[str] = (), **kwargs: Any) -> None:
+        self.source_fields: Tuple[str, ...] = tuple(source_fields)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', '')
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self) -> tuple:
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source_fields'] = list(self.source_fields)
+        return name, path, args, kwargs
+
+    def normalize(self, value: str) -> str:
+        raise NotImplementedError
+
+    def pre_save(self, model_instance: models.Model, add: bool) -> str:
+        value: str = self.normalize(' '.join(getattr(model_instance, field) or '' for field in self.source_fields))
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+class SearchTextField(NormalizedFieldMixin, models.TextField):
+    """ Текст полей-источников через пробел в нормализованном виде (см. normalize_search_text). """
+
+    def normalize(self, value: str) -> str:
+        return normalize_search_text(value)
+
+
+class PhoneDigitsField(NormalizedFieldMixin, models.CharField):
+    """ Цифры номера телефона без '+', пробелов, скобок и дефисов. """
+
+    def normalize(self, value: str) -> str:
+        return phone_digits(value)
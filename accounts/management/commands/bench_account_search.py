@@ -0,0 +1,91 @@
+import random
+import time
+from typing import List, Tuple
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+
+from accounts.services import search_accounts
+from vetclinics.records import copy_insert
+
+BENCH_PREFIX: str = 'bench-search'
+FIRST_NAMES: List[str] = ['Иван', 'Петр', 'Мария', 'Анна', 'Олег', 'Елена', 'Сергей', 'Ольга', 'Артём', 'Наталья',
+                          'Дмитрий', 'Татьяна', 'Алексей', 'Юлия', 'Никита', 'Ксения']
+LAST_NAMES: List[str] = ['Иванов', 'Петров', 'Сидоров', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Соколов',
+                         'Михайлов', 'Новиков', 'Фёдоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев', 'Семёнов']
+
+
+class Command(BaseCommand):
+    help: str = 'Бенчмарк поиска клиентов по имени и телефону на большой таблице (по умолчанию 1M клиентов)'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--accounts', type=int, default=1_000_000, help='Количество клиентов')
+        parser.add_argument('--batch-size', type=int, default=10_000, help='Размер пачки вставки')
+        parser.add_argument('--repeat', type=int, default=5, help='Количество повторов замера')
+        parser.add_argument('--limit', type=int, default=20, help='Количество результатов поиска')
+        parser.add_argument('--keep', action='store_true', help='Не удалять синтетические данные после замера')
+
+    def handle(self, *args: List[str], **kwargs: dict) -> None:
+        """
+        Заполняет БД синтетическими клиентами, замеряет поиск по типичным запросам администратора
+        и удаляет синтетические данные.
+
+        :param args: Список аргументов командной строки (пока не используется).
+        :param kwargs: Словарь именованных аргументов командной строки.
+        """
+        try:
+            self.populate(kwargs['accounts'], kwargs['batch_size'])
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            phone: str = f'{kwargs["accounts"] // 2:07d}'
+            queries: List[Tuple[str, str]] = [
+                ('имя', 'Наталья'),
+                ('имя и фамилия', 'наталья лебедева'),
+                ('начало фамилии', 'Лебед'),
+                ('опечатка', 'Натаья Лебедева'),
+                ('телефон', f'+7 (900) {phone[:3]}-{phone[3:5]}-{phone[5:]}'),
+                ('начало телефона', f'+7 900 {phone[:4]}'),
+            ]
+            self.stdout.write(f'Клиентов: {get_user_model().objects.count()}, СУБД: {connection.vendor}')
+            self.stdout.write(f'{"запрос":<16} {"время, мс":>10} {"найдено":>8}')
+            for title, query in queries:
+                elapsed, found = self.measure(query, kwargs['limit'], kwargs['repeat'])
+                self.stdout.write(f'{title:<16} {elapsed:>10.2f} {found:>8}')
+        finally:
+            if not kwargs['keep']:
+                get_user_model().objects.filter(username__startswith=f'{BENCH_PREFIX}-').delete()
+
+    def populate(self, accounts: int, batch_size: int) -> None:
+        """ Создает клиентов со случайными именами (фамилии по роду имени) и последовательными телефонами. """
+        User = get_user_model()
+        use_copy: bool = connection.vendor == 'postgresql'
+        rng = random.Random(0)
+        started: float = time.perf_counter()
+        for offset in range(0, accounts, batch_size):
+            batch = []
+            for number in range(offset, min(offset + batch_size, accounts)):
+                first_name: str = rng.choice(FIRST_NAMES)
+                last_name: str = rng.choice(LAST_NAMES)
+                if first_name[-1] in 'ая':
+                    last_name += 'а'
+                batch.append(User(username=f'{BENCH_PREFIX}-{number}', first_name=first_name, last_name=last_name,
+                                  phone=f'+7900{number:07d}', is_active=True))
+            if use_copy:
+                copy_insert(batch)
+            else:
+                User.objects.bulk_create(batch)
+        self.stdout.write(f'Создано клиентов: {accounts} за {time.perf_counter() - started:.1f} с')
+
+    @staticmethod
+    def measure(query: str, limit: int, repeat: int) -> Tuple[float, int]:
+        """
+        Возвращает лучшее время поиска в миллисекундах и количество найденных клиентов.
+        """
+        best: float = float('inf')
+        found: int = 0
+        for _ in range(repeat):
+            started: float = time.perf_counter()
+            found = len(search_accounts(query, limit))
+            best = min(best, time.perf_counter() - started)
+        return best * 1000, found
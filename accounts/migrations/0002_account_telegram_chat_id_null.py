@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+def clear_duplicate_telegram_chat_ids(apps, schema_editor):
+    """
+    Заменяет пустые ID телеграм чата на NULL и снимает ID чата с повторных аккаунтов, оставляя его
+    у последнего зарегистрированного (им пользуется бот), иначе уникальный индекс не получится создать.
+    Сами аккаунты не удаляются, т.к. на них могут ссылаться записи на прием.
+    """
+    Account = apps.get_model('accounts', 'Account')
+    Account.objects.filter(telegram_chat_id='').update(telegram_chat_id=None)
+    duplicates = (
+        Account.objects.filter(telegram_chat_id__isnull=False)
+        .values('telegram_chat_id')
+        .annotate(last_id=models.Max('id'), total=models.Count('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        Account.objects.filter(telegram_chat_id=duplicate['telegram_chat_id']).exclude(
+            id=duplicate['last_id']
+        ).update(telegram_chat_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='account',
+            name='telegram_chat_id',
+            field=models.CharField(blank=True, max_length=120, null=True, verbose_name='ID телеграм чата'),
+        ),
+        migrations.RunPython(clear_duplicate_telegram_chat_ids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_account_telegram_chat_id_null'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='account',
+            name='telegram_chat_id',
+            field=models.CharField(blank=True, max_length=120, null=True, unique=True, verbose_name='ID телеграм чата'),
+        ),
+    ]
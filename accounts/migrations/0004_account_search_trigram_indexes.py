@@ -0,0 +1,44 @@
+# Generated by Django 4.2 on 2026-10-18 17:20
+
+from django.db import migrations
+
+# Поиск админ-панели (icontains) в PostgreSQL выполняется как UPPER(col::text) LIKE UPPER('%...%'),
+# поэтому индексы строятся по тому же выражению.
+TRIGRAM_INDEXED_FIELDS = ['username', 'first_name', 'last_name', 'phone']
+
+
+def index_name(field):
+    return f'account_{field}_trgm_idx'
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    Создает триграммные GIN-индексы для поиска по подстроке. Только PostgreSQL: в SQLite поиск
+    по подстроке выполняется обычным LIKE без индекса.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for field in TRIGRAM_INDEXED_FIELDS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name(field)} ON accounts_account '
+            f'USING gin (UPPER({field}::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for field in TRIGRAM_INDEXED_FIELDS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name(field)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_account_telegram_chat_id_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
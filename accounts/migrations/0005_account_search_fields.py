@@ -0,0 +1,47 @@
+# Generated by Django 4.2 on 2026-10-18 18:05
+
+import accounts.fields
+from django.db import migrations
+
+BACKFILL_BATCH_SIZE = 2000
+
+
+def fill_search_fields(apps, schema_editor):
+    """
+    Заполняет поля для поиска у существующих аккаунтов. Значения вычисляются тем же pre_save,
+    что и при сохранении, а записываются пачками через bulk_update.
+    """
+    Account = apps.get_model('accounts', 'Account')
+    fields = [Account._meta.get_field('search_text'), Account._meta.get_field('phone_digits')]
+    accounts = Account.objects.only('id', 'first_name', 'last_name', 'phone').order_by('id')
+    batch = []
+    for account in accounts.iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        for field in fields:
+            field.pre_save(account, False)
+        batch.append(account)
+        if len(batch) == BACKFILL_BATCH_SIZE:
+            Account.objects.bulk_update(batch, ['search_text', 'phone_digits'])
+            batch = []
+    if batch:
+        Account.objects.bulk_update(batch, ['search_text', 'phone_digits'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_account_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='phone_digits',
+            field=accounts.fields.PhoneDigitsField(blank=True, default='', editable=False, max_length=15, source_fields=['phone'], verbose_name='Цифры телефона'),
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='search_text',
+            field=accounts.fields.SearchTextField(blank=True, default='', editable=False, source_fields=['first_name', 'last_name'], verbose_name='Имя для поиска'),
+        ),
+        migrations.RunPython(fill_search_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-18 18:05
+
+from django.db import migrations, models
+
+SEARCH_TEXT_INDEX = 'account_search_text_trgm_idx'
+
+
+def create_search_text_index(apps, schema_editor):
+    """
+    Создает триграммный GIN-индекс по нормализованному имени для поиска клиентов (оператор %>
+    и LIKE '%...%'). Только PostgreSQL: в SQLite поиск выполняется обычным LIKE без индекса.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {SEARCH_TEXT_INDEX} ON accounts_account USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def drop_search_text_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {SEARCH_TEXT_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_account_search_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(fields=['phone_digits'], name='account_phone_digits_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(create_search_text_index, drop_search_text_index),
+    ]
@@ -1,20 +1,44 @@
+from typing import Iterable, Optional, Set
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser, Group, Permission
 
+from .fields import NormalizedFieldMixin, PhoneDigitsField, SearchTextField
+
 
 class Account(AbstractUser):
     groups = models.ManyToManyField(Group, verbose_name='Группы', blank=True, related_name='user_accounts')
     user_permissions = models.ManyToManyField(Permission, verbose_name='Разрешения пользователя', blank=True,
                                               related_name='user_accounts')
     phone = models.CharField(max_length=15, null=True, blank=True, verbose_name='Телефон')
-    telegram_chat_id = models.CharField(max_length=120, blank=True, verbose_name='ID телеграм чата')
+    telegram_chat_id = models.CharField(max_length=120, null=True, blank=True, unique=True,
+                                        verbose_name='ID телеграм чата')
+    search_text = SearchTextField(source_fields=['first_name', 'last_name'], verbose_name='Имя для поиска')
+    phone_digits = PhoneDigitsField(max_length=15, source_fields=['phone'], verbose_name='Цифры телефона')
 
     class Meta:
         verbose_name = 'Аккаунт'
         verbose_name_plural = 'Аккаунты'
+        indexes = [
+            # varchar_pattern_ops позволяет PostgreSQL использовать индекс для LIKE 'префикс%'
+            # при любой локали БД; другие СУБД класс операторов игнорируют.
+            models.Index(fields=['phone_digits'], name='account_phone_digits_idx', opclasses=['varchar_pattern_ops']),
+        ]
 
     def __str__(self):
         return 'Пользователь %s %s' % (self.first_name, self.last_name)
 
     def get_full_name(self):
         return f'{self.first_name.capitalize()} {self.last_name.capitalize()}'
+
+    def save(self, *args, update_fields: Optional[Iterable[str]] = None, **kwargs) -> None:
+        """
+        Переопределение метода: при частичном сохранении вместе с измененными полями-источниками
+        сохраняются и вычисляемые из них поля для поиска.
+        """
+        if update_fields is not None:
+            fields: Set[str] = set(update_fields)
+            fields |= {field.name for field in self._meta.concrete_fields
+                       if isinstance(field, NormalizedFieldMixin) and fields.intersection(field.source_fields)}
+            update_fields = fields
+        super().save(*args, update_fields=update_fields, **kwargs)
@@ -0,0 +1,147 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Q, QuerySet, Value, When
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from .fields import normalize_search_text, phone_digits
+from .models import Account
+
+MAX_REGISTRATION_BATCH_SIZE: int = 500
+# Поля для поиска вычисляются в pre_save и при конфликте должны обновляться вместе с источниками.
+UPSERT_UPDATE_FIELDS: List[str] = ['first_name', 'last_name', 'phone', 'search_text', 'phone_digits']
+
+MIN_SEARCH_QUERY_LENGTH: int = 3
+PHONE_QUERY_RE = re.compile(r'^\+?[0-9\s()\-]+$')
+SEARCH_RESULT_FIELDS: List[str] = ['id', 'first_name', 'last_name', 'phone', 'telegram_chat_id']
+# Регистрация открыта анонимно, поэтому профили сотрудников по ID телеграм чата не перезаписываются.
+PROTECTED_ACCOUNTS = Q(is_staff=True) | Q(is_superuser=True)
+
+
+def upsert_accounts(items: List[Dict[str, Any]]) -> List[Tuple[Account, bool]]:
+    """
+    Регистрирует клиентов идемпотентно: аккаунт с тем же ID телеграм чата не создается повторно,
+    а обновляет имя, фамилию и телефон. Вставка выполняется одним INSERT ... ON CONFLICT на пачку.
+    Аккаунты сотрудников (PROTECTED_ACCOUNTS) с тем же ID чата не обновляются и возвращаются как есть.
+
+    Django 4.2 не возвращает первичные ключи из bulk_create с update_conflicts, поэтому аккаунты
+    с ID чата дочитываются одним SELECT. Созданный аккаунт отличается от обновленного по дате регистрации:
+    при конфликте она не обновляется.
+
+    Args:
+        items (List[Dict[str, Any]]): Провалидированные AccountSerializer данные клиентов.
+
+    Returns:
+        List[Tuple[Account, bool]]: Для каждого клиента - аккаунт и признак того, что он создан.
+    """
+    now = timezone.now()
+    accounts: List[Account] = [
+        Account(username=get_random_string(10), password=make_password(None), date_joined=now, **item)
+        for item in items
+    ]
+    # Повтор ID чата внутри одного INSERT ... ON CONFLICT запрещен, побеждают последние данные.
+    by_chat_id: Dict[str, Account] = {account.telegram_chat_id: account for account in accounts
+                                      if account.telegram_chat_id}
+    without_chat_id: List[Account] = [account for account in accounts if not account.telegram_chat_id]
+
+    with transaction.atomic():
+        if without_chat_id:
+            Account.objects.bulk_create(without_chat_id)
+        saved: Dict[str, Account] = {}
+        if by_chat_id:
+            saved = {account.telegram_chat_id: account for account in
+                     Account.objects.filter(PROTECTED_ACCOUNTS, telegram_chat_id__in=list(by_chat_id))}
+            upserts: List[Account] = [account for chat_id, account in by_chat_id.items() if chat_id not in saved]
+            if upserts:
+                Account.objects.bulk_create(upserts, update_conflicts=True, unique_fields=['telegram_chat_id'],
+                                            update_fields=UPSERT_UPDATE_FIELDS)
+                saved.update((account.telegram_chat_id, account) for account in Account.objects.filter(
+                    telegram_chat_id__in=[account.telegram_chat_id for account in upserts]))
+
+    results: List[Tuple[Account, bool]] = []
+    for account in accounts:
+        if account.telegram_chat_id:
+            account = saved[account.telegram_chat_id]
+            results.append((account, account.date_joined == now))
+        else:
+            results.append((account, True))
+    return results
+
+
+def register_account(data: Dict[str, Any]) -> Tuple[Account, bool]:
+    """
+    Регистрирует одного клиента идемпотентно по ID телеграм чата (см. upsert_accounts).
+
+    Returns:
+        Tuple[Account, bool]: Аккаунт и признак того, что он создан.
+    """
+    return upsert_accounts([data])[0]
+
+
+async def aregister_account(data: Dict[str, Any]) -> Tuple[Account, bool]:
+    """
+    Async-версия register_account. Один клиент регистрируется без транзакции: аккаунт без ID чата -
+    одним INSERT, с ID чата - проверкой аккаунта сотрудника, одним INSERT ... ON CONFLICT и чтением аккаунта.
+
+    Returns:
+        Tuple[Account, bool]: Аккаунт и признак того, что он создан.
+    """
+    now = timezone.now()
+    account = Account(username=get_random_string(10), password=make_password(None), date_joined=now, **data)
+    if not account.telegram_chat_id:
+        await Account.objects.abulk_create([account])
+        return account, True
+    protected: Optional[Account] = await Account.objects.filter(
+        PROTECTED_ACCOUNTS, telegram_chat_id=account.telegram_chat_id).afirst()
+    if protected is not None:
+        return protected, False
+    await Account.objects.abulk_create([account], update_conflicts=True, unique_fields=['telegram_chat_id'],
+                                       update_fields=UPSERT_UPDATE_FIELDS)
+    account = await Account.objects.aget(telegram_chat_id=account.telegram_chat_id)
+    return account, account.date_joined == now
+
+
+def search_accounts(query: str, limit: int) -> List[Account]:
+    """
+    Ищет клиентов по имени и фамилии или по началу номера телефона.
+
+    Запрос из цифр (допускаются '+', пробелы, скобки и дефисы) ищется как префикс цифр телефона
+    по btree-индексу account_phone_digits_idx, результаты упорядочены по номеру.
+
+    Остальные запросы ищутся по нормализованному имени (см. normalize_search_text): подстрока, а в PostgreSQL
+    еще и нечеткое совпадение слова (оператор pg_trgm %>, опечатки), оба условия обслуживает триграммный
+    GIN-индекс account_search_text_trgm_idx. Выше ранжируются совпадения с начала имени, затем с начала
+    фамилии, затем (в PostgreSQL) по триграммной похожести.
+
+    Args:
+        query (str): Поисковый запрос не короче MIN_SEARCH_QUERY_LENGTH символов.
+        limit (int): Максимальное количество результатов.
+
+    Returns:
+        List[Account]: Найденные клиенты (загружены только поля SEARCH_RESULT_FIELDS).
+    """
+    accounts: QuerySet = Account.objects.only(*SEARCH_RESULT_FIELDS)
+    digits: str = phone_digits(query)
+    if PHONE_QUERY_RE.match(query) and len(digits) >= MIN_SEARCH_QUERY_LENGTH:
+        return list(accounts.filter(phone_digits__startswith=digits).order_by('phone_digits', 'id')[:limit])
+
+    text: str = normalize_search_text(query)
+    condition = Q(search_text__contains=text)
+    ordering: List[str] = ['-rank', 'search_text', 'id']
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.lookups import TrigramWordSimilar
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        condition |= TrigramWordSimilar(F('search_text'), text)
+        accounts = accounts.annotate(similarity=TrigramWordSimilarity(Value(text), 'search_text'))
+        ordering.insert(1, '-similarity')
+    accounts = accounts.filter(condition).annotate(rank=Case(
+        When(search_text__startswith=text, then=Value(2)),
+        When(search_text__contains=f' {text}', then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    ))
+    return list(accounts.order_by(*ordering)[:limit])
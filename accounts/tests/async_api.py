@@ -0,0 +1,66 @@
+from typing import Any, Dict
+
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+
+from accounts.factories import AccountFactory
+from accounts.models import Account
+
+
+class AccountsAsyncAPITests(TestCase):
+    """
+    Тесты async-версий API аккаунтов: ответы совпадают с sync-версиями.
+    """
+
+    def setUp(self) -> None:
+        """
+        Установка тестового аккаунта.
+        """
+        self.account = AccountFactory()
+
+    async def test_user_detail(self) -> None:
+        """
+        Проверяет получение клиента по ID и ответ 404 для несуществующего ID.
+        """
+        url: str = reverse('accounts-async:user-detail', args=[self.account.id])
+        sync_response = await self.async_client.get(reverse('accounts:user-detail', args=[self.account.id]))
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), sync_response.json())
+
+        response = await self.async_client.get(reverse('accounts-async:user-detail', args=[0]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), 'Пользователь не найден')
+
+    async def test_registration(self) -> None:
+        """
+        Проверяет регистрацию, повторную регистрацию с тем же ID телеграм чата и некорректные данные.
+        """
+        url: str = reverse('accounts-async:account-registration')
+        data: Dict[str, Any] = {'first_name': 'Иван', 'last_name': 'Иванов', 'phone': '+79000000001',
+                                'telegram_chat_id': '1111111111'}
+        first = await self.async_client.post(url, data, content_type='application/json')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.json()['first_name'], 'Иван')
+
+        second = await self.async_client.post(url, {**data, 'first_name': 'Петр'}, content_type='application/json')
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual((second.json()['id'], second.json()['first_name']), (first.json()['id'], 'Петр'))
+        self.assertEqual(await Account.objects.filter(telegram_chat_id='1111111111').acount(), 1)
+
+        without_chat = await self.async_client.post(url, {**data, 'telegram_chat_id': None},
+                                                    content_type='application/json')
+        self.assertEqual(without_chat.status_code, status.HTTP_201_CREATED)
+
+        staff = await Account.objects.acreate(username='staff', is_staff=True, first_name='Сотрудник',
+                                              telegram_chat_id='2222222222')
+        response = await self.async_client.post(url, {**data, 'telegram_chat_id': '2222222222'},
+                                                content_type='application/json')
+        self.assertEqual((response.json()['id'], response.json()['first_name']), (staff.id, 'Сотрудник'))
+
+        response = await self.async_client.post(url, {'phone': 'invalid_phone_number'},
+                                                content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('phone', response.json())
@@ -0,0 +1,42 @@
+from typing import Any, Dict
+
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.factories import AccountFactory
+from divanru_vetclinic.testing import QueryBudgetMixin, dataset_sizes
+
+DATASET_SIZES = (10, 300, 1000)
+
+
+class AccountsQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """
+    Бюджеты SQL-запросов и времени API аккаунтов на разных объемах клиентов:
+    количество запросов не должно зависеть от объема данных, а время - расти быстрее него.
+    """
+
+    @dataset_sizes(*DATASET_SIZES)
+    def test_user_detail(self, size: int) -> None:
+        """
+        Клиент по ID - один запрос.
+        """
+        accounts = AccountFactory.create_batch(size)
+        with self.assertQueryBudget(queries=1, seconds=0.5):
+            response = self.client.get(reverse('accounts:user-detail', args=[accounts[-1].id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @dataset_sizes(*DATASET_SIZES)
+    def test_registration(self, size: int) -> None:
+        """
+        Регистрация нового клиента и повторная регистрация с тем же ID телеграм чата - проверка аккаунта
+        сотрудника, одна вставка с обновлением при конфликте и выборка клиента в точке сохранения.
+        """
+        AccountFactory.create_batch(size)
+        data: Dict[str, Any] = {'first_name': 'Иван', 'last_name': 'Иванов', 'phone': '+79000000001',
+                                'telegram_chat_id': '1111111111'}
+        for expected_status in (status.HTTP_201_CREATED, status.HTTP_200_OK):
+            with self.assertQueryBudget(queries=5, seconds=0.5):
+                response = self.client.post(reverse('accounts:account-registration'), data, format='json')
+            self.assertEqual(response.status_code, expected_status)
@@ -6,6 +6,7 @@ from rest_framework.test import APIClient
 from rest_framework.response import Response
 
 from accounts.factories import AccountFactory
+from accounts.models import Account
 from accounts.api.serializers import AccountSerializer
 
 
@@ -49,3 +50,36 @@ class AccountRegistrationAPITest(TestCase):
 
         response: Response = self.client.post(self.api_url, data=invalid_account_data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_account_registration_is_idempotent(self) -> None:
+        """
+        Тест повторной регистрации с тем же ID телеграм чата: аккаунт обновляется, а не дублируется.
+        """
+        account_data: dict = {'first_name': 'Иван', 'last_name': 'Иванов', 'phone': '+79000000001',
+                              'telegram_chat_id': '1111111111'}
+        first: Response = self.client.post(self.api_url, data=account_data)
+        second: Response = self.client.post(self.api_url, data={**account_data, 'phone': '+79000000002'})
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data['id'], first.data['id'])
+        self.assertEqual(second.data['phone'], '+79000000002')
+        self.assertEqual(Account.objects.filter(telegram_chat_id='1111111111').count(), 1)
+
+        without_chat_id: Response = self.client.post(self.api_url, data={**account_data, 'telegram_chat_id': ''})
+        self.assertEqual(without_chat_id.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(without_chat_id.data['telegram_chat_id'])
+
+    def test_account_registration_keeps_staff_profile(self) -> None:
+        """
+        Тест регистрации с ID телеграм чата сотрудника: профиль сотрудника не перезаписывается.
+        """
+        staff: Account = AccountFactory(is_staff=True, telegram_chat_id='2222222222')
+        profile: tuple = (staff.first_name, staff.last_name, staff.phone)
+        response: Response = self.client.post(self.api_url, data={
+            'first_name': 'Чужое', 'last_name': 'Имя', 'phone': '+79000000000', 'telegram_chat_id': '2222222222'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], staff.id)
+        staff.refresh_from_db()
+        self.assertEqual((staff.first_name, staff.last_name, staff.phone), profile)
@@ -0,0 +1,77 @@
+from typing import Any, Dict, List
+
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.response import Response
+
+from accounts.factories import AccountFactory
+from accounts.models import Account
+
+
+class AccountRegistrationBatchAPITest(TestCase):
+    def setUp(self) -> None:
+        """
+        Настройка тестового клиента сотрудника клиники и url-API для пакетной регистрации аккаунтов.
+        """
+        self.client: APIClient = APIClient()
+        self.client.force_authenticate(AccountFactory(is_staff=True))
+        self.api_url: str = reverse('accounts:account-registration-batch')
+        self.existing = AccountFactory(telegram_chat_id='100')
+
+    def test_batch_registration(self) -> None:
+        """
+        Тест пакетной регистрации: новые аккаунты создаются, существующие по ID чата обновляются.
+        """
+        items: List[Any] = [
+            {'first_name': f'Имя {number}', 'last_name': 'Фамилия', 'phone': f'+7900000000{number}',
+             'telegram_chat_id': str(200 + number)}
+            for number in range(5)
+        ]
+        items += [
+            {'first_name': 'Обновленное', 'last_name': 'Имя', 'phone': '+79000000100', 'telegram_chat_id': '100'},
+            {'first_name': 'Без', 'last_name': 'Чата', 'phone': '+79000000101'},
+            {'first_name': 'Без', 'last_name': 'Телефона'},
+        ]
+        # Точка сохранения, INSERT без ID чата, SELECT сотрудников, INSERT ... ON CONFLICT, SELECT,
+        # освобождение точки сохранения.
+        with self.assertNumQueries(6):
+            response: Response = self.client.post(self.api_url, data=items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['status'] for result in response.data], [201] * 5 + [200, 201, 400])
+        self.assertEqual(response.data[5]['data']['id'], self.existing.id)
+        self.assertIn('phone', response.data[7]['errors'])
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.first_name, 'Обновленное')
+        self.assertEqual(Account.objects.filter(is_staff=False).count(), 7)
+
+        response = self.client.post(self.api_url, data=items[:5], format='json')
+        self.assertEqual([result['status'] for result in response.data], [200] * 5)
+        self.assertEqual(Account.objects.filter(is_staff=False).count(), 7)
+
+    def test_batch_registration_invalid_body(self) -> None:
+        """
+        Тест пакетной регистрации с телом запроса, не являющимся непустым списком.
+        """
+        data: Dict[str, Any] = {'first_name': 'Имя', 'last_name': 'Фамилия', 'phone': '+79000000001'}
+        for body in ([], data):
+            response: Response = self.client.post(self.api_url, data=body, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_registration_requires_staff(self) -> None:
+        """
+        Тест, что пакетная регистрация недоступна анонимным пользователям и клиентам, не являющимся сотрудниками.
+        """
+        items: List[Any] = [{'first_name': 'Чужое', 'last_name': 'Имя', 'phone': '+79000000000',
+                             'telegram_chat_id': '100'}]
+        self.client.force_authenticate(None)
+        response: Response = self.client.post(self.api_url, data=items, format='json')
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        self.client.force_authenticate(self.existing)
+        response = self.client.post(self.api_url, data=items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.existing.refresh_from_db()
+        self.assertNotEqual(self.existing.first_name, 'Чужое')
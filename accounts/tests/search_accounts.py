@@ -0,0 +1,85 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.factories import AccountFactory
+from accounts.models import Account
+from accounts.services import upsert_accounts
+
+
+class AccountSearchAPITest(TestCase):
+    def setUp(self) -> None:
+        """
+        Настройка тестового клиента сотрудника клиники, url-API поиска и клиентов с похожими именами.
+        """
+        self.client: APIClient = APIClient()
+        self.client.force_authenticate(AccountFactory(is_staff=True))
+        self.api_url: str = reverse('accounts:account-search')
+        self.ivan = AccountFactory(first_name='Иван', last_name='Петров', phone='+7 (900) 123-45-67')
+        self.pyotr = AccountFactory(first_name='Пётр', last_name='Иванов', phone='+79001230000')
+        self.maria = AccountFactory(first_name='Мария', last_name='Сидорова', phone='89161234567')
+
+    def search(self, query: str) -> list:
+        with self.assertNumQueries(1):
+            response = self.client.get(self.api_url, {'q': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [account['id'] for account in response.data]
+
+    def test_search_fields(self) -> None:
+        """
+        Тест заполнения полей для поиска при сохранении, частичном сохранении и upsert.
+        """
+        self.assertEqual(self.pyotr.search_text, 'петр иванов')
+        self.assertEqual(self.ivan.phone_digits, '79001234567')
+
+        self.maria.last_name = 'Кузнецова'
+        self.maria.save(update_fields=['last_name'])
+        self.assertEqual(Account.objects.get(id=self.maria.id).search_text, 'мария кузнецова')
+
+        upsert_accounts([{'first_name': 'Анна', 'last_name': 'Смирнова', 'phone': '+7 916 000', 'telegram_chat_id': '1'},
+                         {'first_name': 'Анна', 'last_name': 'Смирнова-Орлова', 'phone': '+7 916 001',
+                          'telegram_chat_id': '1'}])
+        account = Account.objects.get(telegram_chat_id='1')
+        self.assertEqual((account.search_text, account.phone_digits), ('анна смирнова-орлова', '7916001'))
+
+    def test_search_by_name(self) -> None:
+        """
+        Тест поиска по имени и фамилии: совпадения с начала имени выше совпадений с начала фамилии.
+        """
+        self.assertEqual(self.search('ИВАН'), [self.ivan.id, self.pyotr.id])
+        self.assertEqual(self.search('петр'), [self.pyotr.id, self.ivan.id])
+        self.assertEqual(self.search('  мария   сидор'), [self.maria.id])
+        self.assertEqual(self.search('Кузнецов'), [])
+
+    def test_search_by_phone(self) -> None:
+        """
+        Тест поиска по началу номера телефона в любом формате.
+        """
+        self.assertEqual(self.search('+7 (900) 123'), [self.pyotr.id, self.ivan.id])
+        self.assertEqual(self.search('7900123456'), [self.ivan.id])
+        self.assertEqual(self.search('8916'), [self.maria.id])
+
+    def test_search_invalid_params(self) -> None:
+        """
+        Тест поиска с некорректными параметрами.
+        """
+        for params in ({}, {'q': 'ив'}, {'q': 'иван', 'limit': 0}, {'q': 'иван', 'limit': 101}):
+            response = self.client.get(self.api_url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.api_url, {'q': 'иван', 'limit': 1})
+        self.assertEqual([account['id'] for account in response.data], [self.ivan.id])
+
+    def test_search_requires_staff(self) -> None:
+        """
+        Тест, что поиск недоступен анонимным пользователям и клиентам, не являющимся сотрудниками.
+        """
+        self.client.force_authenticate(None)
+        response = self.client.get(self.api_url, {'q': 'иван'})
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        self.assertNotIn('+7 (900) 123-45-67', response.content.decode())
+
+        self.client.force_authenticate(self.ivan)
+        response = self.client.get(self.api_url, {'q': 'иван'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,70 @@
+"""
+Основа async-представлений JSON API.
+
+DRF 3.14 не поддерживает async-обработчики APIView: под ASGI каждый запрос к DRF-представлению
+выполняется в потоке через sync_to_async. Async-представления строятся на django.views.View
+с async-обработчиками и отдают тот же JSON, что и DRF-версии. Сериализаторы DRF используются только
+для проверки данных и представления объектов, без обращений к БД; запросы к БД и кешу выполняются
+async-методами ORM и кеша в обработчиках.
+
+Тело запроса принимается только в JSON (DRF-версии принимают еще и формы).
+"""
+import json
+from typing import Any
+
+from django.http import HttpRequest, JsonResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+
+class ParseError(Exception):
+    """ Тело запроса не является корректным JSON. """
+
+
+def json_response(data: Any, status: int = 200, **kwargs: Any) -> JsonResponse:
+    """
+    Возвращает JSON-ответ в том же виде, что и JSONRenderer DRF (без экранирования кириллицы).
+
+    Args:
+        data (Any): Данные ответа (в том числе строка или список).
+        status (int): HTTP-статус.
+
+    Returns:
+        JsonResponse: Ответ.
+    """
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={'ensure_ascii': False}, **kwargs)
+
+
+def parse_json(request: HttpRequest) -> Any:
+    """
+    Разбирает JSON-тело запроса.
+
+    Raises:
+        ParseError: Если тело не является корректным JSON в UTF-8.
+    """
+    try:
+        return json.loads(request.body or b'null')
+    except (UnicodeDecodeError, ValueError) as e:
+        raise ParseError(f'JSON parse error - {e}')
+
+
+class AsyncAPIView(View):
+    """
+    Async-представление JSON API: обработчики методов объявляются как async def.
+    Как и APIView DRF, представление не проверяет CSRF-токен и отвечает 400 на некорректный JSON.
+    """
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except ParseError as e:
+            return json_response({'detail': str(e)}, status=400)
+
+    async def http_method_not_allowed(self, request: HttpRequest, *args: Any, **kwargs: Any) -> JsonResponse:
+        return json_response({'detail': f'Метод "{request.method}" не разрешен.'}, status=405,
+                             headers={'Allow': ', '.join(self._allowed_methods())})
@@ -0,0 +1,94 @@
+"""
+Маршрутизация чтения на реплику БД.
+
+Запись всегда идет в основную БД (default), а чтение - туда же, кроме обработчиков, помеченных
+декоратором read_from_replica: на время обработчика (и в async-коде, и в потоках sync_to_async - через
+contextvars) чтение уходит в БД REPLICA_DATABASE_ALIAS, если она настроена (DB_REPLICA_HOST в .env).
+
+Реплика отстает от основной БД, поэтому данные, которые кешируются до следующего их изменения
+(справочник видов животных, расписание), читаются из основной БД (use_primary), а прочитанное с реплики
+кешируется не дольше REPLICA_CACHE_TIMEOUT (replica_cache_timeout).
+"""
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DATABASE_ALIAS: str = 'replica'
+
+_read_alias: ContextVar[Optional[str]] = ContextVar('read_alias', default=None)
+
+
+@contextmanager
+def read_from(alias: Optional[str]) -> Iterator[None]:
+    """
+    Направляет чтение внутри блока в БД alias (None - в основную).
+    """
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def use_replica():
+    """ Направляет чтение внутри блока на реплику, если она настроена. """
+    return read_from(REPLICA_DATABASE_ALIAS if REPLICA_DATABASE_ALIAS in connections.settings else None)
+
+
+def use_primary():
+    """ Направляет чтение внутри блока в основную БД. """
+    return read_from(None)
+
+
+def reading_from_replica() -> bool:
+    """ Проверяет, что чтение сейчас направлено на реплику. """
+    return _read_alias.get() is not None
+
+
+def replica_cache_timeout(timeout: Optional[int]) -> Optional[int]:
+    """
+    Время жизни в кеше данных, прочитанных сейчас: при чтении с реплики - не дольше REPLICA_CACHE_TIMEOUT,
+    чтобы отставшие данные не пережили в кеше ее догоняющую репликацию.
+    """
+    if not reading_from_replica():
+        return timeout
+    return settings.REPLICA_CACHE_TIMEOUT if timeout is None else min(timeout, settings.REPLICA_CACHE_TIMEOUT)
+
+
+def read_from_replica(func: Callable) -> Callable:
+    """
+    Декоратор обработчика (sync или async), читающего данные с реплики.
+    """
+    if iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with use_replica():
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with use_replica():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Роутер БД: запись - в основную БД, чтение - в БД, выбранную read_from (по умолчанию основную).
+    """
+
+    def db_for_read(self, model, **hints: Any) -> Optional[str]:
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints: Any) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints: Any) -> bool:
+        # Реплика содержит те же данные, что и основная БД.
+        return True
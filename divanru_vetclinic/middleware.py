@@ -0,0 +1,416 @@
+"""
+Метрики запросов: количество и время SQL-запросов, время отрисовки ответа, размер ответа и общее время.
+
+RequestMetricsMiddleware включается настройкой REQUEST_METRICS. Выключенный, он удаляется из цепочки
+middleware при ее сборке (MiddlewareNotUsed) и не стоит ничего. Включенный:
+- отдает метрики запроса в заголовке Server-Timing (db - SQL, render - отрисовка ответа DRF или шаблона,
+  включая SQL при отрисовке, total - весь запрос), если включена настройка REQUEST_METRICS_SERVER_TIMING;
+- копит гистограммы по маршрутам URL, которые отдает /metrics в текстовом формате Prometheus
+  сотрудникам (is_staff) и адресам из METRICS_ALLOWED_IPS.
+
+Гистограммы и счетчики копятся в памяти процесса. При нескольких процессах (воркеры gunicorn) фоновый поток
+каждого процесса раз в METRICS_FLUSH_INTERVAL секунд записывает их снимок в файл каталога METRICS_DIR, а /metrics
+отдает сумму снимков всех процессов: иначе каждый опрос Prometheus попадал бы в случайный воркер, и ряды
+скакали бы между счетчиками разных воркеров. Снимок завершившегося воркера переносится в общий архив
+(mark_process_dead, вызывается мастером gunicorn), поэтому суммы не уменьшаются при перезапуске воркеров.
+
+SQL-запросы считаются execute wrapper'ом, который ставится на каждое соединение с БД при его создании
+и пропускает запросы без учета вне запроса с метриками. Метрики текущего запроса хранятся в contextvars,
+поэтому учитываются и запросы async-представлений, выполняемые в потоке sync_to_async.
+"""
+import glob
+import ipaddress
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpRequest, HttpResponse
+
+DURATION_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS: Tuple[float, ...] = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+SIZE_BUCKETS: Tuple[float, ...] = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+UNMATCHED_ROUTE: str = '<unmatched>'
+
+METRICS_FLUSH_INTERVAL: float = 5.0
+ARCHIVE_SNAPSHOT: str = 'archive.json'
+
+# Снимок метрик процесса: гистограммы по ключу json.dumps([метрика, метод, маршрут]) - [корзины, сумма,
+# количество], счетчики по имени ряда Prometheus с метками.
+Snapshot = Dict[str, Dict[str, Any]]
+
+
+class RequestSample:
+    """
+    Метрики одного запроса.
+
+    Attributes:
+        started (float): Время начала запроса (time.perf_counter).
+        queries (int): Количество SQL-запросов.
+        sql_time (float): Время SQL-запросов в секундах.
+        render_started (Optional[float]): Время начала отрисовки ответа.
+        render_time (float): Время отрисовки ответа в секундах.
+    """
+
+    __slots__ = ('started', 'queries', 'sql_time', 'render_started', 'render_time')
+
+    def __init__(self) -> None:
+        self.started: float = time.perf_counter()
+        self.queries: int = 0
+        self.sql_time: float = 0.0
+        self.render_started: Optional[float] = None
+        self.render_time: float = 0.0
+
+
+_current_sample: ContextVar[Optional[RequestSample]] = ContextVar('request_metrics_sample', default=None)
+
+
+def count_queries(execute: Callable, sql: str, params: Any, many: bool, context: Dict[str, Any]) -> Any:
+    """ Execute wrapper: учитывает SQL-запрос в метриках текущего запроса, если они собираются. """
+    sample: Optional[RequestSample] = _current_sample.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    started: float = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.sql_time += time.perf_counter() - started
+        sample.queries += 1
+
+
+def install_query_counter(connection, **kwargs: Any) -> None:
+    """ Ставит count_queries на соединение с БД (обработчик сигнала connection_created). """
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+class Histogram:
+    """
+    Гистограмма Prometheus: количество наблюдений по корзинам, их сумма и количество.
+    """
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets: Tuple[float, ...] = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricSpec(NamedTuple):
+    """
+    Гистограмма метрики запроса.
+
+    Attributes:
+        name (str): Имя метрики Prometheus.
+        description (str): Описание.
+        buckets (Tuple[float, ...]): Верхние границы корзин.
+        value (Callable[[RequestSample, float, Optional[int]], Optional[float]]): Значение по метрикам запроса,
+            длительности запроса и размеру ответа (None - не учитывать).
+    """
+    name: str
+    description: str
+    buckets: Tuple[float, ...]
+    value: Callable[[RequestSample, float, Optional[int]], Optional[float]]
+
+
+REQUEST_METRICS: Tuple[MetricSpec, ...] = (
+    MetricSpec('http_request_duration_seconds', 'Длительность обработки запроса', DURATION_BUCKETS,
+               lambda sample, duration, size: duration),
+    MetricSpec('http_request_db_queries', 'Количество SQL-запросов на запрос', QUERY_COUNT_BUCKETS,
+               lambda sample, duration, size: sample.queries),
+    MetricSpec('http_request_db_duration_seconds', 'Время SQL-запросов на запрос', DURATION_BUCKETS,
+               lambda sample, duration, size: sample.sql_time),
+    MetricSpec('http_request_render_duration_seconds', 'Время отрисовки ответа (DRF, шаблоны)', DURATION_BUCKETS,
+               lambda sample, duration, size: sample.render_time),
+    MetricSpec('http_response_size_bytes', 'Размер ответа (кроме потоковых)', SIZE_BUCKETS,
+               lambda sample, duration, size: size),
+)
+
+
+def empty_snapshot() -> Snapshot:
+    return {'histograms': {}, 'counters': {}}
+
+
+def merge_snapshot(target: Snapshot, source: Snapshot) -> Snapshot:
+    """ Прибавляет снимок source к снимку target. """
+    for key, (counts, total, count) in source['histograms'].items():
+        merged: Optional[list] = target['histograms'].get(key)
+        if merged is None:
+            target['histograms'][key] = [list(counts), total, count]
+        else:
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+            merged[2] += count
+    for name, value in source['counters'].items():
+        target['counters'][name] = target['counters'].get(name, 0) + value
+    return target
+
+
+def read_snapshot(path: str) -> Snapshot:
+    """ Снимок из файла или пустой снимок, если файла нет. """
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return empty_snapshot()
+
+
+def write_snapshot(path: str, snapshot: Snapshot) -> None:
+    """ Записывает снимок атомарно: читатель видит либо прежний, либо новый файл целиком. """
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+        json.dump(snapshot, file)
+    os.replace(temporary, path)
+
+
+def process_snapshot_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f'process-{pid}.json')
+
+
+def mark_process_dead(pid: int, directory: Optional[str] = None) -> None:
+    """
+    Переносит снимок завершившегося процесса в архив каталога METRICS_DIR (хук child_exit gunicorn).
+    """
+    directory = directory or settings.METRICS_DIR
+    path: str = process_snapshot_path(directory, pid)
+    if not directory or not os.path.exists(path):
+        return
+    archive: str = os.path.join(directory, ARCHIVE_SNAPSHOT)
+    write_snapshot(archive, merge_snapshot(read_snapshot(archive), read_snapshot(path)))
+    os.remove(path)
+
+
+def process_counters() -> Dict[str, int]:
+    """ Счетчики процесса, отдаваемые вместе с гистограммами. """
+    from vetclinics.caches import busy_slots_counters
+
+    return {f'vetclinics_busy_slots_cache_requests_total{{result="{result}"}}': value
+            for result, value in (('hit', busy_slots_counters.hits), ('miss', busy_slots_counters.misses))}
+
+
+COUNTERS_HELP: Tuple[Tuple[str, str], ...] = (
+    ('vetclinics_busy_slots_cache_requests_total', 'Обращения к кешу масок занятых слотов по дням'),
+)
+
+
+class MetricsRegistry:
+    """
+    Гистограммы метрик запросов по методу и маршруту URL в памяти процесса и, если задан METRICS_DIR,
+    их сумма по всем процессам (см. описание модуля).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str, str], Histogram] = {}
+        self._dirty: bool = False
+        self._flusher_pid: Optional[int] = None
+
+    def observe(self, method: str, route: str, sample: RequestSample, duration: float, size: Optional[int]) -> None:
+        with self._lock:
+            for metric in REQUEST_METRICS:
+                observed: Optional[float] = metric.value(sample, duration, size)
+                if observed is None:
+                    continue
+                key: Tuple[str, str, str] = (metric.name, method, route)
+                histogram: Optional[Histogram] = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(metric.buckets)
+                histogram.observe(observed)
+            self._dirty = True
+        if settings.METRICS_DIR and self._flusher_pid != os.getpid():
+            self._start_flusher()
+
+    def _start_flusher(self) -> None:
+        """ Запускает в процессе поток записи снимков (потоки не переживают fork, поэтому - по PID). """
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_periodically, name='metrics-flusher', daemon=True).start()
+
+    def _flush_periodically(self) -> None:
+        while True:
+            time.sleep(METRICS_FLUSH_INTERVAL)
+            if self._dirty:
+                try:
+                    self.flush()
+                except OSError:
+                    pass
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self) -> Snapshot:
+        """ Снимок гистограмм и счетчиков процесса. """
+        with self._lock:
+            histograms: Dict[str, Any] = {
+                json.dumps(key): [list(histogram.counts), histogram.sum, histogram.count]
+                for key, histogram in self._histograms.items()
+            }
+        return {'histograms': histograms, 'counters': process_counters()}
+
+    def flush(self) -> None:
+        """ Записывает снимок процесса в каталог METRICS_DIR (если он задан). """
+        self._dirty = False
+        if settings.METRICS_DIR:
+            os.makedirs(settings.METRICS_DIR, exist_ok=True)
+            write_snapshot(process_snapshot_path(settings.METRICS_DIR, os.getpid()), self.snapshot())
+
+    def collect(self) -> Snapshot:
+        """ Сумма снимков всех процессов каталога METRICS_DIR или снимок процесса, если каталог не задан. """
+        if not settings.METRICS_DIR:
+            return self.snapshot()
+        self.flush()
+        total: Snapshot = empty_snapshot()
+        for path in sorted(glob.glob(os.path.join(settings.METRICS_DIR, '*.json'))):
+            merge_snapshot(total, read_snapshot(path))
+        return total
+
+    def render(self) -> List[str]:
+        """ Строки гистограмм и счетчиков в текстовом формате Prometheus. """
+        snapshot: Snapshot = self.collect()
+        histograms: List[Tuple[List[str], list]] = sorted(
+            (json.loads(key), value) for key, value in snapshot['histograms'].items()
+        )
+        lines: List[str] = []
+        for name, description, buckets, _ in REQUEST_METRICS:
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+            for (metric, method, route), (counts, total, count) in histograms:
+                if metric != name:
+                    continue
+                labels: str = f'method="{method}",route="{escape_label(route)}"'
+                cumulative: int = 0
+                for bound, bucket_count in zip(buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le: str = '+Inf' if bound == float('inf') else f'{bound:g}'
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{labels}}} {total:g}')
+                lines.append(f'{name}_count{{{labels}}} {count}')
+        for name, description in COUNTERS_HELP:
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} counter']
+            lines += [f'{series} {value}' for series, value in sorted(snapshot['counters'].items())
+                      if series.startswith(name + '{')]
+        return lines
+
+
+registry = MetricsRegistry()
+
+
+def escape_label(value: str) -> str:
+    """ Экранирует значение метки Prometheus. """
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def server_timing(sample: RequestSample, duration: float) -> str:
+    """ Значение заголовка Server-Timing (длительности в миллисекундах). """
+    return (f'db;dur={sample.sql_time * 1000:.1f};desc="{sample.queries} queries", '
+            f'render;dur={sample.render_time * 1000:.1f}, total;dur={duration * 1000:.1f}')
+
+
+class RequestMetricsMiddleware:
+    """
+    Middleware метрик запросов (см. описание модуля). Ставится первым в MIDDLEWARE, чтобы учитывать
+    время остальных middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        if not settings.REQUEST_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.server_timing: bool = settings.REQUEST_METRICS_SERVER_TIMING
+        connection_created.connect(install_query_counter, dispatch_uid='request_metrics')
+        for connection in connections.all(initialized_only=True):
+            install_query_counter(connection)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sample = RequestSample()
+        token = _current_sample.set(sample)
+        try:
+            response: HttpResponse = self.get_response(request)
+        finally:
+            _current_sample.reset(token)
+        return self.finish(request, response, sample)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        sample = RequestSample()
+        token = _current_sample.set(sample)
+        try:
+            response: HttpResponse = await self.get_response(request)
+        finally:
+            _current_sample.reset(token)
+        return self.finish(request, response, sample)
+
+    def process_template_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        """ Засекает отрисовку ответа DRF или шаблона: она выполняется сразу после этого метода. """
+        sample: Optional[RequestSample] = _current_sample.get()
+        if sample is not None:
+            sample.render_started = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: self.rendered(sample))
+        return response
+
+    @staticmethod
+    def rendered(sample: RequestSample) -> None:
+        sample.render_time = time.perf_counter() - sample.render_started
+
+    def finish(self, request: HttpRequest, response: HttpResponse, sample: RequestSample) -> HttpResponse:
+        """ Сохраняет метрики запроса и добавляет заголовок Server-Timing. """
+        duration: float = time.perf_counter() - sample.started
+        size: Optional[int] = None if response.streaming else len(response.content)
+        match = getattr(request, 'resolver_match', None)
+        registry.observe(request.method, match.route if match else UNMATCHED_ROUTE, sample, duration, size)
+        if self.server_timing:
+            response.headers['Server-Timing'] = server_timing(sample, duration)
+        return response
+
+
+def metrics_allowed(request: HttpRequest) -> bool:
+    """
+    Проверяет доступ к /metrics: сотрудник клиники или адрес клиента (REMOTE_ADDR) из METRICS_ALLOWED_IPS.
+    За reverse proxy REMOTE_ADDR - адрес прокси, поэтому /metrics нужно закрыть и на нем.
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_active and user.is_staff:
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network, strict=False) for network in settings.METRICS_ALLOWED_IPS)
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """
+    Метрики в текстовом формате Prometheus: гистограммы запросов по маршрутам и счетчики кеша свободных слотов
+    (сумма по процессам, если задан METRICS_DIR). Доступно, только если включена настройка REQUEST_METRICS,
+    сотрудникам и адресам из METRICS_ALLOWED_IPS (metrics_allowed).
+    """
+    if not settings.REQUEST_METRICS:
+        raise Http404
+    if not metrics_allowed(request):
+        raise PermissionDenied
+    lines: List[str] = registry.render()
+    return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
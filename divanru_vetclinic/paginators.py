@@ -0,0 +1,58 @@
+"""
+Пагинатор админ-панели для больших таблиц.
+"""
+from typing import Optional
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+ESTIMATE_THRESHOLD: int = 100_000
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """
+    Оценка количества строк таблицы модели из статистики планировщика без сканирования таблицы.
+
+    PostgreSQL: pg_class.reltuples (обновляется autovacuum/ANALYZE), SQLite: sqlite_stat1 (после ANALYZE).
+
+    Returns:
+        Optional[int]: Оценка или None, если статистики нет.
+    """
+    connection = connections[queryset.db]
+    table: str = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+                           [connection.ops.quote_name(table)])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [table])
+            counts = [int(stat.split()[0]) for stat, in cursor.fetchall() if stat]
+            return max(counts) if counts else None
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор, который для большой таблицы без фильтров берет количество строк из статистики БД
+    вместо COUNT(*) по всей таблице. Отфильтрованные выборки (поиск, фильтры, дата) считаются точно.
+
+    Оценка может немного расходиться с реальным количеством, поэтому последняя страница может
+    оказаться неполной или пустой.
+    """
+    estimate_threshold: int = ESTIMATE_THRESHOLD
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate: Optional[int] = estimate_count(queryset)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
@@ -6,9 +6,19 @@ load_dotenv()
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SECRET_KEY = os.getenv('SECRET_KEY')
-DEBUG = True
 
-ALLOWED_HOSTS = []
+# Профиль запуска: development (runserver) или production (сервер приложений, см. gunicorn.conf.py).
+# В production DEBUG выключен: с DEBUG Django хранит в памяти каждый выполненный SQL-запрос.
+DJANGO_ENV = os.getenv('DJANGO_ENV', 'development')
+DEBUG = os.getenv('DEBUG', str(DJANGO_ENV != 'production')).lower() in ('1', 'true', 'yes')
+
+ALLOWED_HOSTS = [host.strip() for host in os.getenv('ALLOWED_HOSTS', '').split(',') if host.strip()]
+if not DEBUG and not ALLOWED_HOSTS:
+    ALLOWED_HOSTS = ['localhost', '127.0.0.1']
+
+# Раздача статики самим Django. Без DEBUG статику обычно отдает reverse proxy (после collectstatic),
+# а SERVE_STATIC=true оставляет раздачу в приложении, например в docker-compose без прокси.
+SERVE_STATIC = os.getenv('SERVE_STATIC', str(DEBUG)).lower() in ('1', 'true', 'yes')
 
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -26,6 +36,7 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'accounts.Account'
 
 MIDDLEWARE = [
+    'divanru_vetclinic.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,9 +66,21 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'divanru_vetclinic.wsgi.application'
 
+# Постоянные соединения с БД: соединение переиспользуется запросами воркера DB_CONN_MAX_AGE секунд
+# (0 - новое соединение на каждый запрос) и проверяется перед повторным использованием.
+# DB_POOLER=pgbouncer - подключение через PgBouncer в режиме transaction pooling: серверные курсоры
+# (QuerySet.iterator()) в нем не работают.
+DB_POOLER = os.getenv('DB_POOLER', '')
+DATABASE_DEFAULTS = {
+    'ENGINE': 'django.db.backends.postgresql',
+    'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+    'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() in ('1', 'true', 'yes'),
+    'DISABLE_SERVER_SIDE_CURSORS': DB_POOLER == 'pgbouncer',
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        **DATABASE_DEFAULTS,
         'NAME': os.getenv('DB_NAME'),
         'USER': os.getenv('DB_USER'),
         'PASSWORD': os.getenv('DB_PASSWORD'),
@@ -66,6 +89,59 @@ DATABASES = {
     }
 }
 
+# Реплика для чтения (см. divanru_vetclinic.db_routers). Тесты запускаются без нее: тесты маршрутизации
+# подключают свою реплику.
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'USER': os.getenv('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['divanru_vetclinic.db_routers.ReplicaRouter']
+
+# Метрики запросов (divanru_vetclinic.middleware): заголовок Server-Timing и /metrics для Prometheus.
+# Выключенный middleware удаляется из цепочки и не замедляет запросы.
+REQUEST_METRICS = os.getenv('REQUEST_METRICS', 'false').lower() in ('1', 'true', 'yes')
+REQUEST_METRICS_SERVER_TIMING = os.getenv('REQUEST_METRICS_SERVER_TIMING', 'true').lower() in ('1', 'true', 'yes')
+# Каталог снимков метрик процессов: /metrics отдает их сумму (gunicorn задает его сам, см. gunicorn.conf.py).
+METRICS_DIR = os.getenv('METRICS_DIR') or None
+# Адреса и сети (через запятую, например 127.0.0.1,10.0.0.0/8), с которых /metrics доступен без входа сотрудника.
+METRICS_ALLOWED_IPS = [
+    network.strip() for network in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if network.strip()
+]
+
+# Время жизни в кеше данных, прочитанных с реплики (секунды).
+REPLICA_CACHE_TIMEOUT = int(os.getenv('REPLICA_CACHE_TIMEOUT', 5))
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHE_DEFAULT_LOCATIONS = {
+    'locmem': 'divanru-vetclinic',
+    'file': os.path.join(BASE_DIR, '.cache'),
+    'redis': 'redis://127.0.0.1:6379/0',
+}
+# locmem - кеш своего процесса: при нескольких процессах (воркерах) сброс кеша в одном из них
+# не виден остальным, поэтому для них нужен file (общий каталог) или redis.
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': os.getenv('CACHE_LOCATION', CACHE_DEFAULT_LOCATIONS[CACHE_BACKEND]),
+        'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', ''),
+    }
+}
+
+# Время жизни масок занятых слотов в кеше (секунды); кеш сбрасывается при изменении записей на прием.
+FREE_SLOTS_CACHE_TIMEOUT = int(os.getenv('FREE_SLOTS_CACHE_TIMEOUT', 24 * 60 * 60))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
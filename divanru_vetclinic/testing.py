@@ -0,0 +1,79 @@
+"""
+Бюджеты SQL-запросов и времени для тестов API.
+
+QueryBudgetMixin.assertQueryBudget проверяет, что блок выполнил не больше заданного количества SQL-запросов
+и уложился во время, а декоратор dataset_sizes прогоняет тест на нескольких объемах данных. Вместе они ловят
+N+1 (количество запросов растет с объемом данных) и квадратичные алгоритмы (время растет быстрее данных)
+до того, как регрессия попадет в production.
+
+Строгая проверка - количество запросов. Бюджеты времени заданы с запасом на дрожание общих машин CI
+(не меньше 0.25 с на запрос) и ловят только грубый рост времени; при необходимости их можно масштабировать
+переменной окружения QUERY_BUDGET_TIME_SCALE (например, 3).
+"""
+import functools
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test.utils import CaptureQueriesContext
+
+QUERY_BUDGET_TIME_SCALE: float = float(os.getenv('QUERY_BUDGET_TIME_SCALE', 1))
+
+
+class QueryBudgetMixin:
+    """
+    Mixin для TestCase с проверкой бюджета SQL-запросов и времени.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, queries: int, seconds: Optional[float] = None,
+                          using: str = DEFAULT_DB_ALIAS) -> Iterator[CaptureQueriesContext]:
+        """
+        Проверяет, что блок выполнил не больше queries SQL-запросов и (если задано) уложился в seconds секунд.
+
+        Args:
+            queries (int): Наибольшее допустимое количество SQL-запросов.
+            seconds (Optional[float]): Наибольшее допустимое время в секундах (умножается на
+                QUERY_BUDGET_TIME_SCALE).
+            using (str): Псевдоним БД, запросы к которой считаются.
+
+        Returns:
+            Iterator[CaptureQueriesContext]: Контекст с выполненными запросами.
+        """
+        with CaptureQueriesContext(connections[using]) as context:
+            started: float = time.perf_counter()
+            yield context
+            elapsed: float = time.perf_counter() - started
+
+        executed: int = len(context.captured_queries)
+        if executed > queries:
+            self.fail(f'Выполнено SQL-запросов: {executed}, бюджет: {queries}\n' + '\n'.join(
+                f'{number}. {query["sql"]}' for number, query in enumerate(context.captured_queries, start=1)
+            ))
+        if seconds is not None and elapsed > seconds * QUERY_BUDGET_TIME_SCALE:
+            self.fail(f'Время выполнения: {elapsed:.3f} с, бюджет: {seconds * QUERY_BUDGET_TIME_SCALE:.3f} с')
+
+
+def dataset_sizes(*sizes: int) -> Callable:
+    """
+    Декоратор тестового метода test(self, size): метод выполняется для каждого объема данных в своем subTest.
+    Данные, созданные для объема, откатываются (точка сохранения), а кеш Django перед каждым прогоном
+    очищается, поэтому каждый объем проверяется с холодным кешем.
+
+    Args:
+        *sizes (int): Объемы данных.
+    """
+    def decorator(test: Callable) -> Callable:
+        @functools.wraps(test)
+        def wrapper(self) -> None:
+            for size in sizes:
+                with self.subTest(size=size):
+                    cache.clear()
+                    with transaction.atomic():
+                        test(self, size)
+                        transaction.set_rollback(True)
+        return wrapper
+    return decorator
@@ -1,11 +1,15 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
+from django.views.static import serve
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
-from django.conf.urls.static import static
 from drf_yasg import openapi
 
+from divanru_vetclinic.middleware import metrics_view
+
 schema_view = get_schema_view(
    openapi.Info(
       title="Divan RU Ветеринарная клиника",
@@ -18,10 +22,24 @@ schema_view = get_schema_view(
    permission_classes=(permissions.AllowAny,),
 )
 
+
+def static(prefix: str, document_root: str) -> list:
+    """
+    Маршрут раздачи файлов, как django.conf.urls.static.static, но включается настройкой SERVE_STATIC,
+    а не DEBUG: в production-профиле статику может отдавать само приложение.
+    """
+    if not settings.SERVE_STATIC:
+        return []
+    return [re_path(r'^%s(?P<path>.*)$' % re.escape(prefix.lstrip('/')), serve, {'document_root': document_root})]
+
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/accounts/', include('accounts.api.urls')),
     path('api/vetclinics/', include('vetclinics.api.urls')),
+    path('api/async/accounts/', include('accounts.api.async_urls')),
+    path('api/async/vetclinics/', include('vetclinics.api.async_urls')),
+    path('metrics', metrics_view, name='metrics'),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 ]\
@@ -0,0 +1,156 @@
+"""
+Конфигурация gunicorn для production-профиля (запуск: python manage.py serve или gunicorn -c gunicorn.conf.py).
+
+- WSGI (sync-воркеры, 2 * ядра + 1) или ASGI (воркеры uvicorn, по одному на ядро) - GUNICORN_ASGI=true;
+- приложение загружается в мастере до fork (preload_app): код и справочники в памяти воркеров общие
+  по copy-on-write, а ошибка импорта видна сразу при старте;
+- плавная замена воркеров: HUP перезапускает воркеры с новой конфигурацией, а новый код при preload_app
+  подхватывается только новым мастером (USR2, затем QUIT старому мастеру); max_requests периодически
+  перезапускает воркеры, ограничивая рост памяти;
+- keep-alive между прокси и воркерами; постоянные соединения с БД - DB_CONN_MAX_AGE (settings.py);
+- GUNICORN_BENCH=<N> - после старта нагружает сервер N запросами и пишет в лог запросы в секунду и задержки;
+- несколько воркеров с кешем своего процесса (CACHE_BACKEND=locmem) не запускаются: сброс кеша
+  в одном воркере не виден остальным (GUNICORN_ALLOW_LOCMEM=true - запустить все равно);
+- метрики запросов воркеров складываются через каталог METRICS_DIR (по умолчанию в worker_tmp_dir),
+  поэтому /metrics отдает сумму по всем воркерам, какой бы из них ни принял запрос.
+
+Все параметры переопределяются переменными окружения.
+"""
+import asyncio
+import multiprocessing
+import glob
+import os
+import sys
+import tempfile
+import threading
+
+
+def env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'divanru_vetclinic.settings')
+os.environ.setdefault('DJANGO_ENV', 'production')
+
+ASGI: bool = env_bool('GUNICORN_ASGI')
+CPU_COUNT: int = multiprocessing.cpu_count()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+if ASGI:
+    # Под ASGI соединение с БД привязано к потоку, а не к запросу: постоянные соединения не переиспользуются
+    # и копятся, поэтому по умолчанию выключены (для переиспользования нужен пулер, DB_POOLER).
+    os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+    wsgi_app = 'divanru_vetclinic.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    workers = env_int('WEB_CONCURRENCY', CPU_COUNT)
+else:
+    wsgi_app = 'divanru_vetclinic.wsgi:application'
+    worker_class = 'sync'
+    workers = env_int('WEB_CONCURRENCY', 2 * CPU_COUNT + 1)
+
+preload_app = env_bool('GUNICORN_PRELOAD', True)
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+timeout = env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', 200)
+backlog = env_int('GUNICORN_BACKLOG', 2048)
+# Heartbeat воркеров в памяти, а не на диске (в контейнере /tmp может быть на overlayfs).
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+# Снимки метрик запросов воркеров (divanru_vetclinic.middleware).
+os.environ.setdefault('METRICS_DIR', os.path.join(worker_tmp_dir or tempfile.gettempdir(),
+                                                  f'divanru-vetclinic-metrics-{bind.rpartition(":")[2]}'))
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def on_starting(server) -> None:
+    """
+    Не запускает несколько воркеров с кешем locmem: маски занятых слотов, версия расписания и ETag справочника
+    видов животных сбрасываются только в воркере, изменившем данные, а остальные отдают устаревшие данные
+    до истечения кеша (маски - до суток). Нужен общий кеш: CACHE_BACKEND=file или redis.
+    """
+    from django.conf import settings
+
+    backend: str = settings.CACHES['default']['BACKEND']
+    if server.num_workers > 1 and backend.endswith('.LocMemCache') and not env_bool('GUNICORN_ALLOW_LOCMEM'):
+        server.log.error('Кеш locmem не общий для %d воркеров: задайте CACHE_BACKEND=file или redis '
+                         '(или WEB_CONCURRENCY=1)', server.num_workers)
+        sys.exit(1)
+
+    # Метрики нового мастера начинаются с нуля: снимки прежнего запуска удаляются.
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.json')):
+        os.remove(path)
+
+
+def pre_fork(server, worker) -> None:
+    """
+    Закрывает соединения с БД и кешем, открытые мастером при загрузке приложения: сокет, унаследованный
+    воркерами после fork, оказался бы общим для нескольких процессов.
+    """
+    if not preload_app:
+        return
+    from django.core.cache import caches
+    from django.db import connections
+
+    connections.close_all()
+    caches.close_all()
+
+
+def worker_exit(server, worker) -> None:
+    """ Записывает последний снимок метрик завершающегося воркера (выполняется в воркере). """
+    from divanru_vetclinic.middleware import registry
+
+    registry.flush()
+
+
+def child_exit(server, worker) -> None:
+    """ Переносит снимок метрик завершившегося воркера в архив, чтобы суммы в /metrics не уменьшились. """
+    from divanru_vetclinic.middleware import mark_process_dead
+
+    mark_process_dead(worker.pid)
+
+
+def when_ready(server) -> None:
+    """
+    Проверяет профиль запуска и, если задан GUNICORN_BENCH, запускает стартовый замер в отдельном потоке.
+    """
+    from django.conf import settings
+
+    if settings.DEBUG:
+        server.log.warning('DEBUG включен: каждый SQL-запрос хранится в памяти воркера (DJANGO_ENV=production)')
+
+    requests: int = env_int('GUNICORN_BENCH', 0)
+    if requests:
+        threading.Thread(target=startup_bench, args=(server, requests), daemon=True).start()
+
+
+def startup_bench(server, requests: int) -> None:
+    """
+    Стартовый замер: нагружает только что запущенный сервер GET-запросами к справочнику видов животных
+    и свободным слотам и пишет в лог запросы в секунду и задержки p50/p95/p99.
+    """
+    from django.core.management.base import CommandError
+
+    from vetclinics.management.commands.bench_async_api import measure
+
+    host, _, port = bind.rpartition(':')
+    base_url: str = f'http://{"127.0.0.1" if host in ("", "0.0.0.0") else host}:{port}'
+    prefix: str = '/api/async/' if ASGI else '/api/'
+    concurrency: int = env_int('GUNICORN_BENCH_CONCURRENCY', 4 * workers)
+    for path in ('vetclinics/animal-types/', 'vetclinics/free-slots/?limit=20'):
+        try:
+            rate, (p50, p95, p99), errors = asyncio.run(
+                measure(base_url + prefix + path, max(requests, 2), concurrency, timeout)
+            )
+        except CommandError as e:
+            server.log.error('Стартовый замер не выполнен: %s', e)
+            return
+        server.log.info('Стартовый замер %s: %.0f зап/с, p50 %.1f мс, p95 %.1f мс, p99 %.1f мс, ошибок %d',
+                        prefix + path, rate, p50, p95, p99, errors)
@@ -1,26 +1,43 @@
 import os
 
-from typing import Optional
-
-import requests
+from typing import Dict, List, Optional
 
 from aiogram import Bot, types
+from aiogram.bot.api import TELEGRAM_PRODUCTION, TelegramAPIServer
 from aiogram.dispatcher import Dispatcher
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, KeyboardButton, ReplyKeyboardMarkup
 from aiogram.utils import executor
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
-from aiogram.contrib.fsm_storage.memory import MemoryStorage
 
+from aiohttp import web
 from dotenv import load_dotenv
 
+from tgbot.api_client import ApiUnavailableError, VetclinicApiClient, animal_type_names
+from tgbot.cache import TTLCache
+from tgbot.storage import create_storage
+from tgbot.webhook import DEFAULT_WEBHOOK_PATH, create_webhook_app
+
 
 load_dotenv()
 API_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 BASE_API_URL = os.getenv('BASE_API_URL')
-bot = Bot(token=API_TOKEN)
-storage = MemoryStorage()
+FREE_SLOTS_LIMIT = int(os.getenv('FREE_SLOTS_LIMIT', 48))
+ANIMAL_TYPES_TTL = float(os.getenv('BOT_ANIMAL_TYPES_TTL', 300))
+FREE_SLOTS_TTL = float(os.getenv('BOT_FREE_SLOTS_TTL', 30))
+BOT_MODE = os.getenv('BOT_MODE', 'polling')
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', DEFAULT_WEBHOOK_PATH)
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')
+WEBAPP_HOST = os.getenv('WEBAPP_HOST', '0.0.0.0')
+WEBAPP_PORT = int(os.getenv('WEBAPP_PORT', 8080))
+TELEGRAM_API_SERVER = os.getenv('TELEGRAM_API_SERVER')
+bot = Bot(token=API_TOKEN,
+          server=TelegramAPIServer.from_base(TELEGRAM_API_SERVER) if TELEGRAM_API_SERVER else TELEGRAM_PRODUCTION)
+storage = create_storage()
 dp = Dispatcher(bot, storage=storage)
+api = VetclinicApiClient(BASE_API_URL)
+bot_cache = TTLCache(ttl=FREE_SLOTS_TTL)
 
 
 class RegistrationState(StatesGroup):
@@ -126,30 +143,49 @@ async def process_contact(message: types.Message, state: FSMContext):
     }
 
     try:
-        response = requests.post(f'{BASE_API_URL}/api/accounts/register/', json=registration_data)
-        if response.status_code == 201 and 'id' in response.json():
-            client_id = response.json()['id']
+        response = await api.register(registration_data)
+        if response.status in (200, 201) and 'id' in response.data:
+            client_id = response.data['id']
             await state.update_data(client_id=client_id)
             await bot.send_message(message.chat.id, 'Пользователь успешно зарегистрирован!')
             await send_appointment_request(message, state)
         else:
             await bot.send_message(message.chat.id, 'Произошла ошибка при регистрации пользователя.')
-    except requests.exceptions.RequestException:
+    except ApiUnavailableError:
         await bot.send_message(message.chat.id, 'К сожалению сервис временно не доступен.')
 
 
+async def load_animal_types() -> Optional[Dict[str, int]]:
+    """ Загружает соответствие названий видов животных их ID, кешируя его в памяти бота """
+    async def fetch() -> Optional[Dict[str, int]]:
+        response = await api.animal_types()
+        if response.status == 200:
+            return animal_type_names(response.data)
+        return None
+    return await bot_cache.get_or_load('animal_types', fetch, ttl=ANIMAL_TYPES_TTL)
+
+
+async def load_free_slots(animal_type_id: int) -> Optional[List[str]]:
+    """ Загружает свободные слоты для вида животного, кешируя их в памяти бота """
+    async def fetch() -> Optional[List[str]]:
+        response = await api.free_slots(animal_type_id, limit=FREE_SLOTS_LIMIT)
+        if response.status == 200:
+            return response.data
+        return None
+    return await bot_cache.get_or_load(('free_slots', animal_type_id), fetch)
+
+
 async def get_animal_types(message: types.Message, state: FSMContext):
     """ Обработчик для предоставления типов животных, которые обслуживает ветклиника """
     try:
-        response = requests.get(f'{BASE_API_URL}/api/vetclinics/animal-types/')
-        if response.status_code == 200:
-            animal_types = response.json()
-            buttons = [KeyboardButton(animal_type['name']) for animal_type in animal_types]
+        animal_types = await load_animal_types()
+        if animal_types is not None:
+            buttons = [KeyboardButton(name) for name in animal_types]
             keyboard = ReplyKeyboardMarkup(resize_keyboard=True, one_time_keyboard=True).add(*buttons)
             await message.reply('Выберите тип животного:', reply_markup=keyboard)
         else:
             await message.reply('К сожалению, в данный момент не удалось получить доступные типы животных.')
-    except requests.exceptions.RequestException as e:
+    except ApiUnavailableError as e:
         print('Ошибка соединения:', e)
         await message.reply('К сожалению, сервис временно не доступен.')
 
@@ -157,38 +193,41 @@ async def get_animal_types(message: types.Message, state: FSMContext):
 async def get_animal_type_id(animal_type_name: str) -> Optional[int]:
     """ Обработчик для получения ID типа животного """
     try:
-        response = requests.get(f'{BASE_API_URL}/api/vetclinics/animal-types/')
-        if response.status_code == 200:
-            animal_types = response.json()
-            for animal_type in animal_types:
-                if animal_type['name'] == animal_type_name:
-                    return animal_type['id']
-    except requests.exceptions.RequestException as e:
+        animal_types = await load_animal_types()
+        if animal_types is not None:
+            return animal_types.get(animal_type_name)
+    except ApiUnavailableError as e:
         print('Ошибка соединения:', e)
     return None
 
 
 async def get_free_slots(message: types.Message, state: FSMContext):
     """ Обработчик для предоставления свободных слотов для записи на приём """
+    async with state.proxy() as data:
+        animal_type_id = data.get('animal_type_id')
     try:
-        response = requests.get(f'{BASE_API_URL}/api/vetclinics/free-slots/')
-        if response.status_code == 200:
-            free_slots = response.json()
+        free_slots = await load_free_slots(animal_type_id)
+        if free_slots is not None:
             buttons = [KeyboardButton(slot) for slot in free_slots]
             keyboard = ReplyKeyboardMarkup(resize_keyboard=True, one_time_keyboard=True).add(*buttons)
             await message.reply('Выберите свободный слот для записи на прием:', reply_markup=keyboard)
             await AppointmentState.choose_slot.set()  # Устанавливаем состояние выбора слота
         else:
             await message.reply('К сожалению, в данный момент не удалось получить свободные слоты.')
-    except requests.exceptions.RequestException:
+    except ApiUnavailableError:
         await message.reply('К сожалению, сервис временно не доступен.')
 
 
 @dp.message_handler(state=AppointmentState.choose_animal_type)
 async def process_animal_type_choice(message: types.Message, state: FSMContext):
     """ Обработчик для сохранения состояния типа животного """
+    animal_type_id = await get_animal_type_id(message.text)
+    if animal_type_id is None:
+        await message.reply('Не удалось определить тип животного. Выберите тип животного из предложенных.')
+        return
     async with state.proxy() as data:
         data['animal_type'] = message.text
+        data['animal_type_id'] = animal_type_id
     await get_free_slots(message, state)
 
 
@@ -199,8 +238,7 @@ async def process_slot_choice(message: types.Message, state: FSMContext):
         data['chosen_slot'] = message.text
         client_id = data.get('client_id')
         appointment_date = data.get('chosen_slot')
-        animal_type_name = data.get('animal_type')
-        animal_type_id = await get_animal_type_id(animal_type_name)
+        animal_type_id = data.get('animal_type_id')
 
     if animal_type_id is None:
         await bot.send_message(message.chat.id, "Не удалось определить тип животного.")
@@ -213,15 +251,31 @@ async def process_slot_choice(message: types.Message, state: FSMContext):
     }
 
     try:
-        response = requests.post(f'{BASE_API_URL}/api/vetclinics/make-an-appointment/', json=appointment_data)
-        if response.status_code == 201:
+        response = await api.make_appointment(appointment_data)
+        # После записи (или отказа из-за занятого слота) список слотов вида животного устарел.
+        bot_cache.invalidate(('free_slots', animal_type_id))
+        if response.status == 201:
             await bot.send_message(message.chat.id, "Вы успешно записались на прием!")
             await send_goodbye_message(message)
         else:
             await bot.send_message(message.chat.id, "Произошла ошибка при записи на прием.")
-    except requests.exceptions.RequestException:
+    except ApiUnavailableError:
         await bot.send_message(message.chat.id, "К сожалению, сервис временно не доступен.")
 
 
+async def on_shutdown(dispatcher: Dispatcher):
+    """ Закрывает пул соединений с API при остановке бота """
+    await api.close()
+
+
+async def webhook_app() -> web.Application:
+    """ Приложение для режима webhook (фабрика для gunicorn с воркером aiohttp.GunicornWebWorker) """
+    return create_webhook_app(dp, path=WEBHOOK_PATH, webhook_url=WEBHOOK_URL, secret_token=WEBHOOK_SECRET,
+                              on_shutdown=on_shutdown)
+
+
 if __name__ == '__main__':
-    executor.start_polling(dp, skip_updates=True)
+    if BOT_MODE == 'webhook':
+        web.run_app(webhook_app(), host=WEBAPP_HOST, port=WEBAPP_PORT)
+    else:
+        executor.start_polling(dp, skip_updates=True, on_shutdown=on_shutdown)
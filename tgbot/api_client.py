@@ -0,0 +1,162 @@
+"""
+Асинхронный клиент API ветклиники для телеграм-бота.
+
+Все запросы идут через одну общую сессию aiohttp с пулом keep-alive соединений, поэтому обращения
+к API не блокируют цикл событий бота и не открывают новое TCP-соединение на каждый запрос.
+"""
+import asyncio
+import random
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import aiohttp
+
+DEFAULT_TIMEOUT: float = 10.0
+DEFAULT_RETRIES: int = 3
+DEFAULT_BACKOFF: float = 0.2
+DEFAULT_POOL_SIZE: int = 100
+DEFAULT_KEEPALIVE_TIMEOUT: float = 30.0
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+class ApiUnavailableError(Exception):
+    """ API ветклиники недоступно: ошибка соединения, таймаут или 5xx после всех повторов. """
+
+
+class ApiResponse(NamedTuple):
+    """
+    Ответ API.
+
+    Attributes:
+        status (int): HTTP-статус ответа.
+        data (Any): Тело ответа, разобранное из JSON (None, если тела нет).
+        headers (Dict[str, str]): Заголовки ответа.
+    """
+    status: int
+    data: Any
+    headers: Dict[str, str]
+
+
+class VetclinicApiClient:
+    """
+    Клиент API ветклиники с общим пулом соединений, таймаутами и повторами с экспоненциальной задержкой.
+
+    Идемпотентные GET-запросы повторяются при ошибках соединения, таймаутах и ответах 502/503/504.
+    POST-запросы повторяются только если соединение не удалось установить, т.е. запрос точно не ушел.
+    """
+
+    def __init__(self, base_url: str, timeout: float = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF, pool_size: int = DEFAULT_POOL_SIZE,
+                 keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT) -> None:
+        """
+        Args:
+            base_url (str): Базовый URL API, например, http://127.0.0.1:8000.
+            timeout (float): Общий таймаут одного запроса в секундах.
+            retries (int): Количество повторов запроса.
+            backoff (float): Начальная задержка перед повтором в секундах.
+            pool_size (int): Максимальное количество одновременных соединений.
+            keepalive_timeout (float): Время жизни простаивающего соединения в секундах.
+        """
+        self.base_url: str = base_url.rstrip('/')
+        self.timeout: float = timeout
+        self.retries: int = retries
+        self.backoff: float = backoff
+        self.pool_size: int = pool_size
+        self.keepalive_timeout: float = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """ Общая сессия клиента, создается при первом запросе внутри работающего цикла событий. """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'Accept': 'application/json'},
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """ Закрывает сессию и все соединения пула. """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def request(self, method: str, path: str, *, params: Optional[Dict[str, Any]] = None,
+                      json: Optional[Any] = None, headers: Optional[Dict[str, str]] = None) -> ApiResponse:
+        """
+        Выполняет запрос к API с повторами.
+
+        Args:
+            method (str): HTTP-метод.
+            path (str): Путь относительно базового URL, например, /api/vetclinics/animal-types/.
+            params (Optional[Dict[str, Any]]): Query-параметры, значения None пропускаются.
+            json (Optional[Any]): Тело запроса.
+            headers (Optional[Dict[str, str]]): Дополнительные заголовки.
+
+        Returns:
+            ApiResponse: Ответ API.
+
+        Raises:
+            ApiUnavailableError: Если API недоступно после всех повторов.
+        """
+        idempotent: bool = method.upper() in ('GET', 'HEAD')
+        query: Optional[Dict[str, str]] = None
+        if params:
+            query = {key: str(value) for key, value in params.items() if value is not None}
+
+        attempt: int = 0
+        while True:
+            try:
+                async with self.session.request(method, f'{self.base_url}{path}', params=query, json=json,
+                                                headers=headers) as response:
+                    if idempotent and response.status in RETRY_STATUSES and attempt < self.retries:
+                        raise ApiUnavailableError(f'API ответило статусом {response.status}')
+                    data: Any = None
+                    if response.content_type == 'application/json':
+                        data = await response.json()
+                    return ApiResponse(status=response.status, data=data, headers=dict(response.headers))
+            except (aiohttp.ClientError, asyncio.TimeoutError, ApiUnavailableError) as e:
+                retryable: bool = idempotent or isinstance(e, aiohttp.ClientConnectorError)
+                if not retryable or attempt >= self.retries:
+                    raise ApiUnavailableError(str(e) or e.__class__.__name__) from e
+            await asyncio.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+            attempt += 1
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None,
+                  headers: Optional[Dict[str, str]] = None) -> ApiResponse:
+        """ GET-запрос к API. """
+        return await self.request('GET', path, params=params, headers=headers)
+
+    async def post(self, path: str, json: Any) -> ApiResponse:
+        """ POST-запрос к API. """
+        return await self.request('POST', path, json=json)
+
+    async def register(self, registration_data: Dict[str, Any]) -> ApiResponse:
+        """ Регистрация клиента. """
+        return await self.post('/api/accounts/register/', registration_data)
+
+    async def animal_types(self) -> ApiResponse:
+        """ Справочник видов животных. """
+        return await self.get('/api/vetclinics/animal-types/')
+
+    async def free_slots(self, animal_type_id: Optional[int] = None, limit: Optional[int] = None) -> ApiResponse:
+        """ Свободные слоты для вида животного. """
+        return await self.get('/api/vetclinics/free-slots/', params={'animal_type': animal_type_id, 'limit': limit})
+
+    async def make_appointment(self, appointment_data: Dict[str, Any]) -> ApiResponse:
+        """ Запись на прием. """
+        return await self.post('/api/vetclinics/make-an-appointment/', appointment_data)
+
+
+def animal_type_names(animal_types: List[dict]) -> Dict[str, int]:
+    """
+    Строит соответствие названия вида животного его ID.
+
+    Args:
+        animal_types (List[dict]): Справочник видов животных из API.
+
+    Returns:
+        Dict[str, int]: Название вида животного -> ID.
+    """
+    return {animal_type['name']: animal_type['id'] for animal_type in animal_types}
@@ -0,0 +1,114 @@
+"""
+Кеш в памяти телеграм-бота с ограничением по размеру (LRU) и времени жизни записей (TTL).
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+DEFAULT_MAXSIZE: int = 1024
+DEFAULT_TTL: float = 60.0
+
+
+class TTLCache:
+    """
+    LRU-кеш с временем жизни записей.
+
+    При переполнении вытесняется запись, к которой дольше всего не обращались.
+    Просроченные записи удаляются при обращении к ним.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Args:
+            maxsize (int): Максимальное количество записей.
+            ttl (float): Время жизни записи по умолчанию в секундах.
+            clock (Callable[[], float]): Источник времени (подменяется в тестах).
+        """
+        self.maxsize: int = maxsize
+        self.ttl: float = ttl
+        self.clock: Callable[[], float] = clock
+        self._data: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Возвращает значение по ключу или default, если записи нет или она просрочена.
+        """
+        item: Optional[Tuple[float, Any]] = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= self.clock():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Сохраняет значение на ttl секунд (по умолчанию на время жизни кеша).
+        """
+        self._data[key] = (self.clock() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """ Удаляет запись по ключу, если она есть. """
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """ Удаляет все записи. """
+        self._data.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]],
+                          ttl: Optional[float] = None) -> Any:
+        """
+        Возвращает значение из кеша, а при промахе загружает его через loader и сохраняет.
+
+        Одновременные промахи по одному ключу ждут одну общую загрузку, поэтому истечение записи
+        не порождает лавину одинаковых запросов к API. Если loader вернул None, значение не кешируется.
+
+        Args:
+            key (Hashable): Ключ записи.
+            loader (Callable[[], Awaitable[Any]]): Корутина-загрузчик значения.
+            ttl (Optional[float]): Время жизни записи в секундах.
+
+        Returns:
+            Any: Значение из кеша или результат loader.
+        """
+        value: Any = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        loading: Optional[asyncio.Future] = self._loading.get(key)
+        if loading is not None:
+            return await asyncio.shield(loading)
+
+        loading = asyncio.get_running_loop().create_future()
+        self._loading[key] = loading
+        try:
+            value = await loader()
+        except BaseException as e:
+            loading.set_exception(e)
+            # Исключение уже получит вызывающий код, ожидающих загрузку может не быть.
+            loading.exception()
+            raise
+        else:
+            if value is not None:
+                self.set(key, value, ttl)
+            loading.set_result(value)
+            return value
+        finally:
+            del self._loading[key]
+
+
+_MISSING = object()
@@ -0,0 +1,220 @@
+"""
+Генератор фейковых обновлений Telegram для проверки пропускной способности и задержек режима webhook.
+
+Каждый фейковый пользователь последовательно проходит диалог регистрации и записи на прием
+(/start, регистрация, имя, фамилия, контакт, вид животного, слот), пользователи работают одновременно.
+Исходящие запросы бота принимают локальные заглушки Bot API и API ветклиники.
+
+Все в одном процессе (заглушки + приложение webhook + генератор):
+    python -m tgbot.fake_updates bench --users 200
+
+Против отдельно запущенного бота (например, нескольких воркеров за балансировщиком):
+    python -m tgbot.fake_updates stubs --telegram-port 8081 --api-port 8001
+    TELEGRAM_BOT_TOKEN=123456:TEST TELEGRAM_API_SERVER=http://127.0.0.1:8081 BASE_API_URL=http://127.0.0.1:8001 \\
+        BOT_MODE=webhook python tg_bot.py
+    python -m tgbot.fake_updates run --url http://127.0.0.1:8080/telegram/webhook/ --users 200
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import aiohttp
+from aiohttp import web
+
+from tgbot.loadtest import create_stub_app
+from tgbot.webhook import DEFAULT_WEBHOOK_PATH, SECRET_TOKEN_HEADER
+
+FAKE_BOT_TOKEN: str = '123456:TEST'
+_update_ids: Iterator[int] = itertools.count(1)
+
+
+def _user(user_id: int) -> Dict[str, Any]:
+    return {'id': user_id, 'is_bot': False, 'first_name': f'Пользователь {user_id}'}
+
+
+def _message(user_id: int, **fields: Any) -> Dict[str, Any]:
+    return {
+        'message_id': next(_update_ids),
+        'date': int(time.time()),
+        'chat': {'id': user_id, 'type': 'private'},
+        'from': _user(user_id),
+        **fields,
+    }
+
+
+def text_update(user_id: int, text: str) -> Dict[str, Any]:
+    """ Обновление с текстовым сообщением (команды отмечаются сущностью bot_command). """
+    fields: Dict[str, Any] = {'text': text}
+    if text.startswith('/'):
+        fields['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}]
+    return {'update_id': next(_update_ids), 'message': _message(user_id, **fields)}
+
+
+def contact_update(user_id: int, phone_number: str) -> Dict[str, Any]:
+    """ Обновление с контактом пользователя. """
+    contact: Dict[str, Any] = {'phone_number': phone_number, 'first_name': 'Иван', 'user_id': user_id}
+    return {'update_id': next(_update_ids), 'message': _message(user_id, contact=contact)}
+
+
+def callback_update(user_id: int, data: str) -> Dict[str, Any]:
+    """ Обновление с нажатием inline-кнопки. """
+    return {'update_id': next(_update_ids), 'callback_query': {
+        'id': str(next(_update_ids)),
+        'from': _user(user_id),
+        'chat_instance': str(user_id),
+        'message': _message(user_id, text='Выберите действие:'),
+        'data': data,
+    }}
+
+
+def conversation(user_id: int) -> List[Dict[str, Any]]:
+    """ Обновления полного диалога регистрации и записи на прием одного пользователя. """
+    return [
+        text_update(user_id, '/start'),
+        callback_update(user_id, 'registration'),
+        text_update(user_id, 'Иван'),
+        text_update(user_id, 'Иванов'),
+        contact_update(user_id, f'+7900{user_id:07d}'),
+        text_update(user_id, 'Кошка'),
+        text_update(user_id, '25.03.2024 10:00'),
+    ]
+
+
+def create_telegram_stub_app() -> web.Application:
+    """
+    Создает заглушку Bot API, которая успешно отвечает на любой метод бота.
+    """
+    async def method(request: web.Request) -> web.Response:
+        name: str = request.match_info['method'].lower()
+        if name == 'getme':
+            result: Any = {'id': 1, 'is_bot': True, 'first_name': 'Ветклиника', 'username': 'vetclinic_bot'}
+        elif name == 'getwebhookinfo':
+            result = {'url': '', 'has_custom_certificate': False, 'pending_update_count': 0}
+        elif name.startswith('send'):
+            data = await request.post() if request.content_type != 'application/json' else await request.json()
+            chat_id = int(data.get('chat_id', 0))
+            result = {'message_id': next(_update_ids), 'date': int(time.time()),
+                      'chat': {'id': chat_id, 'type': 'private'}, 'text': data.get('text', '')}
+        else:
+            result = True
+        return web.json_response({'ok': True, 'result': result})
+
+    app = web.Application()
+    app.router.add_post('/bot{token}/{method}', method)
+    return app
+
+
+def percentile(values: List[float], share: float) -> float:
+    """ Перцентиль по отсортированному списку значений (ближайший ранг). """
+    if not values:
+        return 0.0
+    index: int = min(len(values) - 1, max(0, int(round(share * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+async def run(url: str, users: int, secret_token: Optional[str] = None) -> None:
+    """
+    Отправляет диалоги фейковых пользователей на webhook и печатает пропускную способность и задержки.
+
+    Args:
+        url (str): URL webhook бота.
+        users (int): Количество одновременных пользователей.
+        secret_token (Optional[str]): Секретный токен webhook.
+    """
+    headers: Dict[str, str] = {SECRET_TOKEN_HEADER: secret_token} if secret_token else {}
+    latencies: List[float] = []
+    errors: int = 0
+
+    async def user(session: aiohttp.ClientSession, user_id: int) -> None:
+        nonlocal errors
+        for update in conversation(user_id):
+            started: float = time.perf_counter()
+            async with session.post(url, json=update, headers=headers) as response:
+                await response.read()
+                if response.status != 200:
+                    errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    connector = aiohttp.TCPConnector(limit=users)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started: float = time.perf_counter()
+        await asyncio.gather(*(user(session, 10_000 + number) for number in range(users)))
+        elapsed: float = time.perf_counter() - started
+
+    latencies.sort()
+    print(f'Пользователей: {users}, обновлений: {len(latencies)}, ошибок: {errors}, время: {elapsed:.2f} с')
+    print(f'Пропускная способность: {len(latencies) / elapsed:.1f} обновлений/с')
+    print(f'Задержка, мс: p50={percentile(latencies, 0.5) * 1000:.1f} '
+          f'p95={percentile(latencies, 0.95) * 1000:.1f} p99={percentile(latencies, 0.99) * 1000:.1f} '
+          f'max={latencies[-1] * 1000 if latencies else 0:.1f}')
+
+
+async def start_site(app: web.Application, port: int, host: str = '127.0.0.1') -> web.AppRunner:
+    """ Запускает приложение aiohttp и возвращает его runner (порт 0 - любой свободный). """
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port, backlog=1024).start()
+    return runner
+
+
+def port_of(runner: web.AppRunner) -> int:
+    return runner.addresses[0][1]
+
+
+async def stubs(telegram_port: int, api_port: int, latency: float) -> None:
+    """ Запускает заглушки Bot API и API ветклиники до остановки процесса. """
+    telegram = await start_site(create_telegram_stub_app(), telegram_port)
+    api = await start_site(create_stub_app(latency), api_port)
+    print(f'TELEGRAM_API_SERVER=http://127.0.0.1:{port_of(telegram)} BASE_API_URL=http://127.0.0.1:{port_of(api)}')
+    await asyncio.Event().wait()
+
+
+async def bench(users: int, latency: float) -> None:
+    """ Запускает заглушки, приложение webhook бота и генератор в одном процессе. """
+    telegram = await start_site(create_telegram_stub_app(), 0)
+    api = await start_site(create_stub_app(latency), 0)
+    os.environ.update({
+        'TELEGRAM_BOT_TOKEN': FAKE_BOT_TOKEN,
+        'TELEGRAM_API_SERVER': f'http://127.0.0.1:{port_of(telegram)}',
+        'BASE_API_URL': f'http://127.0.0.1:{port_of(api)}',
+        'WEBHOOK_URL': '',
+    })
+    os.environ.setdefault('BOT_FSM_STORAGE', 'memory')
+    import tg_bot
+
+    webhook = await start_site(await tg_bot.webhook_app(), 0)
+    try:
+        await run(f'http://127.0.0.1:{port_of(webhook)}{tg_bot.WEBHOOK_PATH}', users, tg_bot.WEBHOOK_SECRET)
+    finally:
+        for runner in (webhook, api, telegram):
+            await runner.cleanup()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Генератор фейковых обновлений Telegram для режима webhook')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Отправить обновления на запущенный webhook')
+    run_parser.add_argument('--url', default=f'http://127.0.0.1:8080{DEFAULT_WEBHOOK_PATH}', help='URL webhook')
+    run_parser.add_argument('--users', type=int, default=100, help='Количество одновременных пользователей')
+    run_parser.add_argument('--secret', default=os.getenv('WEBHOOK_SECRET'), help='Секретный токен webhook')
+
+    stubs_parser = commands.add_parser('stubs', help='Запустить заглушки Bot API и API ветклиники')
+    stubs_parser.add_argument('--telegram-port', type=int, default=8081, help='Порт заглушки Bot API')
+    stubs_parser.add_argument('--api-port', type=int, default=8001, help='Порт заглушки API ветклиники')
+    stubs_parser.add_argument('--latency', type=float, default=0.01, help='Задержка ответа API в секундах')
+
+    bench_parser = commands.add_parser('bench', help='Заглушки, webhook и генератор в одном процессе')
+    bench_parser.add_argument('--users', type=int, default=100, help='Количество одновременных пользователей')
+    bench_parser.add_argument('--latency', type=float, default=0.01, help='Задержка ответа API в секундах')
+
+    arguments = parser.parse_args()
+    if arguments.command == 'run':
+        asyncio.run(run(arguments.url, arguments.users, arguments.secret))
+    elif arguments.command == 'stubs':
+        asyncio.run(stubs(arguments.telegram_port, arguments.api_port, arguments.latency))
+    else:
+        asyncio.run(bench(arguments.users, arguments.latency))
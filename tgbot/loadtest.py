@@ -0,0 +1,151 @@
+"""
+Нагрузочный тест обращений бота к API на локальной заглушке API ветклиники.
+
+Сравнивает пропускную способность при одновременных диалогах пользователей:
+- до: блокирующие вызовы requests внутри корутин (так бот работал раньше);
+- после: асинхронный клиент VetclinicApiClient с общим пулом соединений.
+
+Запуск:
+    python -m tgbot.loadtest --users 100 --latency 0.05
+"""
+import argparse
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, List
+
+import requests
+from aiohttp import web
+
+from tgbot.api_client import VetclinicApiClient
+
+REQUESTS_PER_CONVERSATION: int = 4
+
+
+def create_stub_app(latency: float) -> web.Application:
+    """
+    Создает заглушку API ветклиники, которая отвечает на запросы бота с заданной задержкой.
+
+    Args:
+        latency (float): Задержка ответа в секундах, имитирующая работу API и БД.
+
+    Returns:
+        web.Application: Приложение aiohttp.
+    """
+    animal_types: List[dict] = [{'id': 1, 'name': 'Кошка', 'slug': 'koshka'}]
+    free_slots: List[str] = [f'25.03.2024 {hour:02d}:{minute:02d}' for hour in range(9, 18) for minute in (0, 30)]
+
+    async def respond(payload, status: int = 200) -> web.Response:
+        await asyncio.sleep(latency)
+        return web.json_response(payload, status=status)
+
+    async def register(request: web.Request) -> web.Response:
+        return await respond({'id': 1, **await request.json()}, status=201)
+
+    async def get_animal_types(request: web.Request) -> web.Response:
+        return await respond(animal_types)
+
+    async def get_free_slots(request: web.Request) -> web.Response:
+        return await respond(free_slots)
+
+    async def make_appointment(request: web.Request) -> web.Response:
+        return await respond('Запись на прием произошла успешно', status=201)
+
+    app = web.Application()
+    app.router.add_post('/api/accounts/register/', register)
+    app.router.add_get('/api/vetclinics/animal-types/', get_animal_types)
+    app.router.add_get('/api/vetclinics/free-slots/', get_free_slots)
+    app.router.add_post('/api/vetclinics/make-an-appointment/', make_appointment)
+    return app
+
+
+class StubServer:
+    """
+    Заглушка API в отдельном потоке со своим циклом событий, чтобы блокирующий клиент не останавливал ее.
+    """
+
+    def __init__(self, latency: float, host: str = '127.0.0.1', port: int = 0) -> None:
+        self.latency: float = latency
+        self.host: str = host
+        self.port: int = port
+        self._loop = asyncio.new_event_loop()
+        self._runner: web.AppRunner = web.AppRunner(create_stub_app(latency))
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, self.host, self.port, backlog=1024)
+        self._loop.run_until_complete(site.start())
+        self.port = self._runner.addresses[0][1]
+        self._started.set()
+        self._loop.run_forever()
+
+    def start(self) -> 'StubServer':
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+async def blocking_conversation(base_url: str) -> None:
+    """ Диалог записи на прием с блокирующими вызовами requests, как раньше в tg_bot.py. """
+    requests.post(f'{base_url}/api/accounts/register/', json={'first_name': 'Имя'})
+    requests.get(f'{base_url}/api/vetclinics/animal-types/')
+    requests.get(f'{base_url}/api/vetclinics/free-slots/', params={'animal_type': 1})
+    requests.post(f'{base_url}/api/vetclinics/make-an-appointment/', json={'client': 1})
+
+
+def async_conversation(client: VetclinicApiClient) -> Callable[[str], Awaitable[None]]:
+    """ Диалог записи на прием через асинхронный клиент с общим пулом соединений. """
+    async def conversation(base_url: str) -> None:
+        await client.register({'first_name': 'Имя'})
+        await client.animal_types()
+        await client.free_slots(1)
+        await client.make_appointment({'client': 1})
+    return conversation
+
+
+async def run_users(conversation: Callable[[str], Awaitable[None]], base_url: str, users: int) -> float:
+    """
+    Запускает диалоги пользователей одновременно и возвращает затраченное время в секундах.
+    """
+    started: float = time.perf_counter()
+    await asyncio.gather(*(conversation(base_url) for _ in range(users)))
+    return time.perf_counter() - started
+
+
+async def main(users: int, latency: float) -> None:
+    server = StubServer(latency).start()
+    client = VetclinicApiClient(server.base_url)
+    try:
+        results = [
+            ('до (requests)', await run_users(blocking_conversation, server.base_url, users)),
+            ('после (aiohttp)', await run_users(async_conversation(client), server.base_url, users)),
+        ]
+    finally:
+        await client.close()
+        server.stop()
+
+    print(f'Пользователей: {users}, задержка API: {latency * 1000:.0f} мс')
+    print(f'{"клиент":<18} {"время, с":>10} {"диалогов/с":>12} {"запросов/с":>12}')
+    for name, elapsed in results:
+        print(f'{name:<18} {elapsed:>10.2f} {users / elapsed:>12.1f} '
+              f'{users * REQUESTS_PER_CONVERSATION / elapsed:>12.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Нагрузочный тест обращений бота к API')
+    parser.add_argument('--users', type=int, default=100, help='Количество одновременных пользователей')
+    parser.add_argument('--latency', type=float, default=0.05, help='Задержка ответа API в секундах')
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.users, arguments.latency))
@@ -0,0 +1,382 @@
+"""
+Постоянное FSM-хранилище телеграм-бота в SQL-таблице (PostgreSQL проекта или SQLite).
+
+В отличие от MemoryStorage состояние диалогов (RegistrationState, AppointmentState) переживает перезапуск
+бота и доступно всем его процессам, поэтому бот можно запускать в нескольких воркерах.
+
+- Запись отложенная и пакетная: изменения копятся в памяти процесса и раз в flush_interval секунд
+  записываются в одной транзакции (flush_interval=0 - запись сразу при каждом изменении); при аварийном
+  завершении процесса теряются изменения последних flush_interval секунд.
+- Записываются только измененные поля (состояние, данные, bucket): запись одного воркера не затирает поля,
+  которые за это время изменил другой воркер.
+- Прочитанные записи по умолчанию не кешируются (cache_ttl=0): обновления одного пользователя могут прийти
+  в разные воркеры, и кеш процесса отдал бы устаревшее состояние. Кеш (cache_ttl > 0) допустим только
+  при одном процессе бота.
+- Брошенные диалоги истекают: записи, не менявшиеся ttl секунд, не читаются и периодически удаляются.
+
+Таблица создается автоматически при первом обращении.
+"""
+import asyncio
+import copy
+import json
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from aiogram.contrib.fsm_storage.memory import MemoryStorage
+from aiogram.dispatcher.storage import BaseStorage
+
+from tgbot.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL: float = 24 * 60 * 60
+DEFAULT_FLUSH_INTERVAL: float = 0.05
+DEFAULT_CACHE_TTL: float = 0.0
+DEFAULT_CLEANUP_INTERVAL: float = 10 * 60
+FLUSH_RETRY_DELAY: float = 1.0
+TABLE_NAME: str = 'bot_fsm_state'
+
+CREATE_TABLE_SQL: str = f"""
+CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+    chat_id VARCHAR(32) NOT NULL,
+    user_id VARCHAR(32) NOT NULL,
+    state VARCHAR(255),
+    data TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    updated_at DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (chat_id, user_id)
+)
+"""
+CREATE_INDEX_SQL: str = f'CREATE INDEX IF NOT EXISTS {TABLE_NAME}_updated_at_idx ON {TABLE_NAME} (updated_at)'
+SELECT_SQL: str = (f'SELECT state, data, bucket FROM {TABLE_NAME} '
+                   f'WHERE chat_id = %s AND user_id = %s AND updated_at >= %s')
+INSERT_SQL: str = (f'INSERT INTO {TABLE_NAME} (chat_id, user_id, state, data, bucket, updated_at) '
+                   f'VALUES (%s, %s, %s, %s, %s, %s) ON CONFLICT (chat_id, user_id) DO UPDATE SET ')
+DELETE_EMPTY_SQL: str = (f"DELETE FROM {TABLE_NAME} WHERE chat_id = %s AND user_id = %s "
+                         f"AND state IS NULL AND data = '{{}}' AND bucket = '{{}}'")
+DELETE_EXPIRED_SQL: str = f'DELETE FROM {TABLE_NAME} WHERE updated_at < %s'
+
+Key = Tuple[str, str]
+Record = Dict[str, Any]
+
+FIELDS: Tuple[str, ...] = ('state', 'data', 'bucket')
+EMPTY_COLUMNS: Dict[str, str] = {'state': 'NULL', 'data': "'{}'", 'bucket': "'{}'"}
+
+
+def empty_record() -> Record:
+    """ Запись пользователя без состояния и данных. """
+    return {'state': None, 'data': {}, 'bucket': {}}
+
+
+class SQLStorage(BaseStorage):
+    """
+    FSM-хранилище aiogram в SQL-таблице с отложенной пакетной записью и истечением брошенных диалогов.
+
+    Все обращения к БД выполняются в одном отдельном потоке через одно соединение, поэтому
+    блокирующий драйвер не останавливает цикл событий бота.
+    """
+
+    def __init__(self, connect: Callable[[], Any], placeholder: str = '%s', ttl: Optional[float] = DEFAULT_TTL,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, cache_ttl: float = DEFAULT_CACHE_TTL,
+                 cleanup_interval: float = DEFAULT_CLEANUP_INTERVAL,
+                 clock: Callable[[], float] = time.time) -> None:
+        """
+        Args:
+            connect (Callable[[], Any]): Фабрика DB-API соединения.
+            placeholder (str): Плейсхолдер параметров драйвера ('%s' для psycopg2, '?' для sqlite3).
+            ttl (Optional[float]): Время жизни неизменяемого диалога в секундах (None - без истечения).
+            flush_interval (float): Интервал пакетной записи в секундах (0 - запись сразу).
+            cache_ttl (float): Время жизни прочитанной записи в кеше процесса в секундах (0 - без кеша).
+            cleanup_interval (float): Интервал удаления истекших диалогов из таблицы в секундах.
+            clock (Callable[[], float]): Источник времени (подменяется в тестах).
+        """
+        self.connect: Callable[[], Any] = connect
+        self.ttl: Optional[float] = ttl
+        self.flush_interval: float = flush_interval
+        self.cleanup_interval: float = cleanup_interval
+        self.clock: Callable[[], float] = clock
+        self.placeholder: str = placeholder
+        self._queries: Dict[str, str] = {
+            name: query.replace('%s', placeholder) for name, query in (
+                ('select', SELECT_SQL), ('delete_empty', DELETE_EMPTY_SQL), ('delete_expired', DELETE_EXPIRED_SQL),
+            )
+        }
+        self._connection: Any = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fsm-storage')
+        self._records = TTLCache(ttl=cache_ttl)
+        # Измененные, но еще не записанные поля записей.
+        self._dirty: Dict[Key, Record] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_cleanup: float = clock()
+        self._closed: bool = False
+
+    # Работа с БД (выполняется в потоке хранилища).
+
+    def _get_connection(self) -> Any:
+        if self._connection is None:
+            connection = self.connect()
+            cursor = connection.cursor()
+            cursor.execute(CREATE_TABLE_SQL)
+            cursor.execute(CREATE_INDEX_SQL)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _execute(self, operation: Callable[[Any], Any]) -> Any:
+        """
+        Выполняет операцию в транзакции. При ошибке соединение закрывается и будет открыто заново.
+        """
+        connection = self._get_connection()
+        try:
+            result = operation(connection.cursor())
+            connection.commit()
+            return result
+        except Exception:
+            self._close_connection()
+            raise
+
+    def _close_connection(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                logger.exception('Не удалось закрыть соединение FSM-хранилища')
+            self._connection = None
+
+    def _select(self, key: Key, not_before: float) -> Optional[Tuple[Optional[str], str, str]]:
+        def operation(cursor) -> Optional[Tuple[Optional[str], str, str]]:
+            cursor.execute(self._queries['select'], (*key, not_before))
+            return cursor.fetchone()
+        return self._execute(operation)
+
+    def _upsert_sql(self, fields: Tuple[str, ...]) -> str:
+        """
+        Upsert записи, обновляющий при конфликте только поля fields. Остальные поля истекшей записи
+        очищаются: иначе обновление брошенного диалога вернуло бы его прежние данные.
+        """
+        assignments: List[str] = [f'{field} = excluded.{field}' for field in fields]
+        if self.ttl is not None:
+            assignments += [f'{field} = CASE WHEN {TABLE_NAME}.updated_at < %s THEN {EMPTY_COLUMNS[field]} '
+                            f'ELSE {TABLE_NAME}.{field} END' for field in FIELDS if field not in fields]
+        assignments.append('updated_at = excluded.updated_at')
+        return (INSERT_SQL + ', '.join(assignments)).replace('%s', self.placeholder)
+
+    def _write(self, batch: Dict[Key, Record], now: float, expired_before: Optional[float]) -> None:
+        groups: Dict[Tuple[str, ...], List[tuple]] = {}
+        deletes: List[Key] = []
+        not_before: Optional[float] = now - self.ttl if self.ttl is not None else None
+        for key, changes in batch.items():
+            fields: Tuple[str, ...] = tuple(field for field in FIELDS if field in changes)
+            record: Record = {**empty_record(), **changes}
+            params: tuple = (*key, record['state'], json.dumps(record['data'], ensure_ascii=False),
+                             json.dumps(record['bucket'], ensure_ascii=False), now)
+            if not_before is not None:
+                params += (not_before,) * (len(FIELDS) - len(fields))
+            groups.setdefault(fields, []).append(params)
+            if all(not record[field] for field in fields):
+                deletes.append(key)
+
+        def operation(cursor) -> None:
+            for fields, upserts in groups.items():
+                cursor.executemany(self._upsert_sql(fields), upserts)
+            if deletes:
+                cursor.executemany(self._queries['delete_empty'], deletes)
+            if expired_before is not None:
+                cursor.execute(self._queries['delete_expired'], (expired_before,))
+        self._execute(operation)
+
+    async def _run(self, function: Callable, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    # Записи пользователей.
+
+    @classmethod
+    def _key(cls, chat: Any, user: Any) -> Key:
+        chat, user = cls.check_address(chat=chat, user=user)
+        return str(chat), str(user)
+
+    async def _load(self, key: Key) -> Record:
+        not_before: float = self.clock() - self.ttl if self.ttl is not None else float('-inf')
+        row = await self._run(self._select, key, not_before)
+        if row is None:
+            return empty_record()
+        state, data, bucket = row
+        return {'state': state, 'data': json.loads(data), 'bucket': json.loads(bucket)}
+
+    async def _get_record(self, chat: Any, user: Any) -> Record:
+        """ Запись пользователя из БД (или кеша) с еще не записанными изменениями этого процесса. """
+        key: Key = self._key(chat, user)
+        changes: Record = self._dirty.get(key, {})
+        if len(changes) == len(FIELDS):
+            return dict(changes)
+        record: Record = await self._records.get_or_load(key, lambda: self._load(key))
+        return {**record, **changes}
+
+    async def _update_record(self, chat: Any, user: Any, **fields: Any) -> None:
+        key: Key = self._key(chat, user)
+        self._dirty.setdefault(key, {}).update(fields)
+        cached: Optional[Record] = self._records.get(key)
+        if cached is not None:
+            self._records.set(key, {**cached, **fields})
+        if self.flush_interval <= 0:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        delay: float = self.flush_interval
+        while self._dirty:
+            await asyncio.sleep(delay)
+            try:
+                await self.flush()
+                delay = self.flush_interval
+            except Exception:
+                logger.exception('Не удалось записать состояния FSM, повтор через %s с', FLUSH_RETRY_DELAY)
+                delay = FLUSH_RETRY_DELAY
+
+    async def flush(self) -> None:
+        """
+        Записывает накопленные изменения одной транзакцией и при необходимости удаляет истекшие диалоги.
+
+        При ошибке записи изменения остаются в очереди (поля, измененные после этого, - с новыми значениями).
+        """
+        now: float = self.clock()
+        expired_before: Optional[float] = None
+        if self.ttl is not None and now - self._last_cleanup >= self.cleanup_interval:
+            expired_before = now - self.ttl
+        if not self._dirty and expired_before is None:
+            return
+
+        batch, self._dirty = self._dirty, {}
+        try:
+            await self._run(self._write, batch, now, expired_before)
+        except Exception:
+            for key, changes in batch.items():
+                self._dirty[key] = {**changes, **self._dirty.get(key, {})}
+            raise
+        if expired_before is not None:
+            self._last_cleanup = now
+
+    async def close(self) -> None:
+        """ Записывает накопленные изменения и закрывает соединение. """
+        if self._closed:
+            return
+        self._closed = True
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        try:
+            await self.flush()
+        finally:
+            await self._run(self._close_connection)
+            self._executor.shutdown(wait=False)
+            self._records.clear()
+
+    async def wait_closed(self) -> None:
+        pass
+
+    # Интерфейс BaseStorage.
+
+    async def get_state(self, *, chat=None, user=None, default: Optional[str] = None) -> Optional[str]:
+        record: Record = await self._get_record(chat, user)
+        state: Optional[str] = record['state']
+        return state if state is not None else self.resolve_state(default)
+
+    async def get_data(self, *, chat=None, user=None, default: Optional[dict] = None) -> Dict:
+        record: Record = await self._get_record(chat, user)
+        return copy.deepcopy(record['data'] or default or {})
+
+    async def set_state(self, *, chat=None, user=None, state=None) -> None:
+        await self._update_record(chat, user, state=self.resolve_state(state))
+
+    async def set_data(self, *, chat=None, user=None, data: Optional[Dict] = None) -> None:
+        await self._update_record(chat, user, data=copy.deepcopy(data or {}))
+
+    async def update_data(self, *, chat=None, user=None, data: Optional[Dict] = None, **kwargs) -> None:
+        current: Dict = await self.get_data(chat=chat, user=user)
+        current.update(data or {}, **kwargs)
+        await self._update_record(chat, user, data=current)
+
+    async def reset_state(self, *, chat=None, user=None, with_data: Optional[bool] = True) -> None:
+        fields: Dict[str, Any] = {'state': None, 'data': {}} if with_data else {'state': None}
+        await self._update_record(chat, user, **fields)
+
+    def has_bucket(self) -> bool:
+        return True
+
+    async def get_bucket(self, *, chat=None, user=None, default: Optional[dict] = None) -> Dict:
+        record: Record = await self._get_record(chat, user)
+        return copy.deepcopy(record['bucket'] or default or {})
+
+    async def set_bucket(self, *, chat=None, user=None, bucket: Optional[Dict] = None) -> None:
+        await self._update_record(chat, user, bucket=copy.deepcopy(bucket or {}))
+
+    async def update_bucket(self, *, chat=None, user=None, bucket: Optional[Dict] = None, **kwargs) -> None:
+        current: Dict = await self.get_bucket(chat=chat, user=user)
+        current.update(bucket or {}, **kwargs)
+        await self._update_record(chat, user, bucket=current)
+
+
+def sqlite_storage(path: str, **kwargs: Any) -> SQLStorage:
+    """
+    FSM-хранилище в файле SQLite (для тестов и одного сервера с несколькими процессами бота).
+
+    Args:
+        path (str): Путь к файлу БД (':memory:' - БД в памяти процесса).
+        **kwargs: Параметры SQLStorage.
+    """
+    def connect() -> sqlite3.Connection:
+        connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        if path != ':memory:':
+            connection.execute('PRAGMA journal_mode=WAL')
+        return connection
+    return SQLStorage(connect, placeholder='?', **kwargs)
+
+
+def postgres_storage(**kwargs: Any) -> SQLStorage:
+    """
+    FSM-хранилище в PostgreSQL проекта (параметры подключения из переменных окружения DB_*).
+
+    Args:
+        **kwargs: Параметры SQLStorage.
+    """
+    import psycopg2
+
+    def connect():
+        return psycopg2.connect(dbname=os.getenv('DB_NAME'), user=os.getenv('DB_USER'),
+                                password=os.getenv('DB_PASSWORD'), host=os.getenv('DB_HOST'),
+                                port=os.getenv('DB_PORT'), application_name='vetclinic-bot')
+    return SQLStorage(connect, placeholder='%s', **kwargs)
+
+
+def create_storage(backend: Optional[str] = None) -> BaseStorage:
+    """
+    Создает FSM-хранилище по переменным окружения.
+
+    BOT_FSM_STORAGE: postgres (по умолчанию), sqlite или memory; BOT_FSM_SQLITE_PATH - файл SQLite;
+    BOT_FSM_TTL - время жизни брошенного диалога в секундах; BOT_FSM_FLUSH_INTERVAL - интервал пакетной записи.
+
+    Args:
+        backend (Optional[str]): Тип хранилища (по умолчанию из BOT_FSM_STORAGE).
+
+    Returns:
+        BaseStorage: FSM-хранилище для диспетчера бота.
+
+    Raises:
+        ValueError: Если тип хранилища неизвестен.
+    """
+    backend = backend or os.getenv('BOT_FSM_STORAGE', 'postgres')
+    options: Dict[str, Any] = {
+        'ttl': float(os.getenv('BOT_FSM_TTL', DEFAULT_TTL)),
+        'flush_interval': float(os.getenv('BOT_FSM_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)),
+    }
+    if backend == 'memory':
+        return MemoryStorage()
+    if backend == 'sqlite':
+        return sqlite_storage(os.getenv('BOT_FSM_SQLITE_PATH', 'bot_fsm.sqlite3'), **options)
+    if backend == 'postgres':
+        return postgres_storage(**options)
+    raise ValueError(f'Неизвестное FSM-хранилище: {backend}')
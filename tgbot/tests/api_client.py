@@ -0,0 +1,68 @@
+from unittest import IsolatedAsyncioTestCase
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from tgbot.api_client import ApiUnavailableError, VetclinicApiClient
+
+
+class VetclinicApiClientTests(IsolatedAsyncioTestCase):
+    """
+    Тесты асинхронного клиента API ветклиники на локальной заглушке.
+    """
+
+    async def asyncSetUp(self) -> None:
+        """
+        Запуск заглушки API, которая первые два GET-запроса отвечает 503.
+        """
+        self.calls: int = 0
+
+        async def animal_types(request: web.Request) -> web.Response:
+            self.calls += 1
+            if self.calls <= 2:
+                return web.json_response('Сервис недоступен', status=503)
+            return web.json_response([{'id': 1, 'name': 'Кошка', 'slug': 'koshka'}])
+
+        async def make_appointment(request: web.Request) -> web.Response:
+            self.calls += 1
+            return web.json_response('Сервис недоступен', status=503)
+
+        app = web.Application()
+        app.router.add_get('/api/vetclinics/animal-types/', animal_types)
+        app.router.add_post('/api/vetclinics/make-an-appointment/', make_appointment)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.client = VetclinicApiClient(str(self.server.make_url('')), retries=3, backoff=0.001)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+        await self.server.close()
+
+    async def test_get_is_retried(self) -> None:
+        """
+        Проверяет, что GET повторяется при 503 через одну и ту же сессию.
+        """
+        response = await self.client.animal_types()
+        session = self.client.session
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.data[0]['name'], 'Кошка')
+        self.assertEqual(self.calls, 3)
+
+        await self.client.animal_types()
+        self.assertIs(self.client.session, session)
+
+    async def test_post_is_not_retried(self) -> None:
+        """
+        Проверяет, что неидемпотентный POST не повторяется после ответа сервера.
+        """
+        response = await self.client.make_appointment({'client': 1})
+        self.assertEqual(response.status, 503)
+        self.assertEqual(self.calls, 1)
+
+    async def test_unavailable(self) -> None:
+        """
+        Проверяет ошибку при недоступном API.
+        """
+        await self.server.close()
+        with self.assertRaises(ApiUnavailableError):
+            await self.client.animal_types()
@@ -0,0 +1,58 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from tgbot.cache import TTLCache
+
+
+class TTLCacheTests(IsolatedAsyncioTestCase):
+    """
+    Тесты кеша бота с ограничением по размеру и времени жизни записей.
+    """
+
+    def setUp(self) -> None:
+        """
+        Установка кеша с подменным источником времени.
+        """
+        self.now: float = 0.0
+        self.cache = TTLCache(maxsize=2, ttl=10, clock=lambda: self.now)
+
+    def test_ttl_and_lru(self) -> None:
+        """
+        Проверяет истечение записей и вытеснение давно не использованной записи.
+        """
+        self.cache.set('animal_types', {'Кошка': 1})
+        self.cache.set(('free_slots', 1), ['25.03.2024 10:00'], ttl=5)
+        self.now = 6
+        self.assertNotIn(('free_slots', 1), self.cache)
+        self.assertEqual(self.cache.get('animal_types'), {'Кошка': 1})
+
+        self.cache.set(('free_slots', 2), [])
+        self.cache.get('animal_types')
+        self.cache.set(('free_slots', 3), [])
+        self.assertIn('animal_types', self.cache)
+        self.assertNotIn(('free_slots', 2), self.cache)
+
+        self.cache.invalidate('animal_types')
+        self.assertIsNone(self.cache.get('animal_types'))
+
+    async def test_get_or_load_single_flight(self) -> None:
+        """
+        Проверяет, что одновременные промахи по ключу делают одну загрузку, а None не кешируется.
+        """
+        calls: list = []
+
+        async def loader() -> list:
+            calls.append(1)
+            await asyncio.sleep(0)
+            return ['25.03.2024 10:00']
+
+        results = await asyncio.gather(*(self.cache.get_or_load(('free_slots', 1), loader) for _ in range(10)))
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result == ['25.03.2024 10:00'] for result in results))
+
+        async def failed_loader() -> None:
+            calls.append(1)
+
+        self.assertIsNone(await self.cache.get_or_load('animal_types', failed_loader))
+        self.assertIsNone(await self.cache.get_or_load('animal_types', failed_loader))
+        self.assertEqual(len(calls), 3)
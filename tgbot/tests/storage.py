@@ -0,0 +1,114 @@
+import os
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+
+from tgbot.storage import SQLStorage, TABLE_NAME, sqlite_storage
+
+
+class SQLStorageTests(IsolatedAsyncioTestCase):
+    """
+    Тесты постоянного FSM-хранилища бота на SQLite.
+    """
+
+    def setUp(self) -> None:
+        """
+        Установка файла БД и подменного источника времени.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path: str = os.path.join(directory.name, 'fsm.sqlite3')
+        self.now: float = 1000.0
+
+    def make_storage(self, **kwargs) -> SQLStorage:
+        storage = sqlite_storage(self.path, clock=lambda: self.now, **kwargs)
+        self.addAsyncCleanup(storage.close)
+        return storage
+
+    async def count_rows(self, storage: SQLStorage) -> int:
+        return await storage._run(
+            storage._execute, lambda cursor: cursor.execute(f'SELECT COUNT(*) FROM {TABLE_NAME}').fetchone()[0])
+
+    async def test_state_is_shared_between_storages(self) -> None:
+        """
+        Проверяет, что состояние и данные диалога видны другому процессу бота после записи.
+        """
+        first = self.make_storage(flush_interval=0)
+        second = self.make_storage(flush_interval=0)
+
+        await first.set_state(chat=1, user=1, state='RegistrationState:phone')
+        await first.update_data(chat=1, user=1, first_name='Иван', last_name='Иванов')
+
+        self.assertEqual(await second.get_state(chat=1, user=1), 'RegistrationState:phone')
+        self.assertEqual(await second.get_data(chat=1, user=1), {'first_name': 'Иван', 'last_name': 'Иванов'})
+        self.assertIsNone(await second.get_state(chat=2, user=2))
+
+        await second.finish(chat=1, user=1)
+        self.assertIsNone(await first.get_state(chat=1, user=1))
+        self.assertEqual(await first.get_data(chat=1, user=1), {})
+        self.assertEqual(await self.count_rows(first), 0)
+
+    async def test_interleaved_updates(self) -> None:
+        """
+        Проверяет, что обновления одного пользователя в двух процессах бота не затирают друг друга:
+        каждый процесс читает состояние из БД и записывает только измененные поля.
+        """
+        first = self.make_storage(flush_interval=60)
+        second = self.make_storage(flush_interval=60)
+
+        await first.set_state(chat=1, user=1, state='AppointmentState:choose_animal')
+        await first.update_data(chat=1, user=1, client_id=7)
+        await first.flush()
+        self.assertEqual(await second.get_state(chat=1, user=1), 'AppointmentState:choose_animal')
+
+        await first.set_state(chat=1, user=1, state='AppointmentState:choose_slot')
+        await second.update_data(chat=1, user=1, animal_type_id=2)
+        await first.flush()
+        await second.flush()
+
+        third = self.make_storage()
+        self.assertEqual(await third.get_state(chat=1, user=1), 'AppointmentState:choose_slot')
+        self.assertEqual(await third.get_data(chat=1, user=1), {'client_id': 7, 'animal_type_id': 2})
+        self.assertEqual(await first.get_data(chat=1, user=1), {'client_id': 7, 'animal_type_id': 2})
+
+    async def test_batched_writes(self) -> None:
+        """
+        Проверяет, что изменения копятся в памяти и записываются одним пакетом, а при закрытии не теряются.
+        """
+        storage = self.make_storage(flush_interval=60)
+        for user in range(1, 6):
+            await storage.set_state(chat=user, user=user, state='AppointmentState:choose_slot')
+            await storage.update_data(chat=user, user=user, animal_type_id=user)
+
+        self.assertEqual(await storage.get_data(chat=3, user=3), {'animal_type_id': 3})
+        self.assertEqual(await self.count_rows(storage), 0)
+
+        await storage.flush()
+        self.assertEqual(await self.count_rows(storage), 5)
+
+        await storage.set_state(chat=6, user=6, state='RegistrationState:firstName')
+        await storage.close()
+        restarted = self.make_storage()
+        self.assertEqual(await restarted.get_state(chat=6, user=6), 'RegistrationState:firstName')
+
+    async def test_abandoned_conversations_expire(self) -> None:
+        """
+        Проверяет, что брошенные диалоги не читаются после истечения ttl и удаляются из таблицы.
+        """
+        storage = self.make_storage(flush_interval=0, ttl=100, cleanup_interval=50)
+        await storage.set_state(chat=1, user=1, state='RegistrationState:lastName')
+        self.now += 60
+        await storage.set_state(chat=2, user=2, state='RegistrationState:lastName')
+
+        self.now += 50
+        self.assertIsNone(await storage.get_state(chat=1, user=1))
+        self.assertEqual(await storage.get_state(chat=2, user=2), 'RegistrationState:lastName')
+
+        await storage.flush()
+        self.assertEqual(await self.count_rows(storage), 1)
+
+        # Новое состояние истекшего диалога не возвращает его прежние данные.
+        await storage.update_data(chat=2, user=2, phone='+79000000000')
+        self.now += 200
+        await storage.set_state(chat=2, user=2, state='RegistrationState:firstName')
+        self.assertEqual(await storage.get_data(chat=2, user=2), {})
+        self.assertEqual(await self.make_storage().get_data(chat=2, user=2), {})
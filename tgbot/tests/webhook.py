@@ -0,0 +1,48 @@
+from unittest import IsolatedAsyncioTestCase
+
+from aiogram import Bot, Dispatcher, types
+from aiogram.bot.api import TelegramAPIServer
+from aiohttp.test_utils import TestClient, TestServer
+
+from tgbot.fake_updates import FAKE_BOT_TOKEN, create_telegram_stub_app, text_update
+from tgbot.webhook import SECRET_TOKEN_HEADER, create_webhook_app
+
+
+class WebhookAppTests(IsolatedAsyncioTestCase):
+    """
+    Тесты приложения webhook на заглушке Bot API.
+    """
+
+    async def asyncSetUp(self) -> None:
+        """
+        Запуск заглушки Bot API и приложения webhook с секретным токеном.
+        """
+        self.telegram = TestServer(create_telegram_stub_app())
+        await self.telegram.start_server()
+        bot = Bot(FAKE_BOT_TOKEN, server=TelegramAPIServer.from_base(str(self.telegram.make_url(''))))
+        dispatcher = Dispatcher(bot)
+        self.messages: list = []
+
+        @dispatcher.message_handler(commands=['start'])
+        async def start(message: types.Message) -> None:
+            self.messages.append(message.text)
+            await message.reply('Привет!')
+
+        self.client = TestClient(TestServer(create_webhook_app(dispatcher, path='/hook/', secret_token='secret')))
+        await self.client.start_server()
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+        await self.telegram.close()
+
+    async def test_update_dispatch(self) -> None:
+        """
+        Проверяет, что обновление с верным секретным токеном доходит до обработчика, а без него отклоняется.
+        """
+        forbidden = await self.client.post('/hook/', json=text_update(1, '/start'))
+        self.assertEqual(forbidden.status, 403)
+
+        response = await self.client.post('/hook/', json=text_update(1, '/start'),
+                                          headers={SECRET_TOKEN_HEADER: 'secret'})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(self.messages, ['/start'])
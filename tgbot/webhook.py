@@ -0,0 +1,76 @@
+"""
+Режим webhook для телеграм-бота: aiohttp-приложение, принимающее обновления от Telegram.
+
+Приложение не хранит состояния между запросами (кроме FSM-хранилища диспетчера), поэтому его можно
+запускать в нескольких воркерах за балансировщиком, например:
+
+    gunicorn 'tg_bot:webhook_app' --worker-class aiohttp.GunicornWebWorker --workers 4 --bind 0.0.0.0:8080
+"""
+import hmac
+from typing import Awaitable, Callable, List, Optional
+
+from aiogram import Dispatcher
+from aiogram.dispatcher.webhook import configure_app
+from aiohttp import web
+
+SECRET_TOKEN_HEADER: str = 'X-Telegram-Bot-Api-Secret-Token'
+DEFAULT_WEBHOOK_PATH: str = '/telegram/webhook/'
+
+Callback = Callable[[Dispatcher], Awaitable[None]]
+
+
+def secret_token_middleware(secret_token: str, path: str):
+    """
+    Создает middleware, отклоняющее обновления без секретного токена, указанного при установке webhook.
+
+    Args:
+        secret_token (str): Секретный токен webhook.
+        path (str): Путь webhook, для которого выполняется проверка.
+    """
+    @web.middleware
+    async def middleware(request: web.Request, handler):
+        if request.path == path and not hmac.compare_digest(request.headers.get(SECRET_TOKEN_HEADER, ''),
+                                                            secret_token):
+            raise web.HTTPForbidden()
+        return await handler(request)
+    return middleware
+
+
+def create_webhook_app(dispatcher: Dispatcher, path: str = DEFAULT_WEBHOOK_PATH, webhook_url: Optional[str] = None,
+                       secret_token: Optional[str] = None, on_shutdown: Optional[Callback] = None) -> web.Application:
+    """
+    Создает aiohttp-приложение, которое передает обновления Telegram в диспетчер бота.
+
+    Args:
+        dispatcher (Dispatcher): Диспетчер бота с зарегистрированными обработчиками.
+        path (str): Путь, на который Telegram присылает обновления.
+        webhook_url (Optional[str]): Публичный URL webhook. Если указан, при запуске webhook
+            регистрируется в Telegram (только если он еще не установлен, т.к. воркеров может быть несколько).
+        secret_token (Optional[str]): Секретный токен, который Telegram передает в заголовке каждого обновления.
+        on_shutdown (Optional[Callback]): Дополнительное действие при остановке приложения.
+
+    Returns:
+        web.Application: Приложение aiohttp.
+    """
+    middlewares: List = [secret_token_middleware(secret_token, path)] if secret_token else []
+    app = web.Application(middlewares=middlewares)
+    configure_app(dispatcher, app, path)
+
+    async def startup(app: web.Application) -> None:
+        if webhook_url:
+            webhook_info = await dispatcher.bot.get_webhook_info()
+            if webhook_info.url != webhook_url:
+                await dispatcher.bot.set_webhook(webhook_url, secret_token=secret_token)
+
+    async def shutdown(app: web.Application) -> None:
+        if on_shutdown is not None:
+            await on_shutdown(dispatcher)
+        await dispatcher.storage.close()
+        await dispatcher.storage.wait_closed()
+        session = await dispatcher.bot.get_session()
+        if session is not None:
+            await session.close()
+
+    app.on_startup.append(startup)
+    app.on_shutdown.append(shutdown)
+    return app
@@ -1,6 +1,16 @@
-from django.contrib import admin
+from typing import Optional
+
+from django.contrib import admin, messages
+from django.db import transaction
+from django.http import HttpResponseRedirect
+
+from divanru_vetclinic.paginators import EstimatedCountPaginator
+
 from .forms import AppointmentForm
-from .models import AnimalType, Appointment
+from .models import AnimalType, Appointment, ClinicSchedule, Holiday, ScheduleBreak, SlotCapacity, WorkingHours
+from .occupancy import OccupancyKey, SlotCapacityError, appointment_key, occupancy_key, reserve_occupancy
+from .schedule import get_schedule
+from .services import SlotAlreadyTakenError
 
 
 @admin.register(AnimalType)
@@ -35,11 +45,16 @@ class AppointmentAdmin(admin.ModelAdmin):
     form = AppointmentForm
     list_display = ['client', 'appointment_date', 'animal_type', 'created_at', 'updated_at']
     list_display_links = ['client']
+    list_select_related = ['client', 'animal_type']
     date_hierarchy = 'appointment_date'
+    change_list_template = 'admin/vetclinics/fast_date_hierarchy_change_list.html'
     list_filter = ['animal_type', 'is_active', ]
     search_fields = ['client__first_name', 'client__last_name', 'client__phone']
     readonly_fields = ['created_at', 'updated_at']
-    ordering = ['appointment_date']
+    # id в сортировке совпадает с индексом appointment_date_id_idx, иначе Django добавит -pk.
+    ordering = ['appointment_date', 'id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     fieldsets = (
         ('Основная информация', {
             'fields': (('client', 'animal_type'),)
@@ -54,3 +69,75 @@ class AppointmentAdmin(admin.ModelAdmin):
 
     class Media:
         js = ('admin/js/appointment_date_form.js',)
+
+    def save_model(self, request, obj: Appointment, form, change: bool) -> None:
+        """
+        Сохраняет запись, занимая ее новый слот в счетчике занятости с учетом вместимости, как vetclinics.services:
+        проверка формы только читает занятость, и слот могла заполнить параллельная запись.
+
+        Raises:
+            SlotAlreadyTakenError: Если слот заполнен.
+        """
+        state: Optional[tuple] = None if obj._state.adding else getattr(obj, '_occupancy_state', None)
+        old_key: Optional[OccupancyKey] = occupancy_key(*state) if state is not None else None
+        new_key: Optional[OccupancyKey] = appointment_key(obj)
+        with transaction.atomic():
+            if new_key is not None and new_key != old_key and (state is not None or obj._state.adding):
+                try:
+                    reserve_occupancy({new_key: 1}, get_schedule().capacity)
+                except SlotCapacityError:
+                    raise SlotAlreadyTakenError()
+                obj._occupancy_reserved = True
+            super().save_model(request, obj, form, change)
+
+    def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
+        """ Возвращает на форму с сообщением, если слот заполнили между проверкой формы и сохранением. """
+        try:
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        except SlotAlreadyTakenError as e:
+            self.message_user(request, e.message, messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
+
+
+class WorkingHoursInline(admin.TabularInline):
+    model = WorkingHours
+    extra = 0
+    max_num = 7
+
+
+class ScheduleBreakInline(admin.TabularInline):
+    model = ScheduleBreak
+    extra = 0
+
+
+class HolidayInline(admin.TabularInline):
+    model = Holiday
+    extra = 0
+
+
+class SlotCapacityInline(admin.TabularInline):
+    model = SlotCapacity
+    extra = 0
+    autocomplete_fields = ['animal_type']
+
+
+@admin.register(ClinicSchedule)
+class ClinicScheduleAdmin(admin.ModelAdmin):
+    """ Админ-панель расписания клиники """
+
+    list_display = ['name', 'slot_minutes', 'capacity', 'is_active', 'updated_at']
+    list_display_links = ['name']
+    list_filter = ['is_active']
+    readonly_fields = ['created_at', 'updated_at']
+    inlines = [WorkingHoursInline, ScheduleBreakInline, HolidayInline, SlotCapacityInline]
+    fieldsets = (
+        ('Основная информация', {
+            'fields': ('name', ('slot_minutes', 'capacity'))
+        }),
+        ('Статус расписания', {
+            'fields': ('is_active',)
+        }),
+        ('Даты', {
+            'fields': (('created_at', 'updated_at'),)
+        }),
+    )
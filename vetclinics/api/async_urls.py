@@ -0,0 +1,10 @@
+from django.urls import path
+from .async_views import AppointmentAsyncAPIView, FreeSlotsAsyncAPIView, AnimalTypeAsyncAPIView
+
+app_name = 'vetclinics-async'
+
+urlpatterns = [
+    path('animal-types/', AnimalTypeAsyncAPIView.as_view(), name='animal-types'),
+    path('free-slots/', FreeSlotsAsyncAPIView.as_view(), name='free-slots'),
+    path('make-an-appointment/', AppointmentAsyncAPIView.as_view(), name='make-an-appointment'),
+]
@@ -0,0 +1,105 @@
+from calendar import timegm
+from itertools import islice
+from typing import Iterator, Optional
+
+from datetime import date, datetime, timedelta
+
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from rest_framework import status
+
+from divanru_vetclinic.async_api import AsyncAPIView, json_response, parse_json
+from divanru_vetclinic.db_routers import read_from_replica
+from vetclinics.availability import Availability
+from vetclinics.caches import AnimalTypeCatalogue, aget_animal_type_catalogue
+from vetclinics.formats import format_slots
+from vetclinics.occupancy import aload_availability
+from vetclinics.schedule import aget_schedule
+from vetclinics.services import BookingError, abook_appointment
+
+from .serializers import AppointmentSerializer, FreeSlotsQuerySerializer
+
+
+class AppointmentAsyncAPIView(AsyncAPIView):
+    """ Async-версия AppointmentAPIView. """
+
+    async def post(self, request: HttpRequest) -> HttpResponse:
+        """
+        POST-запрос для записи на прием в ветеринарную клинику (параметры и ответы как у AppointmentAPIView).
+
+        Расписание для проверки времени записи берется заранее async-методом и передается сериализатору
+        в контексте, поэтому проверка данных не обращается к БД.
+        """
+        data = parse_json(request)
+        serializer = AppointmentSerializer(data=data, context={'schedule': await aget_schedule()})
+        if serializer.is_valid():
+            try:
+                await abook_appointment(
+                    client_id=serializer.validated_data['client'],
+                    appointment_date=serializer.validated_data['appointment_date'],
+                    animal_type_id=serializer.validated_data['animal_type'],
+                )
+            except BookingError as e:
+                return json_response(e.message, status=status.HTTP_400_BAD_REQUEST)
+            return json_response('Запись на прием произошла успешно', status=status.HTTP_201_CREATED)
+        return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class FreeSlotsAsyncAPIView(AsyncAPIView):
+    """ Async-версия FreeSlotsAPIView. """
+
+    @read_from_replica
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        """
+        Получение списка свободных слотов для записи на приём (параметры и ответы как у FreeSlotsAPIView).
+        """
+        now: datetime = timezone.now()
+        query_serializer = FreeSlotsQuerySerializer(data=request.GET, context={'today': timezone.localdate(now)})
+        if not query_serializer.is_valid():
+            return json_response(query_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params: dict = query_serializer.validated_data
+
+        start_day: date = params['date_from']
+        end_day: date = params['date_to'] + timedelta(days=1)
+
+        availability: Availability = await aload_availability(start_day, end_day, params.get('animal_type'))
+
+        free_slots: Iterator[str] = format_slots(availability.iter_free_slots(start_day, end_day, not_before=now))
+        limit: Optional[int] = params.get('limit')
+        if limit is not None:
+            offset: int = (params['page'] - 1) * limit
+            free_slots = islice(free_slots, offset, offset + limit)
+
+        return json_response(list(free_slots), status=status.HTTP_200_OK, headers={
+            'X-Total-Count': str(availability.count_free(start_day, end_day, not_before=now)),
+        })
+
+
+class AnimalTypeAsyncAPIView(AsyncAPIView):
+    """ Async-версия AnimalTypeAPIView. """
+
+    @read_from_replica
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        """
+        Получение списка всех типов животных (ответы как у AnimalTypeAPIView).
+
+        Условный запрос обрабатывается так же, как декоратором condition: при совпадении If-None-Match
+        или If-Modified-Since возвращается 304 NOT MODIFIED. Декоратор condition вызывает функции ETag
+        синхронно, поэтому здесь справочник читается из кеша один раз async-методом.
+        """
+        catalogue: AnimalTypeCatalogue = await aget_animal_type_catalogue()
+        etag: Optional[str] = quote_etag(catalogue.etag) if catalogue.etag else None
+        last_modified: Optional[int] = timegm(catalogue.last_modified.utctimetuple()) \
+            if catalogue.last_modified else None
+
+        response: Optional[HttpResponse] = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = json_response(catalogue.data, status=status.HTTP_200_OK)
+        if last_modified and not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(last_modified)
+        if etag:
+            response.headers.setdefault('ETag', etag)
+        return response
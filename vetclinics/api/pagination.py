@@ -0,0 +1,65 @@
+"""
+Keyset-пагинация (по курсору) по паре (appointment_date, id).
+
+В отличие от OFFSET страница выбирается условием по индексу appointment_date_id_idx, поэтому стоимость
+запроса не растет с номером страницы, а вставка записей между запросами не сдвигает выдачу.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from django.db.models import Q, QuerySet
+
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(appointment_date: datetime, appointment_id: int) -> str:
+    """ Кодирует позицию последней записи страницы в непрозрачную строку для query-параметра. """
+    payload: bytes = json.dumps([appointment_date.isoformat(), appointment_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Декодирует курсор, полученный от encode_cursor.
+
+    Raises:
+        ValueError: Если курсор поврежден.
+    """
+    try:
+        payload: bytes = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        appointment_date, appointment_id = json.loads(payload)
+        value: datetime = datetime.fromisoformat(appointment_date)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Неверный курсор') from e
+    if value.tzinfo is None or not isinstance(appointment_id, int):
+        raise ValueError('Неверный курсор')
+    return value, appointment_id
+
+
+def keyset_page(queryset: QuerySet, cursor: Optional[Cursor], limit: int) -> Tuple[List, Optional[str]]:
+    """
+    Выбирает страницу записей после курсора одним запросом.
+
+    Args:
+        queryset (QuerySet): Записи на прием с примененными фильтрами.
+        cursor (Optional[Cursor]): Позиция последней записи предыдущей страницы.
+        limit (int): Размер страницы.
+
+    Returns:
+        Tuple[List, Optional[str]]: Записи страницы и курсор следующей страницы (None, если страница последняя).
+    """
+    queryset = queryset.order_by('appointment_date', 'id')
+    if cursor is not None:
+        appointment_date, appointment_id = cursor
+        # Условие appointment_date >= ... дублирует OR, но позволяет использовать индекс как диапазон.
+        queryset = queryset.filter(
+            Q(appointment_date__gt=appointment_date) | Q(appointment_date=appointment_date, id__gt=appointment_id),
+            appointment_date__gte=appointment_date,
+        )
+    page: List = list(queryset[:limit + 1])
+    if len(page) <= limit:
+        return page, None
+    page = page[:limit]
+    return page, encode_cursor(page[-1].appointment_date, page[-1].id)
@@ -1,10 +1,14 @@
 from django.utils import timezone
-from datetime import datetime
-from django.utils.timezone import make_aware
+from datetime import date, datetime, timedelta
+from typing import Optional
 
 from rest_framework import serializers
 
+from vetclinics.availability import aware_local, slot_index
+from vetclinics.formats import format_datetime, parse_datetime
+from vetclinics.api.pagination import Cursor, decode_cursor
 from vetclinics.models import Appointment, AnimalType
+from vetclinics.schedule import CompiledSchedule, get_schedule
 
 
 class CustomDateTimeField(serializers.Field):
@@ -16,7 +20,7 @@ class CustomDateTimeField(serializers.Field):
     def to_representation(self, value: datetime) -> str:
         """
         Переопределение метода.
-        Преобразует объект datetime в строку в формате 'дд.мм.гггг чч:мм'.
+        Преобразует объект datetime в строку в формате 'дд.мм.гггг чч:мм' (aware-время - в часовом поясе клиники).
 
         Args:
             value (datetime): Объект datetime, который необходимо преобразовать.
@@ -24,7 +28,9 @@ class CustomDateTimeField(serializers.Field):
         Returns:
             str: Строковое представление даты и времени в указанном формате.
         """
-        return value.strftime('%d.%m.%Y %H:%M')
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return format_datetime(value)
 
     def to_internal_value(self, data: str) -> datetime:
         """
@@ -40,8 +46,8 @@ class CustomDateTimeField(serializers.Field):
             serializers.ValidationError: Если строка не соответствует ожидаемому формату.
         """
         try:
-            return datetime.strptime(data, '%d.%m.%Y %H:%M')
-        except ValueError:
+            return parse_datetime(data)
+        except (TypeError, ValueError):
             raise serializers.ValidationError("Неверный формат даты и времени. Используйте, пожалуйста,"
                                               " формат 'дд.мм.гггг чч:мм'")
 
@@ -59,7 +65,10 @@ class AppointmentSerializer(serializers.Serializer):
     def validate_appointment_date(self, value: datetime) -> datetime:
         """
         Функция валидирует дату и время записи на прием.
-        Также проверяет, что дата и время записи на прием не меньше текущего момента.
+        Также проверяет, что дата и время записи на прием не меньше текущего момента
+        (кроме импорта исторических записей с флагом allow_past в контексте сериализатора).
+        Часы работы берутся из расписания клиники, которое один раз на сериализатор запоминается
+        в контексте 'schedule'.
 
         Args:
             value (datetime): Дата и время записи на прием.
@@ -70,20 +79,29 @@ class AppointmentSerializer(serializers.Serializer):
         Raises:
             serializers.ValidationError: Если дата и время записи на прием в прошедшем времени.
             serializers.ValidationError: Если минуты не равны 00 или 30.
-            serializers.ValidationError: Если время выходит за пределы рабочего времени ветклиники.
-            serializers.ValidationError: Если формат даты и времени неверный.
+            serializers.ValidationError: Если клиника в этот день не работает.
+            serializers.ValidationError: Если время не совпадает с началом приема в часы работы ветклиники.
+            serializers.ValidationError: Если такого местного времени нет из-за перевода часов.
         """
         try:
-            appointment_date = make_aware(value)
-            if appointment_date <= timezone.now():
-                raise serializers.ValidationError('Нельзя записаться на прием в прошедшем времени')
-            if appointment_date.minute not in [0, 30]:
-                raise serializers.ValidationError('Минуты должны быть равны 00 или 30')
-            if not (9 <= appointment_date.hour < 18):
-                raise serializers.ValidationError('Время записи на прием должно быть между 09:00 и 18:00')
-            return appointment_date
+            appointment_date = aware_local(value, timezone.get_current_timezone())
         except ValueError:
-            raise serializers.ValidationError('Неверный формат даты и времени')
+            raise serializers.ValidationError('Такого времени нет в часовом поясе клиники (перевод часов)')
+        if not self.context.get('allow_past') and appointment_date <= timezone.now():
+            raise serializers.ValidationError('Нельзя записаться на прием в прошедшем времени')
+        if slot_index(appointment_date) is None:
+            raise serializers.ValidationError('Минуты должны быть равны 00 или 30')
+        schedule: Optional[CompiledSchedule] = self.context.get('schedule')
+        if schedule is None:
+            schedule = self.context['schedule'] = get_schedule()
+        if not schedule.is_working_slot(appointment_date):
+            hours: str = schedule.hours(appointment_date.date())
+            if not hours:
+                raise serializers.ValidationError('В этот день клиника не работает')
+            raise serializers.ValidationError(
+                f'Время записи на прием должно совпадать с началом приема в часы работы клиники: {hours}'
+            )
+        return appointment_date
 
     def create(self, validated_data: dict) -> Appointment:
         """
@@ -98,6 +116,113 @@ class AppointmentSerializer(serializers.Serializer):
         return Appointment.objects.create(**validated_data)
 
 
+class FreeSlotsQuerySerializer(serializers.Serializer):
+    """
+    Сериализатор query-параметров запроса свободных слотов.
+
+    Даты передаются в формате 'дд.мм.гггг', конец периода включается в выборку.
+    По умолчанию возвращаются все свободные слоты на 7 дней вперед, учитывая текущий
+    (текущий день можно передать в контексте 'today', чтобы не вычислять его повторно).
+    """
+    DEFAULT_HORIZON_DAYS: int = 7
+    MAX_HORIZON_DAYS: int = 60
+    MAX_LIMIT: int = 500
+
+    animal_type = serializers.IntegerField(required=False, min_value=1,
+                                           help_text='ID вида животного. Без него слот занят при любой записи')
+    date_from = serializers.DateField(required=False, input_formats=['%d.%m.%Y'],
+                                      help_text='Начало периода в формате дд.мм.гггг (по умолчанию сегодня)')
+    date_to = serializers.DateField(required=False, input_formats=['%d.%m.%Y'],
+                                    help_text='Конец периода включительно в формате дд.мм.гггг')
+    page = serializers.IntegerField(required=False, min_value=1, default=1, help_text='Номер страницы')
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=MAX_LIMIT,
+                                     help_text='Количество слотов на странице (по умолчанию все)')
+
+    def validate(self, attrs: dict) -> dict:
+        """
+        Проставляет границы периода по умолчанию и проверяет их корректность.
+
+        Args:
+            attrs (dict): Провалидированные query-параметры.
+
+        Returns:
+            dict: Параметры с заполненными date_from и date_to.
+
+        Raises:
+            serializers.ValidationError: Если конец периода раньше начала или период слишком длинный.
+        """
+        date_from: date = attrs.get('date_from') or self.context.get('today') or timezone.localdate()
+        date_to: date = attrs.get('date_to') or date_from + timedelta(days=self.DEFAULT_HORIZON_DAYS - 1)
+        if date_to < date_from:
+            raise serializers.ValidationError({'date_to': 'Конец периода не может быть раньше начала'})
+        if (date_to - date_from).days >= self.MAX_HORIZON_DAYS:
+            raise serializers.ValidationError(
+                {'date_to': f'Период не может быть длиннее {self.MAX_HORIZON_DAYS} дней'}
+            )
+        attrs['date_from'] = date_from
+        attrs['date_to'] = date_to
+        return attrs
+
+
+class AppointmentListQuerySerializer(serializers.Serializer):
+    """
+    Сериализатор query-параметров списка записей на прием.
+
+    Даты передаются в формате 'дд.мм.гггг', конец периода включается в выборку.
+    """
+    DEFAULT_LIMIT: int = 50
+    MAX_LIMIT: int = 500
+
+    date_from = serializers.DateField(required=False, input_formats=['%d.%m.%Y'],
+                                      help_text='Начало периода в формате дд.мм.гггг')
+    date_to = serializers.DateField(required=False, input_formats=['%d.%m.%Y'],
+                                    help_text='Конец периода включительно в формате дд.мм.гггг')
+    client = serializers.IntegerField(required=False, min_value=1, help_text='ID клиента')
+    animal_type = serializers.IntegerField(required=False, min_value=1, help_text='ID вида животного')
+    is_active = serializers.BooleanField(required=False, allow_null=True, default=None,
+                                         help_text='Только активные (true) или отмененные (false) записи')
+    cursor = serializers.CharField(required=False, help_text='Курсор следующей страницы из поля next')
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=MAX_LIMIT, default=DEFAULT_LIMIT,
+                                     help_text='Количество записей на странице')
+
+    def validate_cursor(self, value: str) -> Cursor:
+        """
+        Декодирует курсор страницы.
+
+        Raises:
+            serializers.ValidationError: Если курсор поврежден.
+        """
+        try:
+            return decode_cursor(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+
+    def validate(self, attrs: dict) -> dict:
+        """
+        Проверяет, что конец периода не раньше начала.
+
+        Raises:
+            serializers.ValidationError: Если конец периода раньше начала.
+        """
+        if attrs.get('date_from') and attrs.get('date_to') and attrs['date_to'] < attrs['date_from']:
+            raise serializers.ValidationError({'date_to': 'Конец периода не может быть раньше начала'})
+        return attrs
+
+
+class AppointmentListSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор записи на прием для списка (клиент и вид животного выбираются тем же запросом).
+    """
+    appointment_date = CustomDateTimeField()
+    client_name = serializers.CharField(source='client.get_full_name')
+    animal_type_name = serializers.CharField(source='animal_type.name')
+
+    class Meta:
+        model = Appointment
+        fields = ['id', 'client', 'client_name', 'appointment_date', 'animal_type', 'animal_type_name', 'is_active']
+        read_only_fields = fields
+
+
 class AnimalTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = AnimalType
@@ -1,5 +1,6 @@
 from django.urls import path
-from .views import AppointmentAPIView, FreeSlotsAPIView, AnimalTypeAPIView
+from .views import (AppointmentAPIView, AppointmentBatchAPIView, AppointmentListAPIView, FreeSlotsAPIView,
+                    AnimalTypeAPIView)
 
 app_name = 'vetclinics'
 
@@ -7,4 +8,6 @@ urlpatterns = [
     path('animal-types/', AnimalTypeAPIView.as_view(), name='animal-types'),
     path('free-slots/', FreeSlotsAPIView.as_view(), name='free-slots'),
     path('make-an-appointment/', AppointmentAPIView.as_view(), name='make-an-appointment'),
+    path('appointments/', AppointmentListAPIView.as_view(), name='appointments'),
+    path('appointments/batch/', AppointmentBatchAPIView.as_view(), name='appointments-batch'),
 ]
@@ -1,20 +1,34 @@
-from typing import List
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
 
-from datetime import timedelta, datetime
+from datetime import date, datetime, time, timedelta
 
+from django.db import IntegrityError, OperationalError
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 
-from rest_framework import status
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
-from accounts.models import Account
-from vetclinics.models import AnimalType, Appointment
+from divanru_vetclinic.db_routers import read_from_replica
+from vetclinics.availability import Availability
+from vetclinics.caches import get_animal_type_catalogue
+from vetclinics.formats import format_slots
+from vetclinics.models import Appointment
+from vetclinics.occupancy import SlotCapacityError, load_availability
+from vetclinics.schedule import get_schedule
+from vetclinics.services import MAX_BOOKING_BATCH_SIZE, BookingError, book_appointment, book_appointments
 
-from .serializers import AppointmentSerializer, AnimalTypeSerializer
+from .pagination import keyset_page
+from .serializers import (AppointmentListQuerySerializer, AppointmentListSerializer, AppointmentSerializer,
+                          FreeSlotsQuerySerializer)
 
 
 VETCLINICS = 'Ветеринарная клиника'
@@ -53,43 +67,188 @@ class AppointmentAPIView(APIView):
 
         serializer = AppointmentSerializer(data=request.data)
         if serializer.is_valid():
-            client_id: int = serializer.validated_data['client']
-            appointment_date: str = serializer.validated_data['appointment_date']
-            animal_type_id: int = serializer.validated_data['animal_type']
+            try:
+                book_appointment(
+                    client_id=serializer.validated_data['client'],
+                    appointment_date=serializer.validated_data['appointment_date'],
+                    animal_type_id=serializer.validated_data['animal_type'],
+                )
+            except BookingError as e:
+                return Response(e.message, status=status.HTTP_400_BAD_REQUEST)
+            return Response('Запись на прием произошла успешно', status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-            client, client_error = self.get_object_or_error(Account, id=client_id)
-            animal_type, animal_type_error = self.get_object_or_error(AnimalType, id=animal_type_id)
 
-            if client_error:
-                return client_error
-            if animal_type_error:
-                return animal_type_error
+class AppointmentBatchAPIView(APIView):
+    # Пакетная запись - инструмент регистратуры: записывает любых клиентов на сотни слотов за запрос.
+    permission_classes = [IsAdminUser]
 
-            if Appointment.objects.filter(appointment_date=appointment_date, animal_type_id=animal_type_id).exists():
-                return Response('Выбранный слот уже занят', status=status.HTTP_400_BAD_REQUEST)
+    @swagger_auto_schema(
+        tags=[VETCLINICS],
+        request_body=AppointmentSerializer(many=True),
+        responses={
+            status.HTTP_201_CREATED: 'Все записи на прием созданы',
+            status.HTTP_207_MULTI_STATUS: 'Часть записей не создана, результат по каждой записи',
+            status.HTTP_400_BAD_REQUEST: 'Ожидается непустой список записей',
+            status.HTTP_403_FORBIDDEN: 'Доступно только сотрудникам (is_staff)',
+            status.HTTP_409_CONFLICT: 'Слоты пачки заполнялись параллельными записями, пачка не создана',
+            status.HTTP_503_SERVICE_UNAVAILABLE: 'Конфликты блокировок в БД, пачка не создана',
+        },
+        operation_summary='Пакетная запись на приём в ветклинику',
+    )
+    def post(self, request) -> Response:
+        """
+        POST-запрос для записи на прием нескольких животных или расписания регистратуры одним запросом.
+        Доступен только сотрудникам клиники (is_staff).
 
-            serializer.save(client=client, animal_type=animal_type)
-            return Response('Запись на прием произошла успешно', status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        Параметры запроса - JSON-список записей той же структуры, что и для одиночной записи на прием
+        (не более 500 записей). Записи, не прошедшие проверку, не мешают созданию остальных.
 
-    def get_object_or_error(self, model, **kwargs):
+        Пример запроса:
+        - [
+            {"client": 1, "appointment_date": "25.03.2024 10:00", "animal_type": 1},
+            {"client": 1, "appointment_date": "25.03.2024 10:00", "animal_type": 2}
+          ]
+
+        Пример ответа:
+        Возвращается статус 201 CREATED, если созданы все записи, иначе 207 MULTI-STATUS, и результат
+        по каждой записи в порядке запроса:
+        - [
+            {"index": 0, "status": 201, "id": 10},
+            {"index": 1, "status": 400, "errors": "Выбранный слот уже занят"}
+          ]
+        Если передан не список или список пуст либо слишком длинный, возвращается статус 400 BAD REQUEST.
+        Если пачку не удалось создать за все повторные попытки, ни одна запись не создается и возвращается
+        статус 409 CONFLICT (слоты заполнялись параллельными записями) или 503 SERVICE UNAVAILABLE
+        (конфликты блокировок в БД); запрос можно повторить.
+        """
+        items = request.data
+        if not isinstance(items, list) or not 0 < len(items) <= MAX_BOOKING_BATCH_SIZE:
+            return Response(f'Ожидается список от 1 до {MAX_BOOKING_BATCH_SIZE} записей',
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        valid: List[int] = []
+        validated_data: List[dict] = []
+        serializer = AppointmentSerializer(context={'schedule': get_schedule()})
+        for index, item in enumerate(items):
+            try:
+                validated_data.append(serializer.run_validation(item))
+                valid.append(index)
+            except serializers.ValidationError as e:
+                results[index] = {'index': index, 'status': status.HTTP_400_BAD_REQUEST, 'errors': e.detail}
+
+        if validated_data:
+            try:
+                booked: List[Any] = book_appointments(validated_data)
+            except (IntegrityError, SlotCapacityError):
+                return Response('Слоты пачки заполнялись параллельными записями, повторите запрос',
+                                status=status.HTTP_409_CONFLICT)
+            except OperationalError:
+                return Response('База данных перегружена, повторите запрос позже',
+                                status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            for index, result in zip(valid, booked):
+                if isinstance(result, BookingError):
+                    results[index] = {'index': index, 'status': status.HTTP_400_BAD_REQUEST, 'errors': result.message}
+                else:
+                    results[index] = {'index': index, 'status': status.HTTP_201_CREATED, 'id': result.id}
+
+        created: bool = all(result['status'] == status.HTTP_201_CREATED for result in results)
+        return Response(results, status=status.HTTP_201_CREATED if created else status.HTTP_207_MULTI_STATUS)
+
+
+class AppointmentListAPIView(APIView):
+    # Список отдает записи всех клиентов с их именами - рабочий экран регистратуры, только для сотрудников.
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        tags=[VETCLINICS],
+        operation_summary='Список записей на приём',
+        query_serializer=AppointmentListQuerySerializer,
+        responses={
+            200: openapi.Response(
+                description='Страница записей на прием и ссылка на следующую страницу',
+                schema=openapi.Schema(type=openapi.TYPE_OBJECT, properties={
+                    'next': openapi.Schema(type=openapi.TYPE_STRING, x_nullable=True),
+                    'results': openapi.Schema(type=openapi.TYPE_ARRAY,
+                                              items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                }),
+            ),
+            400: 'Ошибка',
+            403: 'Доступно только сотрудникам (is_staff)',
+        },
+    )
+    def get(self, request) -> Response:
         """
-        Функция, проверяющее существование объектов в БД по заданным аргументам в сегменте моделей.
+        Получение списка записей на приём, упорядоченного по дате и времени записи. Доступно только сотрудникам
+        клиники (is_staff).
+
+        Каждая страница выбирается одним запросом вместе с клиентом и видом животного, страницы
+        переключаются по курсору (keyset-пагинация), поэтому стоимость запроса не зависит ни от номера
+        страницы, ни от количества записей за период.
+
+        Параметры запроса (все необязательные):
+        - date_from (str), date_to (str): Период 'дд.мм.гггг', конец периода включительно.
+        - client (int): ID клиента.
+        - animal_type (int): ID вида животного.
+        - is_active (bool): Только активные или только отмененные записи.
+        - limit (int): Количество записей на странице, по умолчанию 50.
+        - cursor (str): Курсор следующей страницы (передается в ссылке next).
+
+        Пример ответа:
+        - {
+            "next": "http://127.0.0.1:8000/api/vetclinics/appointments/?cursor=...",
+            "results": [
+                {
+                    "id": 1,
+                    "client": 1,
+                    "client_name": "Имя Фамилия",
+                    "appointment_date": "25.03.2024 10:00",
+                    "animal_type": 1,
+                    "animal_type_name": "Кошка",
+                    "is_active": true
+                }
+            ]
+          }
         """
-        try:
-            obj = model.objects.get(**kwargs)
-            return obj, None
-        except model.DoesNotExist:
-            return None, Response(
-                f'{model._meta.verbose_name} с указанным ID не существует',
-                status=status.HTTP_400_BAD_REQUEST,
+        query_serializer = AppointmentListQuerySerializer(data=request.query_params)
+        if not query_serializer.is_valid():
+            return Response(query_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params: dict = query_serializer.validated_data
+
+        tz = timezone.get_current_timezone()
+        appointments = Appointment.objects.select_related('client', 'animal_type').only(
+            'id', 'appointment_date', 'is_active',
+            'client', 'client__first_name', 'client__last_name',
+            'animal_type', 'animal_type__name',
+        )
+        if 'date_from' in params:
+            appointments = appointments.filter(
+                appointment_date__gte=datetime.combine(params['date_from'], time.min, tzinfo=tz)
+            )
+        if 'date_to' in params:
+            appointments = appointments.filter(
+                appointment_date__lt=datetime.combine(params['date_to'] + timedelta(days=1), time.min, tzinfo=tz)
             )
+        if 'client' in params:
+            appointments = appointments.filter(client_id=params['client'])
+        if 'animal_type' in params:
+            appointments = appointments.filter(animal_type_id=params['animal_type'])
+        if params['is_active'] is not None:
+            appointments = appointments.filter(is_active=params['is_active'])
+
+        page, next_cursor = keyset_page(appointments, params.get('cursor'), params['limit'])
+        return Response({
+            'next': replace_query_param(request.build_absolute_uri(), 'cursor', next_cursor) if next_cursor else None,
+            'results': AppointmentListSerializer(page, many=True).data,
+        }, status=status.HTTP_200_OK)
 
 
 class FreeSlotsAPIView(APIView):
     @swagger_auto_schema(
         tags=[VETCLINICS],
         operation_summary='Свободные слоты',
+        query_serializer=FreeSlotsQuerySerializer,
         responses={
             200: openapi.Response(
                 description='Список свободных слотов',
@@ -101,36 +260,57 @@ class FreeSlotsAPIView(APIView):
             400: 'Ошибка',
         },
     )
+    @read_from_replica
     def get(self, request) -> Response:
         """
-        Получение списка свободных слотов для записи на приём на 7 дней вперед, учитывая текущий.
-        Преполагается, что часы работы клиники 09:00-18:00 без перерыва.
-        Предполагается, что на каждый прием тратят 30 минут, поэтому свободные слоты с шагом 30 минут.
+        Получение списка свободных слотов для записи на приём.
+        Часы работы, перерывы, нерабочие дни, длительность приема и вместимость слота берутся
+        из расписания клиники (по умолчанию - каждый день 09:00-18:00, прием 30 минут, одно животное вида в слот).
+        Занятость читается из предрасчитанной таблицы SlotOccupancy (строки только занятых слотов периода),
+        а не из записей на прием.
+
+        Параметры запроса (все необязательные):
+        - animal_type (int): ID вида животного. Слот считается занятым, когда заполнена его вместимость
+          для этого вида животного, как и при записи на прием. Без параметра слот занят, если на него есть
+          любая запись.
+        - date_from (str): Начало периода 'дд.мм.гггг', по умолчанию сегодня.
+        - date_to (str): Конец периода 'дд.мм.гггг' включительно, по умолчанию 7 дней, учитывая текущий.
+        - page (int), limit (int): Постраничная выдача. Общее количество слотов в заголовке X-Total-Count.
 
         Returns:
             Response: Список свободных слотов в формате ['дд.мм.гггг чч:мм'].
         """
+        now: datetime = timezone.now()
+        query_serializer = FreeSlotsQuerySerializer(data=request.query_params,
+                                                    context={'today': timezone.localdate(now)})
+        if not query_serializer.is_valid():
+            return Response(query_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params: dict = query_serializer.validated_data
+
+        start_day: date = params['date_from']
+        end_day: date = params['date_to'] + timedelta(days=1)
+
+        availability: Availability = load_availability(start_day, end_day, params.get('animal_type'))
 
-        start_date: datetime = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
-        end_date: datetime = start_date + timedelta(days=7)
+        free_slots: Iterator[str] = format_slots(availability.iter_free_slots(start_day, end_day, not_before=now))
+        limit: Optional[int] = params.get('limit')
+        if limit is not None:
+            offset: int = (params['page'] - 1) * limit
+            free_slots = islice(free_slots, offset, offset + limit)
 
-        busy_slots: List[datetime] = list(Appointment.objects.filter(
-            appointment_date__gte=start_date,
-            appointment_date__lt=end_date
-        ).values_list('appointment_date', flat=True))
+        return Response(list(free_slots), status=status.HTTP_200_OK, headers={
+            'X-Total-Count': str(availability.count_free(start_day, end_day, not_before=now)),
+        })
 
-        free_slots: List[datetime] = []
-        current_date: datetime = start_date
-        while current_date < end_date:
-            if 9 <= current_date.hour < 18 and current_date not in busy_slots:
-                free_slots.append(current_date)
-            current_date += timedelta(minutes=30)
 
-        formatted_free_slots: List[str] = [
-            slot.strftime('%d.%m.%Y %H:%M') for slot in free_slots if slot >= timezone.localtime()
-        ]
+def animal_types_etag(request) -> str:
+    """ ETag справочника видов животных для условных запросов. """
+    return get_animal_type_catalogue().etag
 
-        return Response(formatted_free_slots, status=status.HTTP_200_OK)
+
+def animal_types_last_modified(request) -> Optional[datetime]:
+    """ Время последнего изменения справочника видов животных для условных запросов. """
+    return get_animal_type_catalogue().last_modified
 
 
 class AnimalTypeAPIView(APIView):
@@ -145,16 +325,21 @@ class AnimalTypeAPIView(APIView):
                     items=openapi.Schema(type=openapi.TYPE_OBJECT),
                 ),
             ),
+            304: 'Список типов животных не изменился (If-None-Match / If-Modified-Since)',
             400: 'Ошибка',
         },
     )
+    @read_from_replica
+    @method_decorator(condition(etag_func=animal_types_etag, last_modified_func=animal_types_last_modified))
     def get(self, request) -> Response:
         """
         Получение списка всех типов животных.
 
+        Справочник отдается из кеша и сбрасывается при изменении видов животных.
+        Ответ содержит заголовки ETag и Last-Modified; при совпадении If-None-Match возвращается
+        304 NOT MODIFIED без обращения к БД.
+
         Returns:
             Response: Список всех типов животных.
         """
-        animal_types = AnimalType.objects.all()
-        serializer = AnimalTypeSerializer(animal_types, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(get_animal_type_catalogue().data, status=status.HTTP_200_OK)
@@ -5,3 +5,6 @@ class VetclinicsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vetclinics'
     verbose_name = 'Ветеринарные клиники'
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401
@@ -0,0 +1,315 @@
+"""
+Движок доступности слотов для записи на прием в ветклинику.
+
+Расписание каждого дня хранится в виде битовой маски (int): бит с номером N соответствует слоту,
+который начинается через N * SLOT_MINUTES минут после полуночи по местному времени клиники.
+Свободные слоты дня вычисляются одной битовой операцией `working & ~busy`, а перебираются
+только установленные биты, т.е. только рабочее окно. Маска рабочих слотов дня по умолчанию WORKING_MASK
+(09:00-18:00), а расписание клиники (vetclinics.schedule) передает свою таблицу масок по дням.
+
+Отсечение прошедших слотов выполняется в целых минутах от начала эпохи: для каждого дня один раз
+вычисляется момент местной полуночи, а "сейчас" переводится в минуты один раз на запрос. Если в этот день
+меняется смещение часового пояса (переход на летнее/зимнее время), моменты слотов дня считаются
+по отдельности, а несуществующее местное время пропускается.
+
+Модуль не зависит от ORM и настроек Django, поэтому его можно использовать как в API и админке,
+так и в телеграм-боте.
+"""
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+WORK_START_HOUR: int = 9
+WORK_END_HOUR: int = 18
+SLOT_MINUTES: int = 30
+SLOTS_PER_DAY: int = 24 * 60 // SLOT_MINUTES
+MINUTES_PER_DAY: int = 24 * 60
+
+# Время начала слота 'чч:мм' по его номеру в дне.
+SLOT_TIMES: List[str] = [f'{index * SLOT_MINUTES // 60:02d}:{index * SLOT_MINUTES % 60:02d}'
+                         for index in range(SLOTS_PER_DAY)]
+
+
+def slots_mask(start_minute: int, end_minute: int) -> int:
+    """
+    Возвращает битовую маску слотов, начинающихся в интервале [start_minute, end_minute) от полуночи.
+
+    Args:
+        start_minute (int): Начало интервала в минутах от полуночи.
+        end_minute (int): Конец интервала (не включительно) в минутах от полуночи.
+
+    Returns:
+        int: Битовая маска слотов.
+    """
+    first: int = -(-start_minute // SLOT_MINUTES)
+    last: int = -(-end_minute // SLOT_MINUTES)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+WORKING_MASK: int = slots_mask(WORK_START_HOUR * 60, WORK_END_HOUR * 60)
+
+
+def slot_index(value: datetime) -> Optional[int]:
+    """
+    Возвращает номер слота в пределах дня для значения даты и времени.
+
+    Args:
+        value (datetime): Дата и время (уже приведенные к местному времени клиники).
+
+    Returns:
+        Optional[int]: Номер слота или None, если время не совпадает с началом слота.
+    """
+    minute_of_day: int = value.hour * 60 + value.minute
+    if minute_of_day % SLOT_MINUTES or value.second or value.microsecond:
+        return None
+    return minute_of_day // SLOT_MINUTES
+
+
+def is_working_slot(value: datetime) -> bool:
+    """
+    Проверяет, что дата и время совпадают с началом слота в рабочее время клиники.
+
+    Args:
+        value (datetime): Дата и время (уже приведенные к местному времени клиники).
+
+    Returns:
+        bool: True, если на это время можно записаться.
+    """
+    index: Optional[int] = slot_index(value)
+    return index is not None and bool(WORKING_MASK >> index & 1)
+
+
+def epoch_minute(value: datetime) -> int:
+    """ Количество целых минут от начала эпохи до момента (aware), с округлением вверх. """
+    return -int(-value.timestamp() // 60)
+
+
+def local_epoch_minute(day: date, minute_of_day: int, tz: tzinfo) -> Optional[int]:
+    """
+    Переводит местное время дня в минуты от начала эпохи.
+
+    Args:
+        day (date): День по местному времени.
+        minute_of_day (int): Минута от местной полуночи.
+        tz (tzinfo): Часовой пояс.
+
+    Returns:
+        Optional[int]: Минута от начала эпохи или None, если такого местного времени нет (переход часов вперед).
+            Неоднозначное время (переход часов назад) считается по первому наступлению.
+    """
+    hour, minute = divmod(minute_of_day, 60)
+    local: datetime = datetime(day.year, day.month, day.day, hour, minute, tzinfo=tz)
+    utc: datetime = local.astimezone(timezone.utc)
+    if utc.astimezone(tz).replace(tzinfo=None) != local.replace(tzinfo=None):
+        return None
+    return int(utc.timestamp()) // 60
+
+
+def aware_local(value: datetime, tz: tzinfo) -> datetime:
+    """
+    Привязывает naive местное время к часовому поясу.
+
+    Args:
+        value (datetime): Местное время (naive).
+        tz (tzinfo): Часовой пояс.
+
+    Returns:
+        datetime: Aware-время; неоднозначное время (переход часов назад) - по первому наступлению.
+
+    Raises:
+        ValueError: Если такого местного времени нет (переход часов вперед).
+    """
+    aware: datetime = value.replace(tzinfo=tz)
+    if aware.astimezone(timezone.utc).astimezone(tz).replace(tzinfo=None) != value:
+        raise ValueError('Несуществующее местное время')
+    return aware
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """
+    Перебирает номера установленных битов маски по возрастанию.
+
+    Args:
+        mask (int): Битовая маска.
+
+    Yields:
+        int: Номер установленного бита.
+    """
+    while mask:
+        lowest: int = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+class Availability:
+    """
+    Занятость слотов клиники по дням, представленная битовыми масками.
+
+    Записи, время которых не совпадает с началом слота, слоты не занимают (как и раньше, когда
+    занятость проверялась точным совпадением даты и времени).
+    """
+
+    __slots__ = ('tz', 'working_mask', '_busy', '_midnights')
+
+    def __init__(self, tz: tzinfo, working_mask: Union[int, Callable[[date], int]] = WORKING_MASK) -> None:
+        """
+        Args:
+            tz (tzinfo): Часовой пояс клиники.
+            working_mask (Union[int, Callable[[date], int]]): Маска слотов рабочего времени, одинаковая
+                для всех дней, или функция, возвращающая маску дня (например, CompiledSchedule.working_mask).
+        """
+        self.tz: tzinfo = tz
+        self.working_mask: Callable[[date], int] = working_mask if callable(working_mask) \
+            else lambda day: working_mask
+        self._busy: Dict[date, int] = {}
+        self._midnights: Dict[date, Optional[int]] = {}
+
+    def mark_busy(self, value: datetime) -> None:
+        """
+        Отмечает слот, который начинается в указанное время, как занятый.
+
+        Args:
+            value (datetime): Дата и время записи на прием (aware).
+        """
+        local: datetime = value.astimezone(self.tz)
+        index: Optional[int] = slot_index(local)
+        if index is not None:
+            day: date = local.date()
+            self._busy[day] = self._busy.get(day, 0) | (1 << index)
+
+    def mark_busy_many(self, values: Iterable[datetime]) -> None:
+        """
+        Отмечает занятыми слоты для всех переданных дат и времени.
+        Повторяющиеся значения (записи разных видов животных на одно время) обрабатываются один раз.
+
+        Args:
+            values (Iterable[datetime]): Даты и время записей на прием (aware).
+        """
+        for value in set(values):
+            self.mark_busy(value)
+
+    def mark_busy_mask(self, day: date, mask: int) -> None:
+        """
+        Отмечает занятыми слоты дня по битовой маске.
+
+        Args:
+            day (date): День по местному времени клиники.
+            mask (int): Маска занятых слотов.
+        """
+        if mask:
+            self._busy[day] = self._busy.get(day, 0) | mask
+
+    def busy_mask(self, day: date) -> int:
+        """ Возвращает маску занятых слотов дня. """
+        return self._busy.get(day, 0)
+
+    def free_mask(self, day: date) -> int:
+        """ Возвращает маску свободных слотов дня в рабочее время. """
+        return self.working_mask(day) & ~self._busy.get(day, 0)
+
+    def is_free(self, value: datetime) -> bool:
+        """
+        Проверяет, свободен ли слот, начинающийся в указанное время.
+
+        Args:
+            value (datetime): Дата и время (aware).
+
+        Returns:
+            bool: True, если слот рабочий и не занят.
+        """
+        local: datetime = value.astimezone(self.tz)
+        index: Optional[int] = slot_index(local)
+        return index is not None and bool(self.free_mask(local.date()) >> index & 1)
+
+    def _midnight(self, day: date) -> Optional[int]:
+        """
+        Возвращает момент местной полуночи дня в минутах от начала эпохи или None, если в этот день
+        смещение часового пояса меняется и моменты слотов нужно считать по отдельности.
+        """
+        if day not in self._midnights:
+            start: Optional[int] = local_epoch_minute(day, 0, self.tz)
+            end: Optional[int] = local_epoch_minute(day + timedelta(days=1), 0, self.tz)
+            self._midnights[day] = start if start is not None and end is not None \
+                and end - start == MINUTES_PER_DAY else None
+        return self._midnights[day]
+
+    def _allowed_mask(self, day: date, now_minute: Optional[int]) -> int:
+        """
+        Возвращает маску существующих слотов дня, которые начинаются не раньше минуты now_minute от начала эпохи.
+        """
+        midnight: Optional[int] = self._midnight(day)
+        if midnight is not None:
+            if now_minute is None or now_minute <= midnight:
+                return -1
+            if now_minute > midnight + MINUTES_PER_DAY:
+                return 0
+            first: int = -(-(now_minute - midnight) // SLOT_MINUTES)
+            return ~((1 << first) - 1)
+        mask: int = 0
+        for index in range(SLOTS_PER_DAY):
+            moment: Optional[int] = local_epoch_minute(day, index * SLOT_MINUTES, self.tz)
+            if moment is not None and (now_minute is None or moment >= now_minute):
+                mask |= 1 << index
+        return mask
+
+    def iter_free_slots(self, start_day: date, end_day: date,
+                        not_before: Optional[datetime] = None) -> Iterator[Tuple[date, int]]:
+        """
+        Лениво перебирает свободные слоты диапазона дней в хронологическом порядке без построения datetime.
+
+        Args:
+            start_day (date): Первый день диапазона.
+            end_day (date): День, следующий за последним днем диапазона.
+            not_before (Optional[datetime]): Слоты раньше этого момента пропускаются.
+
+        Yields:
+            Tuple[date, int]: День и номер слота в дне (время начала - SLOT_TIMES[номер]).
+        """
+        now_minute: Optional[int] = epoch_minute(not_before) if not_before is not None else None
+        day: date = start_day
+        while day < end_day:
+            mask: int = self.free_mask(day)
+            if mask:
+                for index in iter_bits(mask & self._allowed_mask(day, now_minute)):
+                    yield day, index
+            day += timedelta(days=1)
+
+    def free_slots(self, start_day: date, end_day: date,
+                   not_before: Optional[datetime] = None) -> Iterator[datetime]:
+        """
+        Перебирает свободные слоты в диапазоне дней в хронологическом порядке.
+
+        Args:
+            start_day (date): Первый день диапазона.
+            end_day (date): День, следующий за последним днем диапазона.
+            not_before (Optional[datetime]): Слоты раньше этого момента пропускаются.
+
+        Yields:
+            datetime: Начало свободного слота (aware, в часовом поясе клиники).
+        """
+        for day, index in self.iter_free_slots(start_day, end_day, not_before):
+            hour, minute = divmod(index * SLOT_MINUTES, 60)
+            yield datetime(day.year, day.month, day.day, hour, minute, tzinfo=self.tz)
+
+    def count_free(self, start_day: date, end_day: date, not_before: Optional[datetime] = None) -> int:
+        """
+        Считает свободные слоты в диапазоне дней без построения объектов datetime.
+
+        Args:
+            start_day (date): Первый день диапазона.
+            end_day (date): День, следующий за последним днем диапазона.
+            not_before (Optional[datetime]): Слоты раньше этого момента не учитываются.
+
+        Returns:
+            int: Количество свободных слотов.
+        """
+        now_minute: Optional[int] = epoch_minute(not_before) if not_before is not None else None
+        total: int = 0
+        day: date = start_day
+        while day < end_day:
+            mask: int = self.free_mask(day)
+            if mask:
+                total += (mask & self._allowed_mask(day, now_minute)).bit_count()
+            day += timedelta(days=1)
+        return total
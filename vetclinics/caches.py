@@ -0,0 +1,279 @@
+import hashlib
+import json
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from divanru_vetclinic.db_routers import replica_cache_timeout, use_primary
+
+ANIMAL_TYPES_CACHE_KEY: str = 'vetclinics:animal-types'
+ANIMAL_TYPES_ETAG_CACHE_KEY: str = 'vetclinics:animal-types:etag'
+ANIMAL_TYPES_DELETED_AT_CACHE_KEY: str = 'vetclinics:animal-types:deleted-at'
+BUSY_SLOTS_CACHE_PREFIX: str = 'vetclinics:busy-slots'
+SCHEDULE_VERSION_CACHE_KEY: str = 'vetclinics:schedule:version'
+
+
+class AnimalTypeCatalogue(NamedTuple):
+    """
+    Сериализованный справочник видов животных.
+
+    Attributes:
+        data (List[dict]): Данные, которые отдает API.
+        etag (str): Сильный ETag, хеш от данных.
+        last_modified (Optional[datetime]): Время последнего изменения справочника.
+    """
+    data: List[dict]
+    etag: str
+    last_modified: Optional[datetime]
+
+
+_local_catalogue: Optional[AnimalTypeCatalogue] = None
+
+
+def build_animal_type_catalogue() -> AnimalTypeCatalogue:
+    """
+    Собирает справочник видов животных из БД.
+
+    Время последнего изменения берется из DateTimeBaseModel.updated_at; удаление вида животного
+    не оставляет следа в таблице, поэтому учитывается время последнего удаления. Справочник кешируется
+    до следующего изменения, поэтому читается из основной БД, а не с реплики.
+
+    Returns:
+        AnimalTypeCatalogue: Справочник видов животных.
+    """
+    from vetclinics.api.serializers import AnimalTypeSerializer
+    from vetclinics.models import AnimalType
+
+    with use_primary():
+        animal_types = AnimalType.objects.order_by('id')
+        data: List[dict] = [dict(item) for item in AnimalTypeSerializer(animal_types, many=True).data]
+        updated_at: Optional[datetime] = animal_types.aggregate(updated_at=Max('updated_at'))['updated_at']
+    payload: bytes = json.dumps(data, ensure_ascii=False, sort_keys=True).encode()
+
+    deleted_at: Optional[datetime] = cache.get(ANIMAL_TYPES_DELETED_AT_CACHE_KEY)
+    last_modified: Optional[datetime] = max(filter(None, [updated_at, deleted_at]), default=None)
+    return AnimalTypeCatalogue(data=data, etag=hashlib.sha1(payload).hexdigest(), last_modified=last_modified)
+
+
+def get_animal_type_catalogue() -> AnimalTypeCatalogue:
+    """
+    Возвращает справочник видов животных из памяти процесса или кеша Django.
+
+    В памяти процесса хранится последний собранный справочник, а его актуальность проверяется по ETag
+    в кеше Django, поэтому изменение справочника в одном процессе видят все остальные.
+    В БД справочник собирается, только если в кеше Django его нет.
+
+    Returns:
+        AnimalTypeCatalogue: Справочник видов животных.
+    """
+    global _local_catalogue
+
+    etag: Optional[str] = cache.get(ANIMAL_TYPES_ETAG_CACHE_KEY)
+    if etag is not None and _local_catalogue is not None and _local_catalogue.etag == etag:
+        return _local_catalogue
+
+    catalogue: Optional[AnimalTypeCatalogue] = cache.get(ANIMAL_TYPES_CACHE_KEY)
+    if catalogue is None:
+        catalogue = build_animal_type_catalogue()
+        cache.set_many({ANIMAL_TYPES_CACHE_KEY: catalogue, ANIMAL_TYPES_ETAG_CACHE_KEY: catalogue.etag}, None)
+    _local_catalogue = catalogue
+    return catalogue
+
+
+async def aget_animal_type_catalogue() -> AnimalTypeCatalogue:
+    """
+    Async-версия get_animal_type_catalogue: кеш Django читается async-методами,
+    а справочник собирается в БД (в потоке) только при отсутствии в кеше.
+    """
+    global _local_catalogue
+
+    etag: Optional[str] = await cache.aget(ANIMAL_TYPES_ETAG_CACHE_KEY)
+    if etag is not None and _local_catalogue is not None and _local_catalogue.etag == etag:
+        return _local_catalogue
+
+    catalogue: Optional[AnimalTypeCatalogue] = await cache.aget(ANIMAL_TYPES_CACHE_KEY)
+    if catalogue is None:
+        catalogue = await sync_to_async(build_animal_type_catalogue)()
+        await cache.aset_many({ANIMAL_TYPES_CACHE_KEY: catalogue, ANIMAL_TYPES_ETAG_CACHE_KEY: catalogue.etag}, None)
+    _local_catalogue = catalogue
+    return catalogue
+
+
+def invalidate_animal_type_catalogue(deleted: bool = False) -> None:
+    """
+    Сбрасывает справочник видов животных в памяти процесса и в кеше Django.
+
+    Args:
+        deleted (bool): Справочник изменился из-за удаления вида животного.
+    """
+    global _local_catalogue
+
+    _local_catalogue = None
+    if deleted:
+        cache.set(ANIMAL_TYPES_DELETED_AT_CACHE_KEY, timezone.now(), None)
+    cache.delete_many([ANIMAL_TYPES_CACHE_KEY, ANIMAL_TYPES_ETAG_CACHE_KEY])
+
+
+def get_schedule_version() -> str:
+    """
+    Возвращает версию расписания клиники из кеша Django, при ее отсутствии - заводит новую.
+
+    По версии процессы проверяют актуальность скомпилированного расписания в памяти (vetclinics.schedule),
+    она же входит в ключи кеша занятых слотов, которые зависят от вместимости слотов.
+
+    Returns:
+        str: Версия расписания.
+    """
+    version: Optional[str] = cache.get(SCHEDULE_VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(SCHEDULE_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        version = cache.get(SCHEDULE_VERSION_CACHE_KEY)
+    return version
+
+
+async def aget_schedule_version() -> str:
+    """ Async-версия get_schedule_version. """
+    version: Optional[str] = await cache.aget(SCHEDULE_VERSION_CACHE_KEY)
+    if version is None:
+        await cache.aadd(SCHEDULE_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        version = await cache.aget(SCHEDULE_VERSION_CACHE_KEY)
+    return version
+
+
+def invalidate_schedule() -> None:
+    """
+    Заводит новую версию расписания клиники: все процессы перекомпилируют расписание при следующем обращении.
+
+    Версия меняется сразу и еще раз после фиксации транзакции: иначе параллельный процесс мог бы
+    до фиксации скомпилировать прежнее расписание под новой версией.
+    """
+    cache.set(SCHEDULE_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+    transaction.on_commit(lambda: cache.set(SCHEDULE_VERSION_CACHE_KEY, uuid.uuid4().hex, None))
+
+
+class CacheCounters:
+    """
+    Счетчики попаданий и промахов кеша в пределах процесса.
+    """
+
+    __slots__ = ('hits', 'misses')
+
+    def __init__(self) -> None:
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def record(self, hits: int, misses: int) -> None:
+        self.hits += hits
+        self.misses += misses
+
+    def reset(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+busy_slots_counters = CacheCounters()
+
+
+def busy_slots_key(day: date, animal_type_id: Optional[int], version: str) -> str:
+    """
+    Ключ кеша маски занятых слотов дня для вида животного (или для всех видов, если ID не передан)
+    при версии расписания version.
+    """
+    return f'{BUSY_SLOTS_CACHE_PREFIX}:{version}:{animal_type_id or "any"}:{day.isoformat()}'
+
+
+def _busy_slots_keys(start_day: date, end_day: date, animal_type_id: Optional[int],
+                     version: str) -> Dict[str, date]:
+    """ Ключи кеша масок занятых слотов для каждого дня диапазона. """
+    return {
+        busy_slots_key(start_day + timedelta(days=offset), animal_type_id, version):
+            start_day + timedelta(days=offset)
+        for offset in range((end_day - start_day).days)
+    }
+
+
+def get_busy_masks(start_day: date, end_day: date, animal_type_id: Optional[int], version: str,
+                   load: Callable[[List[date]], Dict[date, int]]) -> Dict[date, int]:
+    """
+    Возвращает маски занятых слотов по дням диапазона: из кеша одним get_many, а отсутствующие в кеше дни
+    загружает одним вызовом load и сохраняет в кеш одним set_many.
+
+    Маски не зависят от текущего времени и постраничной выдачи, поэтому один ключ обслуживает все
+    запросы свободных слотов на этот день и вид животного. Слот вида животного занят, когда заполнена
+    его вместимость из расписания, поэтому ключ включает версию расписания. Маски, загруженные с реплики,
+    кешируются не дольше REPLICA_CACHE_TIMEOUT.
+
+    Args:
+        start_day (date): Первый день диапазона.
+        end_day (date): День, следующий за последним днем диапазона.
+        animal_type_id (Optional[int]): ID вида животного или None (занятость по всем видам).
+        version (str): Версия расписания, по которому загружаются маски.
+        load (Callable[[List[date]], Dict[date, int]]): Загрузка масок из БД для списка дней
+            (дни без занятых слотов можно не возвращать).
+
+    Returns:
+        Dict[date, int]: Маска занятых слотов для каждого дня диапазона.
+    """
+    keys: Dict[str, date] = _busy_slots_keys(start_day, end_day, animal_type_id, version)
+    masks: Dict[date, int] = {keys[key]: mask for key, mask in cache.get_many(list(keys)).items()}
+    missing: List[date] = [day for day in keys.values() if day not in masks]
+    busy_slots_counters.record(hits=len(masks), misses=len(missing))
+    if missing:
+        loaded: Dict[date, int] = load(missing)
+        fresh: Dict[date, int] = {day: loaded.get(day, 0) for day in missing}
+        cache.set_many({busy_slots_key(day, animal_type_id, version): mask for day, mask in fresh.items()},
+                       replica_cache_timeout(settings.FREE_SLOTS_CACHE_TIMEOUT))
+        masks.update(fresh)
+    return masks
+
+
+async def aget_busy_masks(start_day: date, end_day: date, animal_type_id: Optional[int], version: str,
+                          load: Callable[[List[date]], Awaitable[Dict[date, int]]]) -> Dict[date, int]:
+    """
+    Async-версия get_busy_masks: кеш читается и пишется async-методами, load - корутина.
+    """
+    keys: Dict[str, date] = _busy_slots_keys(start_day, end_day, animal_type_id, version)
+    masks: Dict[date, int] = {keys[key]: mask for key, mask in (await cache.aget_many(list(keys))).items()}
+    missing: List[date] = [day for day in keys.values() if day not in masks]
+    busy_slots_counters.record(hits=len(masks), misses=len(missing))
+    if missing:
+        loaded: Dict[date, int] = await load(missing)
+        fresh: Dict[date, int] = {day: loaded.get(day, 0) for day in missing}
+        await cache.aset_many({busy_slots_key(day, animal_type_id, version): mask for day, mask in fresh.items()},
+                              replica_cache_timeout(settings.FREE_SLOTS_CACHE_TIMEOUT))
+        masks.update(fresh)
+    return masks
+
+
+def invalidate_busy_slots(changed: Iterable[Tuple[int, date]]) -> None:
+    """
+    Сбрасывает кеш занятых слотов для измененных пар (ID вида животного, день) и занятость этих дней
+    по всем видам.
+
+    Кеш сбрасывается сразу и еще раз после фиксации транзакции: иначе параллельный запрос мог бы
+    между сбросом и фиксацией снова положить в кеш еще не измененную занятость.
+
+    Args:
+        changed (Iterable[Tuple[int, date]]): Пары (ID вида животного, день).
+    """
+    changed = set(changed)
+    if not changed:
+        return
+    version: str = get_schedule_version()
+    keys: Set[str] = set()
+    for animal_type_id, day in changed:
+        keys.add(busy_slots_key(day, animal_type_id, version))
+        keys.add(busy_slots_key(day, None, version))
+    cache.delete_many(list(keys))
+    transaction.on_commit(lambda: cache.delete_many(list(keys)))
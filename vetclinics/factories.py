@@ -1,11 +1,14 @@
-from datetime import timedelta
+from datetime import date, datetime, time, timedelta
+from typing import List
 
 import factory
 
 from django.utils import timezone
 
 from accounts.factories import AccountFactory
-from .models import Appointment, AnimalType
+from .availability import SLOT_MINUTES, iter_bits
+from .models import Appointment, AnimalType, ClinicSchedule, WorkingHours
+from .schedule import CompiledSchedule, get_schedule
 
 
 class AnimalTypeFactory(factory.django.DjangoModelFactory):
@@ -47,16 +50,73 @@ class AppointmentFactory(factory.django.DjangoModelFactory):
     animal_type = factory.SubFactory(AnimalTypeFactory)
 
 
-def generate_valid_appointment_date():
-    current_time = timezone.localtime()
-    tomorrow = current_time + timedelta(days=1)
-    start_time = tomorrow.replace(hour=9, minute=0, second=0, microsecond=0)
-    end_time = tomorrow.replace(hour=18, minute=0, second=0, microsecond=0)
+def generate_valid_appointment_date() -> datetime:
+    """
+    Возвращает время последнего приема в ближайший рабочий день по расписанию клиники, начиная с завтрашнего.
+
+    Returns:
+        datetime: Дата и время начала приема (aware, в часовом поясе клиники).
+    """
+    schedule: CompiledSchedule = get_schedule()
+    day: date = timezone.localdate() + timedelta(days=1)
+    while not schedule.working_mask(day):
+        day += timedelta(days=1)
+    hour, minute = divmod((schedule.working_mask(day).bit_length() - 1) * SLOT_MINUTES, 60)
+    return datetime.combine(day, time(hour, minute), tzinfo=timezone.get_current_timezone())
+
+
+def generate_working_slots(count: int) -> List[datetime]:
+    """
+    Возвращает count первых начал приема по расписанию клиники, начиная с завтрашнего дня
+    (для наполнения БД записями на прием, например AppointmentFactory с factory.Iterator).
 
-    valid_times = []
-    time_slot = start_time
-    while time_slot < end_time:
-        valid_times.append(time_slot)
-        time_slot += timedelta(minutes=30)
+    Args:
+        count (int): Количество слотов.
 
-    return valid_times[-1]
+    Returns:
+        List[datetime]: Дата и время начала приема (aware, в часовом поясе клиники) по возрастанию.
+    """
+    schedule: CompiledSchedule = get_schedule()
+    tz = timezone.get_current_timezone()
+    day: date = timezone.localdate() + timedelta(days=1)
+    slots: List[datetime] = []
+    while len(slots) < count:
+        for index in iter_bits(schedule.working_mask(day)):
+            hour, minute = divmod(index * SLOT_MINUTES, 60)
+            slots.append(datetime.combine(day, time(hour, minute), tzinfo=tz))
+        day += timedelta(days=1)
+    return slots[:count]
+
+
+class ClinicScheduleFactory(factory.django.DjangoModelFactory):
+    """
+    Фабрика для создания активного расписания клиники: каждый день с 09:00 до 18:00.
+    """
+
+    class Meta:
+        model = ClinicSchedule
+
+    name = factory.Sequence(lambda n: f'Расписание: {n}')
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs) -> ClinicSchedule:
+        """
+        Переопределение метода: прежнее активное расписание снимается с действия, так как активным
+        может быть только одно расписание.
+        """
+        ClinicSchedule.objects.filter(is_active=True).update(is_active=False)
+        return super()._create(model_class, *args, **kwargs)
+
+    @factory.post_generation
+    def working_hours(self, create: bool, extracted, **kwargs) -> None:
+        """
+        Создает часы работы на каждый день недели (или на переданные дни недели).
+
+        Args:
+            create (bool): Объект сохраняется в БД.
+            extracted: Список дней недели (0 - понедельник), по умолчанию вся неделя.
+        """
+        if not create:
+            return
+        for weekday in range(7) if extracted is None else extracted:
+            WorkingHours.objects.create(schedule=self, weekday=weekday, opens_at=time(9), closes_at=time(18))
@@ -0,0 +1,75 @@
+"""
+Разбор и форматирование даты и времени API в формате 'дд.мм.гггг чч:мм'.
+
+datetime.strptime на каждый вызов разбирает формат регулярным выражением с учетом локали,
+а strftime уходит в C-библиотеку; для фиксированного формата достаточно срезов строки и таблицы
+двузначных чисел. Результат совпадает с strptime/strftime для формата DATETIME_FORMAT: строки
+нестрогого вида (однозначные числа, лишние пробелы) разбираются через strptime.
+"""
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .availability import SLOT_TIMES
+
+DATETIME_FORMAT: str = '%d.%m.%Y %H:%M'
+
+# Двузначные представления чисел 0-99 для дня, месяца, часов и минут и обратная таблица для разбора.
+TWO_DIGITS: List[str] = [f'{number:02d}' for number in range(100)]
+TWO_DIGIT_NUMBERS: Dict[str, int] = {digits: number for number, digits in enumerate(TWO_DIGITS)}
+
+
+def parse_datetime(value: str) -> datetime:
+    """
+    Разбирает строку 'дд.мм.гггг чч:мм' в naive datetime так же, как datetime.strptime(value, DATETIME_FORMAT).
+
+    Args:
+        value (str): Строка с датой и временем.
+
+    Returns:
+        datetime: Дата и время (naive).
+
+    Raises:
+        ValueError: Если строка не соответствует формату или дата некорректна.
+    """
+    if len(value) == 16 and value[2] == '.' and value[5] == '.' and value[10] == ' ' and value[13] == ':':
+        day = TWO_DIGIT_NUMBERS.get(value[0:2])
+        month = TWO_DIGIT_NUMBERS.get(value[3:5])
+        hour = TWO_DIGIT_NUMBERS.get(value[11:13])
+        minute = TWO_DIGIT_NUMBERS.get(value[14:16])
+        year: str = value[6:10]
+        if day is not None and month is not None and hour is not None and minute is not None \
+                and year.isascii() and year.isdigit():
+            return datetime(int(year), month, day, hour, minute)
+    return datetime.strptime(value, DATETIME_FORMAT)
+
+
+def format_datetime(value: datetime) -> str:
+    """
+    Форматирует дату и время как value.strftime(DATETIME_FORMAT) (без перевода в другой часовой пояс).
+
+    Args:
+        value (datetime): Дата и время.
+
+    Returns:
+        str: Строка 'дд.мм.гггг чч:мм'.
+    """
+    return (f'{TWO_DIGITS[value.day]}.{TWO_DIGITS[value.month]}.{value.year} '
+            f'{TWO_DIGITS[value.hour]}:{TWO_DIGITS[value.minute]}')
+
+
+def format_date(value: date) -> str:
+    """ Форматирует дату как value.strftime('%d.%m.%Y'). """
+    return f'{TWO_DIGITS[value.day]}.{TWO_DIGITS[value.month]}.{value.year}'
+
+
+def format_slots(slots: Iterable[Tuple[date, int]]) -> Iterator[str]:
+    """
+    Лениво форматирует слоты (день, номер слота) из Availability.iter_free_slots в строки 'дд.мм.гггг чч:мм':
+    дата форматируется один раз на день, время берется из таблицы SLOT_TIMES.
+    """
+    current_day: Optional[date] = None
+    prefix: str = ''
+    for day, index in slots:
+        if day != current_day:
+            current_day, prefix = day, f'{format_date(day)} '
+        yield prefix + SLOT_TIMES[index]
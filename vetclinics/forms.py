@@ -3,6 +3,8 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 
 from .models import Appointment
+from .occupancy import appointment_key, occupancy_counts, occupancy_key
+from .schedule import get_schedule
 
 
 class AppointmentForm(forms.ModelForm):
@@ -16,4 +18,29 @@ class AppointmentForm(forms.ModelForm):
             appointment_date = appointment_date.replace(second=0)
             if appointment_date < timezone.now():
                 raise ValidationError('Дата и время записи должны быть в будущем времени')
+            local = timezone.localtime(appointment_date)
+            schedule = get_schedule()
+            if not schedule.is_working_slot(local):
+                hours = schedule.hours(local.date())
+                raise ValidationError(f'Запись возможна только на начало приема в часы работы клиники: {hours}'
+                                      if hours else 'В этот день клиника не работает')
         return appointment_date
+
+    def clean(self):
+        """
+        Проверяет, что вместимость слота из расписания клиники не заполнена другими записями.
+        Проверка только читает занятость: окончательно слот занимается при сохранении (AppointmentAdmin.save_model).
+        """
+        cleaned_data = super().clean()
+        appointment_date = cleaned_data.get('appointment_date')
+        animal_type = cleaned_data.get('animal_type')
+        if appointment_date and animal_type:
+            is_active = cleaned_data.get('is_active', self.instance.is_active)
+            key = occupancy_key(appointment_date, animal_type.id, is_active)
+            if key is not None:
+                booked = occupancy_counts([key]).get(key, 0)
+                if self.instance.pk is not None and appointment_key(self.instance) == key:
+                    booked -= 1
+                if booked >= get_schedule().capacity(animal_type.id):
+                    raise ValidationError('Выбранный слот уже занят')
+        return cleaned_data
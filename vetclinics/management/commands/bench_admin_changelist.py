@@ -0,0 +1,171 @@
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from django.contrib import admin
+from django.contrib.admin import AdminSite
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection, reset_queries
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from vetclinics.availability import SLOTS_PER_DAY, SLOT_MINUTES, WORK_START_HOUR, WORKING_MASK, iter_bits
+from vetclinics.models import AnimalType, Appointment
+from vetclinics.occupancy import apply_occupancy, occupancy_deltas
+from vetclinics.records import copy_insert
+
+BENCH_PREFIX: str = 'bench-changelist'
+FIRST_NAMES: List[str] = ['Иван', 'Петр', 'Мария', 'Анна', 'Олег', 'Елена', 'Сергей', 'Ольга']
+LAST_NAMES: List[str] = ['Иванов', 'Петров', 'Сидоров', 'Смирнов', 'Кузнецов', 'Попов']
+
+
+class LegacyAppointmentAdmin(admin.ModelAdmin):
+    """ Настройки списка записей на прием до оптимизации (для сравнения). """
+    list_display = ['client', 'appointment_date', 'animal_type', 'created_at', 'updated_at']
+    list_display_links = ['client']
+    date_hierarchy = 'appointment_date'
+    list_filter = ['animal_type', 'is_active', ]
+    search_fields = ['client__first_name', 'client__last_name', 'client__phone']
+    ordering = ['appointment_date']
+
+
+class Command(BaseCommand):
+    help: str = 'Бенчмарк списка записей на прием в админ-панели на большой таблице (по умолчанию 1M записей)'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--appointments', type=int, default=1_000_000, help='Количество записей на прием')
+        parser.add_argument('--clients', type=int, default=20_000, help='Количество клиентов')
+        parser.add_argument('--animal-types', type=int, default=20, help='Количество видов животных')
+        parser.add_argument('--batch-size', type=int, default=10_000, help='Размер пачки вставки')
+        parser.add_argument('--repeat', type=int, default=3, help='Количество повторов замера')
+        parser.add_argument('--keep', action='store_true', help='Не удалять синтетические данные после замера')
+
+    def handle(self, *args: List[str], **kwargs: dict) -> None:
+        """
+        Заполняет БД синтетическими записями, замеряет отрисовку списка в админ-панели с прежними
+        и текущими настройками AppointmentAdmin и удаляет синтетические данные.
+
+        :param args: Список аргументов командной строки (пока не используется).
+        :param kwargs: Словарь именованных аргументов командной строки.
+        """
+        user = get_user_model().objects.create_superuser(username=f'{BENCH_PREFIX}-admin', password=None)
+        try:
+            newest: datetime = self.populate(kwargs['appointments'], kwargs['clients'], kwargs['animal_types'],
+                                             kwargs['batch_size'])
+            self.analyze()
+            scenarios: List[Tuple[str, Dict[str, str]]] = [
+                ('первая страница', {}),
+                ('страница 200', {'p': '200'}),
+                ('поиск "Иван"', {'q': 'Иван'}),
+                ('год', {'appointment_date__year': str(newest.year)}),
+                ('месяц', {'appointment_date__year': str(newest.year), 'appointment_date__month': str(newest.month)}),
+            ]
+            admins = [
+                ('прежний', LegacyAppointmentAdmin(Appointment, AdminSite())),
+                ('текущий', admin.site._registry[Appointment]),
+            ]
+            self.stdout.write(f'Записей на прием: {Appointment.objects.count()}')
+            self.stdout.write(f'{"сценарий":<18} {"админка":<9} {"время, мс":>10} {"запросов":>9}')
+            for title, params in scenarios:
+                for name, model_admin in admins:
+                    elapsed, queries = self.measure(model_admin, user, params, kwargs['repeat'])
+                    self.stdout.write(f'{title:<18} {name:<9} {elapsed:>10.1f} {queries:>9}')
+        finally:
+            user.delete()
+            if not kwargs['keep']:
+                self.cleanup()
+
+    def populate(self, appointments: int, clients: int, animal_types: int, batch_size: int) -> datetime:
+        """
+        Создает клиентов, виды животных и записи на прием в прошлом (по всем рабочим слотам подряд).
+
+        Returns:
+            datetime: Время самой поздней записи.
+        """
+        User = get_user_model()
+        use_copy: bool = connection.vendor == 'postgresql'
+        rng = random.Random(0)
+        User.objects.bulk_create([
+            User(username=f'{BENCH_PREFIX}-{number}', first_name=rng.choice(FIRST_NAMES),
+                 last_name=rng.choice(LAST_NAMES), phone=f'+7900{number:07d}')
+            for number in range(clients)
+        ], batch_size=batch_size)
+        client_ids: List[int] = list(
+            User.objects.filter(username__startswith=f'{BENCH_PREFIX}-').exclude(is_superuser=True)
+            .values_list('id', flat=True)
+        )
+        type_ids: List[int] = [
+            AnimalType.objects.create(name=f'{BENCH_PREFIX} {number}', slug=f'{BENCH_PREFIX}-{number}').id
+            for number in range(animal_types)
+        ]
+
+        minutes: List[int] = [bit * SLOT_MINUTES for bit in iter_bits(WORKING_MASK)]
+        per_day: int = len(minutes) * len(type_ids)
+        days: int = -(-appointments // per_day)
+        first_day: datetime = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0) \
+            - timedelta(days=days)
+
+        def generate():
+            for number in range(appointments):
+                day, rest = divmod(number, per_day)
+                slot, type_index = divmod(rest, len(type_ids))
+                yield Appointment(client_id=rng.choice(client_ids), animal_type_id=type_ids[type_index],
+                                  appointment_date=first_day + timedelta(days=day, minutes=minutes[slot]))
+
+        started: float = time.perf_counter()
+        batch: List[Appointment] = []
+        for appointment in generate():
+            batch.append(appointment)
+            if len(batch) == batch_size:
+                self.insert(batch, use_copy)
+                batch = []
+        if batch:
+            self.insert(batch, use_copy)
+        self.stdout.write(f'Создано записей: {appointments} за {time.perf_counter() - started:.1f} с '
+                          f'({days} дней, {SLOTS_PER_DAY} слотов в сутках с {WORK_START_HOUR}:00)')
+        return first_day + timedelta(days=days - 1)
+
+    @staticmethod
+    def insert(batch: List[Appointment], use_copy: bool) -> None:
+        if use_copy:
+            copy_insert(batch)
+        else:
+            Appointment.objects.bulk_create(batch)
+        apply_occupancy(occupancy_deltas(batch))
+
+    @staticmethod
+    def analyze() -> None:
+        """ Обновляет статистику планировщика (по ней же оценивается количество строк для пагинатора). """
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    @staticmethod
+    def measure(model_admin: admin.ModelAdmin, user, params: Dict[str, str], repeat: int) -> Tuple[float, int]:
+        """
+        Возвращает лучшее время построения и отрисовки списка в миллисекундах и количество запросов.
+        """
+        best: float = float('inf')
+        queries: int = 0
+        for _ in range(repeat):
+            request = RequestFactory().get('/admin/vetclinics/appointment/', params)
+            request.user = user
+            reset_queries()
+            with CaptureQueriesContext(connection) as context:
+                started: float = time.perf_counter()
+                model_admin.changelist_view(request).render()
+                best = min(best, time.perf_counter() - started)
+            queries = len(context.captured_queries)
+        return best * 1000, queries
+
+    def cleanup(self) -> None:
+        """
+        Удаляет синтетические данные. Записи на прием удаляются одним DELETE без сигналов: их занятость
+        слотов удаляется каскадом вместе с синтетическими видами животных.
+        """
+        appointments = Appointment.objects.filter(animal_type__slug__startswith=BENCH_PREFIX)
+        appointments._raw_delete(appointments.db)
+        AnimalType.objects.filter(slug__startswith=BENCH_PREFIX).delete()
+        get_user_model().objects.filter(username__startswith=f'{BENCH_PREFIX}-').delete()
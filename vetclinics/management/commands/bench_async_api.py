@@ -0,0 +1,103 @@
+import asyncio
+import time
+from statistics import quantiles
+from typing import List, Optional, Tuple
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+
+async def measure(url: str, requests: int, concurrency: int,
+                  timeout: float) -> Tuple[float, Tuple[float, float, float], int]:
+    """
+    Выполняет requests GET-запросов не более чем по concurrency одновременно.
+
+    Returns:
+        Tuple[float, Tuple[float, float, float], int]: Запросов в секунду, задержки p50/p95/p99
+        в миллисекундах и количество ответов с ошибкой.
+
+    Raises:
+        CommandError: Если сервер недоступен.
+    """
+    latencies: List[float] = []
+    errors: int = 0
+    remaining: List[int] = [requests]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        try:
+            await client.get(url)
+        except httpx.HTTPError as e:
+            raise CommandError(f'Сервер недоступен: {url} ({e})')
+
+        async def worker() -> None:
+            nonlocal errors
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                started: float = time.perf_counter()
+                status_code: Optional[int]
+                try:
+                    status_code = (await client.get(url)).status_code
+                except httpx.HTTPError:
+                    status_code = None
+                latencies.append((time.perf_counter() - started) * 1000)
+                if status_code != 200:
+                    errors += 1
+
+        started: float = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+        elapsed: float = time.perf_counter() - started
+
+    cuts: List[float] = quantiles(latencies, n=100, method='inclusive')
+    return len(latencies) / elapsed, (cuts[49], cuts[94], cuts[98]), errors
+
+
+class Command(BaseCommand):
+    help: str = ('Нагрузочный бенчмарк API: sync-представления под WSGI и ASGI против async-представлений под ASGI '
+                 '(запросов в секунду и задержки p50/p95/p99)')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--wsgi-url', default='http://127.0.0.1:8000',
+                            help='Адрес WSGI-сервера (например, gunicorn divanru_vetclinic.wsgi)')
+        parser.add_argument('--asgi-url', default='http://127.0.0.1:8001',
+                            help='Адрес ASGI-сервера (например, uvicorn divanru_vetclinic.asgi:application)')
+        parser.add_argument('--requests', type=int, default=2000, help='Количество запросов на сценарий')
+        parser.add_argument('--concurrency', type=int, default=200, help='Количество одновременных запросов')
+        parser.add_argument('--user', type=int, help='ID клиента для замера GET /accounts/users/<id>/')
+        parser.add_argument('--timeout', type=float, default=30, help='Таймаут запроса в секундах')
+
+    def handle(self, *args: List[str], **kwargs: dict) -> None:
+        """
+        Нагружает запущенные серверы одинаковыми GET-запросами и выводит таблицу по каждому эндпоинту:
+        sync-представление под WSGI, то же представление под ASGI (поток на запрос через sync_to_async)
+        и async-представление под ASGI. Серверы запускаются отдельно и смотрят в одну БД.
+
+        :param args: Список аргументов командной строки (пока не используется).
+        :param kwargs: Словарь именованных аргументов командной строки.
+        """
+        if kwargs['requests'] < 2 or kwargs['concurrency'] < 1:
+            raise CommandError('Нужно не меньше 2 запросов и 1 одновременного запроса')
+
+        endpoints: List[Tuple[str, str]] = [
+            ('виды животных', 'vetclinics/animal-types/'),
+            ('свободные слоты', 'vetclinics/free-slots/?limit=20'),
+        ]
+        if kwargs['user'] is not None:
+            endpoints.append(('клиент', f'accounts/users/{kwargs["user"]}/'))
+
+        servers: List[Tuple[str, str, str]] = [
+            ('WSGI sync', kwargs['wsgi_url'].rstrip('/'), '/api/'),
+            ('ASGI sync', kwargs['asgi_url'].rstrip('/'), '/api/'),
+            ('ASGI async', kwargs['asgi_url'].rstrip('/'), '/api/async/'),
+        ]
+        self.stdout.write(f'Запросов на сценарий: {kwargs["requests"]}, одновременно: {kwargs["concurrency"]}')
+        self.stdout.write(f'{"эндпоинт":<16} {"сервер":<11} {"зап/с":>8} {"p50, мс":>8} {"p95, мс":>8} '
+                          f'{"p99, мс":>8} {"ошибок":>7}')
+        for title, path in endpoints:
+            for name, base_url, prefix in servers:
+                rate, percentiles, errors = asyncio.run(measure(
+                    base_url + prefix + path, kwargs['requests'], kwargs['concurrency'], kwargs['timeout'],
+                ))
+                p50, p95, p99 = percentiles
+                self.stdout.write(f'{title:<16} {name:<11} {rate:>8.0f} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} '
+                                  f'{errors:>7}')
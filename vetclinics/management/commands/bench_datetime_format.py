@@ -0,0 +1,63 @@
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, List
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from vetclinics.formats import DATETIME_FORMAT, format_datetime, parse_datetime
+
+
+def legacy_parse(value: str) -> datetime:
+    """ Прежний разбор CustomDateTimeField.to_internal_value. """
+    return datetime.strptime(value, DATETIME_FORMAT)
+
+
+def legacy_format(value: datetime) -> str:
+    """ Прежнее форматирование CustomDateTimeField.to_representation и FreeSlotsAPIView. """
+    return value.strftime(DATETIME_FORMAT)
+
+
+class Command(BaseCommand):
+    help: str = "Микробенчмарк разбора и форматирования даты и времени 'дд.мм.гггг чч:мм'"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--values', type=int, default=336,
+                            help='Количество значений (по умолчанию - слоты недели по 30 минут круглосуточно)')
+        parser.add_argument('--repeat', type=int, default=200, help='Количество повторов замера')
+
+    def handle(self, *args: List[str], **kwargs: dict) -> None:
+        """
+        Сравнивает strptime/strftime с разбором срезами и форматированием по таблице и проверяет,
+        что результаты совпадают.
+
+        :param args: Список аргументов командной строки (пока не используется).
+        :param kwargs: Словарь именованных аргументов командной строки.
+        """
+        rng = random.Random(0)
+        start: datetime = datetime(2024, 3, 25)
+        values: List[datetime] = [start + timedelta(minutes=30 * rng.randrange(100_000)) for _ in range(kwargs['values'])]
+        strings: List[str] = [legacy_format(value) for value in values]
+
+        if [format_datetime(value) for value in values] != strings or [parse_datetime(s) for s in strings] != values:
+            self.stdout.write(self.style.ERROR('Результаты реализаций расходятся'))
+
+        self.stdout.write(f'{"операция":<14} {"прежняя, мкс":>13} {"новая, мкс":>11} {"ускорение":>10}')
+        for title, legacy, fast, items in (('разбор', legacy_parse, parse_datetime, strings),
+                                           ('форматирование', legacy_format, format_datetime, values)):
+            legacy_us: float = self.measure(legacy, items, kwargs['repeat'])
+            fast_us: float = self.measure(fast, items, kwargs['repeat'])
+            self.stdout.write(f'{title:<14} {legacy_us:>13.3f} {fast_us:>11.3f} {legacy_us / fast_us:>9.1f}x')
+
+    @staticmethod
+    def measure(func: Callable[[Any], Any], items: List[Any], repeat: int) -> float:
+        """
+        Возвращает лучшее время одного вызова функции в микросекундах.
+        """
+        best: float = float('inf')
+        for _ in range(repeat):
+            started: float = time.perf_counter()
+            for item in items:
+                func(item)
+            best = min(best, time.perf_counter() - started)
+        return best / len(items) * 1_000_000
@@ -0,0 +1,111 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Callable, List
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+from vetclinics.availability import Availability, SLOT_MINUTES
+from vetclinics.formats import format_datetime, format_slots
+
+
+def legacy_free_slots(busy_slots: List[datetime], start_date: datetime, end_date: datetime) -> List[datetime]:
+    """
+    Прежний алгоритм FreeSlotsAPIView: обход всех получасовых шагов недели и поиск по списку.
+    """
+    free_slots: List[datetime] = []
+    current_date: datetime = start_date
+    while current_date < end_date:
+        if 9 <= current_date.hour < 18 and current_date not in busy_slots:
+            free_slots.append(current_date)
+        current_date += timedelta(minutes=30)
+    return free_slots
+
+
+def bitmap_free_slots(busy_slots: List[datetime], start_date: datetime, end_date: datetime) -> List[datetime]:
+    """
+    Расчет свободных слотов движком доступности на битовых масках.
+    """
+    availability = Availability(start_date.tzinfo)
+    availability.mark_busy_many(busy_slots)
+    return list(availability.free_slots(start_date.date(), end_date.date()))
+
+
+def datetime_strings(busy_slots: List[datetime], start_date: datetime, end_date: datetime) -> List[str]:
+    """
+    Строки ответа через aware datetime каждого слота и format_datetime.
+    """
+    availability = Availability(start_date.tzinfo)
+    availability.mark_busy_many(busy_slots)
+    return [format_datetime(slot) for slot in availability.free_slots(start_date.date(), end_date.date(), start_date)]
+
+
+def slot_strings(busy_slots: List[datetime], start_date: datetime, end_date: datetime) -> List[str]:
+    """
+    Строки ответа из номеров слотов и таблицы времени без создания datetime (как в FreeSlotsAPIView).
+    """
+    availability = Availability(start_date.tzinfo)
+    availability.mark_busy_many(busy_slots)
+    return list(format_slots(availability.iter_free_slots(start_date.date(), end_date.date(), start_date)))
+
+
+class Command(BaseCommand):
+    help: str = 'Микробенчмарк расчета свободных слотов (0, 1k и 100k записей на прием)'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--sizes', type=int, nargs='+', default=[0, 1000, 100000],
+                            help='Количество записей на прием в окне расчета')
+        parser.add_argument('--repeat', type=int, default=3, help='Количество повторов замера')
+
+    def handle(self, *args: List[str], **kwargs: dict) -> None:
+        """
+        Сравнивает прежний алгоритм и движок доступности на синтетических данных без обращения к БД.
+
+        :param args: Список аргументов командной строки (пока не используется).
+        :param kwargs: Словарь именованных аргументов командной строки.
+        """
+        start_date: datetime = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        end_date: datetime = start_date + timedelta(days=7)
+        slots_in_window: int = int((end_date - start_date).total_seconds() // 60 // SLOT_MINUTES)
+        rng = random.Random(0)
+
+        self.stdout.write(f'{"записей":>10} {"прежний, мс":>14} {"битовый, мс":>14} {"ускорение":>10}')
+        for size in kwargs['sizes']:
+            busy_slots: List[datetime] = [
+                (start_date + timedelta(minutes=SLOT_MINUTES * rng.randrange(slots_in_window))).astimezone(dt_timezone.utc)
+                for _ in range(size)
+            ]
+            legacy_ms: float = self.measure(legacy_free_slots, busy_slots, start_date, end_date, kwargs['repeat'])
+            bitmap_ms: float = self.measure(bitmap_free_slots, busy_slots, start_date, end_date, kwargs['repeat'])
+            if legacy_free_slots(busy_slots, start_date, end_date) != bitmap_free_slots(busy_slots, start_date,
+                                                                                       end_date):
+                self.stdout.write(self.style.ERROR(f'Результаты алгоритмов расходятся при {size} записях'))
+            self.stdout.write(
+                f'{size:>10} {legacy_ms:>14.3f} {bitmap_ms:>14.3f} {legacy_ms / max(bitmap_ms, 1e-9):>9.1f}x'
+            )
+
+        self.stdout.write(f'{"записей":>10} {"datetime, мс":>14} {"слоты, мс":>14} {"ускорение":>10}')
+        for size in kwargs['sizes']:
+            busy_slots = [start_date + timedelta(minutes=SLOT_MINUTES * rng.randrange(slots_in_window))
+                          for _ in range(size)]
+            datetime_ms: float = self.measure(datetime_strings, busy_slots, start_date, end_date, kwargs['repeat'])
+            slots_ms: float = self.measure(slot_strings, busy_slots, start_date, end_date, kwargs['repeat'])
+            if datetime_strings(busy_slots, start_date, end_date) != slot_strings(busy_slots, start_date, end_date):
+                self.stdout.write(self.style.ERROR(f'Строки ответа расходятся при {size} записях'))
+            self.stdout.write(
+                f'{size:>10} {datetime_ms:>14.3f} {slots_ms:>14.3f} {datetime_ms / max(slots_ms, 1e-9):>9.1f}x'
+            )
+
+    @staticmethod
+    def measure(func: Callable[..., list], busy_slots: List[datetime], start_date: datetime,
+                end_date: datetime, repeat: int) -> float:
+        """
+        Возвращает лучшее время выполнения функции в миллисекундах.
+        """
+        best: float = float('inf')
+        for _ in range(repeat):
+            started: float = time.perf_counter()
+            func(busy_slots, start_date, end_date)
+            best = min(best, time.perf_counter() - started)
+        return best * 1000
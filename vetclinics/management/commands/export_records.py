@@ -0,0 +1,50 @@
+import sys
+import time
+from typing import List, TextIO
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from vetclinics.records import RECORD_FORMATS, RECORDS, Records, detect_format, write_rows
+
+DEFAULT_CHUNK_SIZE: int = 2000
+
+
+class Command(BaseCommand):
+    help: str = 'Потоковая выгрузка клиентов или записей на прием в CSV/JSONL'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('kind', choices=sorted(RECORDS), help='Тип записей')
+        parser.add_argument('path', help='Путь к файлу ("-" - стандартный вывод)')
+        parser.add_argument('--format', choices=RECORD_FORMATS, help='Формат файла (по умолчанию по расширению)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help='Количество строк, выбираемых из БД за раз')
+
+    def handle(self, *args: List[str], **kwargs: dict) -> None:
+        """
+        Выгружает записи в формате импорта, не загружая таблицу в память целиком
+        (на PostgreSQL строки читаются серверным курсором).
+
+        :param args: Список аргументов командной строки (пока не используется).
+        :param kwargs: Словарь именованных аргументов командной строки.
+        """
+        path: str = kwargs['path']
+        try:
+            record_format: str = detect_format(path, kwargs['format'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        records: Records = RECORDS[kwargs['kind']]()
+        stream: TextIO = sys.stdout if path == '-' else open(path, 'w', encoding='utf-8', newline='')
+        started: float = time.perf_counter()
+        try:
+            count: int = write_rows(stream, record_format, records.columns,
+                                    records.export_rows(kwargs['chunk_size']))
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        elapsed: float = time.perf_counter() - started
+
+        report = self.stderr if path == '-' else self.stdout
+        report.write(self.style.SUCCESS(
+            f'Выгружено строк: {count}, время: {elapsed:.2f} с, скорость: {count / max(elapsed, 1e-9):.0f} строк/с'
+        ))
@@ -0,0 +1,36 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from vetclinics.occupancy import rebuild_occupancy
+
+
+def parse_day(value: str) -> date:
+    try:
+        return datetime.strptime(value, '%d.%m.%Y').date()
+    except ValueError:
+        raise CommandError(f'Неверная дата "{value}", ожидается формат дд.мм.гггг')
+
+
+class Command(BaseCommand):
+    help: str = 'Пересчитывает предрасчитанную занятость слотов (SlotOccupancy) по записям на прием'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--date-from', help='Первый день периода в формате дд.мм.гггг (по умолчанию все дни)')
+        parser.add_argument('--date-to', help='Последний день периода включительно в формате дд.мм.гггг')
+
+    def handle(self, *args: List[str], **kwargs: dict) -> None:
+        """
+        Пересчитывает занятость слотов за период в одной транзакции. Нужна после изменения записей
+        на прием в обход сигналов (QuerySet.update(), прямые SQL-запросы) и для проверки счетчиков.
+
+        :param args: Список аргументов командной строки (пока не используется).
+        :param kwargs: Словарь именованных аргументов командной строки.
+        """
+        start_day: Optional[date] = parse_day(kwargs['date_from']) if kwargs['date_from'] else None
+        end_day: Optional[date] = parse_day(kwargs['date_to']) + timedelta(days=1) if kwargs['date_to'] else None
+        if start_day is not None and end_day is not None and end_day <= start_day:
+            raise CommandError('Конец периода не может быть раньше начала')
+        rows: int = rebuild_occupancy(start_day, end_day)
+        self.stdout.write(self.style.SUCCESS(f'Занятых слотов: {rows}'))
@@ -0,0 +1,45 @@
+import importlib.util
+import os
+import sys
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+
+class Command(BaseCommand):
+    help: str = 'Запуск сервера приложений gunicorn в production-профиле (настройки в gunicorn.conf.py)'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--asgi', action='store_true', help='ASGI-приложение на воркерах uvicorn')
+        parser.add_argument('--bind', help='Адрес и порт, по умолчанию 0.0.0.0:8000')
+        parser.add_argument('--workers', type=int, help='Количество воркеров, по умолчанию по числу ядер')
+        parser.add_argument('--bench', type=int, nargs='?', const=1000, default=0,
+                            help='Стартовый замер: количество запросов к каждому эндпоинту после запуска')
+
+    def handle(self, *args: List[str], **kwargs: dict) -> None:
+        """
+        Заменяет текущий процесс мастером gunicorn с конфигурацией gunicorn.conf.py;
+        параметры командной строки передаются ей через переменные окружения.
+
+        :param args: Список аргументов командной строки (пока не используется).
+        :param kwargs: Словарь именованных аргументов командной строки.
+        """
+        if importlib.util.find_spec('gunicorn') is None:
+            raise CommandError('gunicorn не установлен (pip install -r requirements.txt)')
+        if kwargs['asgi'] and importlib.util.find_spec('uvicorn') is None:
+            raise CommandError('uvicorn не установлен (pip install -r requirements.txt)')
+
+        env: Dict[str, str] = dict(os.environ)
+        if kwargs['asgi']:
+            env['GUNICORN_ASGI'] = 'true'
+        if kwargs['bind']:
+            env['GUNICORN_BIND'] = kwargs['bind']
+        if kwargs['workers']:
+            env['WEB_CONCURRENCY'] = str(kwargs['workers'])
+        if kwargs['bench']:
+            env['GUNICORN_BENCH'] = str(kwargs['bench'])
+
+        config: str = os.path.join(settings.BASE_DIR, 'gunicorn.conf.py')
+        sys.stdout.flush()
+        os.execve(sys.executable, [sys.executable, '-m', 'gunicorn', '-c', config], env)
@@ -0,0 +1,42 @@
+# Generated by Django 4.2 on 2026-10-18 14:52
+
+from django.db import migrations, models
+
+
+def deactivate_duplicate_appointments(apps, schema_editor):
+    """
+    Деактивирует повторные активные записи на один и тот же слот, оставляя самую раннюю,
+    иначе уникальный индекс не получится создать.
+    """
+    Appointment = apps.get_model('vetclinics', 'Appointment')
+    duplicates = (
+        Appointment.objects.filter(is_active=True)
+        .values('appointment_date', 'animal_type')
+        .annotate(first_id=models.Min('id'), total=models.Count('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        Appointment.objects.filter(
+            is_active=True,
+            appointment_date=duplicate['appointment_date'],
+            animal_type=duplicate['animal_type'],
+        ).exclude(id=duplicate['first_id']).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vetclinics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(deactivate_duplicate_appointments, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['appointment_date'], name='appointment_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('appointment_date', 'animal_type'), name='unique_active_appointment_slot', violation_error_message='Выбранный слот уже занят'),
+        ),
+    ]
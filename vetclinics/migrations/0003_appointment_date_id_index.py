@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-18 15:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vetclinics', '0002_appointment_slot_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['appointment_date', 'id'], name='appointment_date_id_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='appointment',
+            name='appointment_date_idx',
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2 on 2026-10-18 18:40
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+SLOT_MINUTES = 30
+
+
+def fill_slot_occupancy(apps, schema_editor):
+    """
+    Заполняет занятость слотов по существующим активным записям на прием (по времени клиники).
+    Записи, время которых не совпадает с началом слота, слоты не занимают.
+    """
+    Appointment = apps.get_model('vetclinics', 'Appointment')
+    SlotOccupancy = apps.get_model('vetclinics', 'SlotOccupancy')
+    tz = timezone.get_default_timezone()
+    counts = Counter()
+    appointments = Appointment.objects.filter(is_active=True).values_list('appointment_date', 'animal_type_id')
+    for appointment_date, animal_type_id in appointments.iterator(chunk_size=10000):
+        local = appointment_date.astimezone(tz)
+        minute_of_day = local.hour * 60 + local.minute
+        if minute_of_day % SLOT_MINUTES or local.second or local.microsecond:
+            continue
+        counts[animal_type_id, local.date(), minute_of_day // SLOT_MINUTES] += 1
+    SlotOccupancy.objects.bulk_create(
+        [SlotOccupancy(animal_type_id=animal_type_id, day=day, slot=slot, booked=booked)
+         for (animal_type_id, day, slot), booked in counts.items()],
+        batch_size=10000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vetclinics', '0003_appointment_date_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День (по времени клиники)')),
+                ('slot', models.PositiveSmallIntegerField(verbose_name='Номер слота в дне')),
+                ('booked', models.IntegerField(default=0, verbose_name='Количество записей')),
+                ('animal_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_occupancies', to='vetclinics.animaltype', verbose_name='Вид животного')),
+            ],
+            options={
+                'verbose_name': 'Занятость слота',
+                'verbose_name_plural': 'Занятость слотов',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='slotoccupancy',
+            index=models.Index(fields=['day', 'slot'], name='slot_occupancy_day_slot_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='slotoccupancy',
+            constraint=models.UniqueConstraint(fields=('animal_type', 'day', 'slot'), name='unique_slot_occupancy'),
+        ),
+        migrations.RunPython(fill_slot_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,147 @@
+# Generated by Django 4.2 on 2026-10-18 19:20
+
+import datetime
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import vetclinics.models
+
+
+def create_default_schedule(apps, schema_editor):
+    """
+    Создает активное расписание, совпадающее с прежними постоянными: каждый день 09:00-18:00,
+    прием 30 минут, в слот одно животное каждого вида.
+    """
+    ClinicSchedule = apps.get_model('vetclinics', 'ClinicSchedule')
+    WorkingHours = apps.get_model('vetclinics', 'WorkingHours')
+    schedule = ClinicSchedule.objects.create(name='Основное расписание', slot_minutes=30, capacity=1)
+    WorkingHours.objects.bulk_create([
+        WorkingHours(schedule=schedule, weekday=weekday, opens_at=datetime.time(9), closes_at=datetime.time(18))
+        for weekday in range(7)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vetclinics', '0004_slot_occupancy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClinicSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата редактирования')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Активность')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+                ('slot_minutes', models.PositiveSmallIntegerField(choices=[(30, '30 минут'), (60, '1 час'), (90, '1 час 30 минут'), (120, '2 часа')], default=30, verbose_name='Длительность приема')),
+                ('capacity', models.PositiveSmallIntegerField(default=1, help_text='Сколько животных одного вида принимают одновременно, если для вида не задано иное', validators=[django.core.validators.MinValueValidator(1)], verbose_name='Вместимость слота')),
+            ],
+            options={
+                'verbose_name': 'Расписание клиники',
+                'verbose_name_plural': 'Расписания клиники',
+            },
+        ),
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('name', models.CharField(blank=True, max_length=100, verbose_name='Название')),
+            ],
+            options={
+                'verbose_name': 'Нерабочий день',
+                'verbose_name_plural': 'Нерабочие дни',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScheduleBreak',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(blank=True, choices=[(0, 'Понедельник'), (1, 'Вторник'), (2, 'Среда'), (3, 'Четверг'), (4, 'Пятница'), (5, 'Суббота'), (6, 'Воскресенье')], help_text='Пусто - каждый день', null=True, verbose_name='День недели')),
+                ('starts_at', models.TimeField(validators=[vetclinics.models.validate_grid_time], verbose_name='Начало перерыва')),
+                ('ends_at', models.TimeField(validators=[vetclinics.models.validate_grid_time], verbose_name='Конец перерыва')),
+            ],
+            options={
+                'verbose_name': 'Перерыв',
+                'verbose_name_plural': 'Перерывы',
+                'ordering': ['weekday', 'starts_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SlotCapacity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('capacity', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1)], verbose_name='Вместимость слота')),
+            ],
+            options={
+                'verbose_name': 'Вместимость слота',
+                'verbose_name_plural': 'Вместимость слотов',
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkingHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Понедельник'), (1, 'Вторник'), (2, 'Среда'), (3, 'Четверг'), (4, 'Пятница'), (5, 'Суббота'), (6, 'Воскресенье')], verbose_name='День недели')),
+                ('opens_at', models.TimeField(validators=[vetclinics.models.validate_grid_time], verbose_name='Начало работы')),
+                ('closes_at', models.TimeField(validators=[vetclinics.models.validate_grid_time], verbose_name='Конец работы')),
+            ],
+            options={
+                'verbose_name': 'Часы работы',
+                'verbose_name_plural': 'Часы работы',
+                'ordering': ['weekday'],
+            },
+        ),
+        migrations.RemoveConstraint(
+            model_name='appointment',
+            name='unique_active_appointment_slot',
+        ),
+        migrations.AddField(
+            model_name='workinghours',
+            name='schedule',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='working_hours', to='vetclinics.clinicschedule', verbose_name='Расписание'),
+        ),
+        migrations.AddField(
+            model_name='slotcapacity',
+            name='animal_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_capacities', to='vetclinics.animaltype', verbose_name='Вид животного'),
+        ),
+        migrations.AddField(
+            model_name='slotcapacity',
+            name='schedule',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='capacities', to='vetclinics.clinicschedule', verbose_name='Расписание'),
+        ),
+        migrations.AddField(
+            model_name='schedulebreak',
+            name='schedule',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='breaks', to='vetclinics.clinicschedule', verbose_name='Расписание'),
+        ),
+        migrations.AddField(
+            model_name='holiday',
+            name='schedule',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holidays', to='vetclinics.clinicschedule', verbose_name='Расписание'),
+        ),
+        migrations.AddConstraint(
+            model_name='clinicschedule',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('is_active',), name='unique_active_clinic_schedule', violation_error_message='Активным может быть только одно расписание'),
+        ),
+        migrations.AddConstraint(
+            model_name='workinghours',
+            constraint=models.UniqueConstraint(fields=('schedule', 'weekday'), name='unique_working_hours_weekday'),
+        ),
+        migrations.AddConstraint(
+            model_name='slotcapacity',
+            constraint=models.UniqueConstraint(fields=('schedule', 'animal_type'), name='unique_slot_capacity'),
+        ),
+        migrations.AddConstraint(
+            model_name='holiday',
+            constraint=models.UniqueConstraint(fields=('schedule', 'day'), name='unique_holiday_day'),
+        ),
+        migrations.RunPython(create_default_schedule, migrations.RunPython.noop),
+    ]
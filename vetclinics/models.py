@@ -1,3 +1,5 @@
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
 from django.db import models
 from django.utils.text import slugify
 
@@ -33,6 +35,177 @@ class Appointment(DateTimeBaseModel):
     class Meta:
         verbose_name = 'Запись на прием'
         verbose_name_plural = 'Записи на прием'
+        indexes = [
+            models.Index(fields=['appointment_date', 'id'], name='appointment_date_id_idx'),
+        ]
 
     def __str__(self):
         return f'Запись клиента {self.client.get_full_name()} на {self.appointment_date}'
+
+
+class SlotOccupancy(models.Model):
+    """
+    Количество активных записей на прием в слот дня для вида животного.
+
+    Поддерживается модулем vetclinics.occupancy: сигналами при сохранении и удалении записи на прием
+    и явно в пакетных путях (bulk_create, импорт). Перестраивается командой rebuild_slot_occupancy.
+    """
+    day = models.DateField(verbose_name='День (по времени клиники)')
+    slot = models.PositiveSmallIntegerField(verbose_name='Номер слота в дне')
+    animal_type = models.ForeignKey('vetclinics.AnimalType', on_delete=models.CASCADE,
+                                    related_name='slot_occupancies', verbose_name='Вид животного')
+    booked = models.IntegerField(default=0, verbose_name='Количество записей')
+
+    class Meta:
+        verbose_name = 'Занятость слота'
+        verbose_name_plural = 'Занятость слотов'
+        constraints = [
+            models.UniqueConstraint(fields=['animal_type', 'day', 'slot'], name='unique_slot_occupancy'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'slot'], name='slot_occupancy_day_slot_idx'),
+        ]
+
+    def __str__(self):
+        return f'Слот {self.slot} {self.day}: {self.booked}'
+
+
+WEEKDAYS = [
+    (0, 'Понедельник'),
+    (1, 'Вторник'),
+    (2, 'Среда'),
+    (3, 'Четверг'),
+    (4, 'Пятница'),
+    (5, 'Суббота'),
+    (6, 'Воскресенье'),
+]
+
+# Длительность приема кратна шагу сетки слотов (vetclinics.availability.SLOT_MINUTES), по которой
+# хранится занятость слотов.
+SLOT_DURATIONS = [
+    (30, '30 минут'),
+    (60, '1 час'),
+    (90, '1 час 30 минут'),
+    (120, '2 часа'),
+]
+
+
+def validate_grid_time(value) -> None:
+    """
+    Проверяет, что время совпадает с началом получасового слота.
+
+    Raises:
+        ValidationError: Если минуты не равны 00 или 30.
+    """
+    if value.minute % 30 or value.second or value.microsecond:
+        raise ValidationError('Минуты должны быть равны 00 или 30')
+
+
+class ClinicSchedule(DateTimeBaseModel):
+    """
+    Расписание клиники: длительность приема и вместимость слота. Часы работы, перерывы, праздничные дни
+    и вместимость по видам животных задаются связанными моделями. Действует одно активное расписание.
+    """
+    name = models.CharField(max_length=100, verbose_name='Название')
+    slot_minutes = models.PositiveSmallIntegerField(choices=SLOT_DURATIONS, default=30,
+                                                    verbose_name='Длительность приема')
+    capacity = models.PositiveSmallIntegerField(default=1, validators=[MinValueValidator(1)],
+                                                verbose_name='Вместимость слота',
+                                                help_text='Сколько животных одного вида принимают одновременно, '
+                                                          'если для вида не задано иное')
+
+    class Meta:
+        verbose_name = 'Расписание клиники'
+        verbose_name_plural = 'Расписания клиники'
+        constraints = [
+            models.UniqueConstraint(fields=['is_active'], condition=models.Q(is_active=True),
+                                    name='unique_active_clinic_schedule',
+                                    violation_error_message='Активным может быть только одно расписание'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class WorkingHours(models.Model):
+    """ Часы работы клиники в день недели. Дни недели без часов работы - выходные. """
+    schedule = models.ForeignKey('vetclinics.ClinicSchedule', on_delete=models.CASCADE, related_name='working_hours',
+                                 verbose_name='Расписание')
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAYS, verbose_name='День недели')
+    opens_at = models.TimeField(validators=[validate_grid_time], verbose_name='Начало работы')
+    closes_at = models.TimeField(validators=[validate_grid_time], verbose_name='Конец работы')
+
+    class Meta:
+        verbose_name = 'Часы работы'
+        verbose_name_plural = 'Часы работы'
+        ordering = ['weekday']
+        constraints = [
+            models.UniqueConstraint(fields=['schedule', 'weekday'], name='unique_working_hours_weekday'),
+        ]
+
+    def clean(self):
+        if self.opens_at and self.closes_at and self.opens_at >= self.closes_at:
+            raise ValidationError('Конец работы должен быть позже начала')
+
+    def __str__(self):
+        return f'{self.get_weekday_display()} {self.opens_at:%H:%M}-{self.closes_at:%H:%M}'
+
+
+class ScheduleBreak(models.Model):
+    """ Перерыв в работе клиники в день недели или каждый день. """
+    schedule = models.ForeignKey('vetclinics.ClinicSchedule', on_delete=models.CASCADE, related_name='breaks',
+                                 verbose_name='Расписание')
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAYS, null=True, blank=True, verbose_name='День недели',
+                                               help_text='Пусто - каждый день')
+    starts_at = models.TimeField(validators=[validate_grid_time], verbose_name='Начало перерыва')
+    ends_at = models.TimeField(validators=[validate_grid_time], verbose_name='Конец перерыва')
+
+    class Meta:
+        verbose_name = 'Перерыв'
+        verbose_name_plural = 'Перерывы'
+        ordering = ['weekday', 'starts_at']
+
+    def clean(self):
+        if self.starts_at and self.ends_at and self.starts_at >= self.ends_at:
+            raise ValidationError('Конец перерыва должен быть позже начала')
+
+    def __str__(self):
+        return f'Перерыв {self.starts_at:%H:%M}-{self.ends_at:%H:%M}'
+
+
+class Holiday(models.Model):
+    """ Нерабочий день клиники (праздник, санитарный день). """
+    schedule = models.ForeignKey('vetclinics.ClinicSchedule', on_delete=models.CASCADE, related_name='holidays',
+                                 verbose_name='Расписание')
+    day = models.DateField(verbose_name='День')
+    name = models.CharField(max_length=100, blank=True, verbose_name='Название')
+
+    class Meta:
+        verbose_name = 'Нерабочий день'
+        verbose_name_plural = 'Нерабочие дни'
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(fields=['schedule', 'day'], name='unique_holiday_day'),
+        ]
+
+    def __str__(self):
+        return f'{self.day:%d.%m.%Y} {self.name}'.strip()
+
+
+class SlotCapacity(models.Model):
+    """ Вместимость слота для вида животного (вместо вместимости расписания). """
+    schedule = models.ForeignKey('vetclinics.ClinicSchedule', on_delete=models.CASCADE, related_name='capacities',
+                                 verbose_name='Расписание')
+    animal_type = models.ForeignKey('vetclinics.AnimalType', on_delete=models.CASCADE, related_name='slot_capacities',
+                                    verbose_name='Вид животного')
+    capacity = models.PositiveSmallIntegerField(validators=[MinValueValidator(1)], verbose_name='Вместимость слота')
+
+    class Meta:
+        verbose_name = 'Вместимость слота'
+        verbose_name_plural = 'Вместимость слотов'
+        constraints = [
+            models.UniqueConstraint(fields=['schedule', 'animal_type'], name='unique_slot_capacity'),
+        ]
+
+    def __str__(self):
+        return f'{self.animal_type}: {self.capacity}'
@@ -0,0 +1,308 @@
+"""
+Предрасчитанная занятость слотов (модель SlotOccupancy).
+
+Каждая активная запись на прием, время которой совпадает с началом слота, увеличивает счетчик
+строки (вид животного, день, слот); день и слот считаются по времени клиники (TIME_ZONE).
+Записи не по сетке слотов и отмененные записи слоты не занимают, как и в движке доступности.
+
+Счетчики меняются приращениями:
+- save() и delete() записи на прием - сигналами (vetclinics.signals);
+- bulk_create, COPY и другие пакетные пути вызывают apply_occupancy(occupancy_deltas(...)) сами;
+- запись на прием через vetclinics.services занимает слот reserve_occupancy, не превышая вместимость слота
+  из расписания клиники (vetclinics.schedule).
+
+При каждом изменении счетчиков сбрасывается кеш занятых слотов измененных дней (vetclinics.caches).
+QuerySet.update() сигналов не отправляет, после таких изменений занятость нужно перестроить командой
+rebuild_slot_occupancy (она же сбрасывает кеш).
+"""
+from collections import Counter
+from datetime import date, datetime, time, tzinfo
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from django.db import connections, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .availability import Availability, slot_index
+from .caches import aget_busy_masks, get_busy_masks, invalidate_busy_slots
+from .models import Appointment, SlotOccupancy
+from .schedule import CompiledSchedule, aget_schedule, get_schedule
+
+OccupancyKey = Tuple[int, date, int]
+UPSERT_BATCH_SIZE: int = 200
+
+
+class SlotCapacityError(Exception):
+    """ Приращения занятости превышают вместимость слотов. """
+
+    def __init__(self, keys: List[OccupancyKey]) -> None:
+        super().__init__(f'Слоты заполнены: {keys}')
+        self.keys: List[OccupancyKey] = keys
+
+
+def occupancy_key(appointment_date: datetime, animal_type_id: int, is_active: bool,
+                  tz: Optional[tzinfo] = None) -> Optional[OccupancyKey]:
+    """
+    Возвращает строку занятости, которую занимает запись на прием.
+
+    Args:
+        appointment_date (datetime): Дата и время записи (aware).
+        animal_type_id (int): ID вида животного.
+        is_active (bool): Активность записи.
+        tz (Optional[tzinfo]): Часовой пояс клиники, по умолчанию TIME_ZONE.
+
+    Returns:
+        Optional[OccupancyKey]: (ID вида животного, день, номер слота) или None, если запись слот не занимает.
+    """
+    if not is_active or appointment_date is None or animal_type_id is None:
+        return None
+    local: datetime = appointment_date.astimezone(tz or timezone.get_default_timezone())
+    index: Optional[int] = slot_index(local)
+    if index is None:
+        return None
+    return animal_type_id, local.date(), index
+
+
+def appointment_key(appointment: Appointment) -> Optional[OccupancyKey]:
+    """ Строка занятости записи на прием (см. occupancy_key). """
+    return occupancy_key(appointment.appointment_date, appointment.animal_type_id, appointment.is_active)
+
+
+def occupancy_deltas(appointments: Iterable[Appointment], sign: int = 1) -> Counter:
+    """
+    Считает приращения счетчиков для пачки новых (sign=1) или удаленных (sign=-1) записей на прием.
+    """
+    tz: tzinfo = timezone.get_default_timezone()
+    deltas: Counter = Counter()
+    for appointment in appointments:
+        key: Optional[OccupancyKey] = occupancy_key(appointment.appointment_date, appointment.animal_type_id,
+                                                    appointment.is_active, tz)
+        if key is not None:
+            deltas[key] += sign
+    return deltas
+
+
+def apply_occupancy(deltas: Mapping[OccupancyKey, int], using: str = 'default') -> None:
+    """
+    Применяет приращения счетчиков занятости.
+
+    Положительные приращения применяются пачками INSERT ... ON CONFLICT DO UPDATE (PostgreSQL и SQLite),
+    отрицательные - UPDATE существующих строк: строка уже удаленного вида животного не создается заново.
+    Кеш занятых слотов измененных дней сбрасывается.
+
+    Args:
+        deltas (Mapping[OccupancyKey, int]): Приращения по строкам занятости.
+        using (str): Алиас БД.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table: str = quote(SlotOccupancy._meta.db_table)
+    increments: List[Tuple[OccupancyKey, int]] = [(key, delta) for key, delta in deltas.items() if delta > 0]
+    decrements: List[Tuple[OccupancyKey, int]] = [(key, delta) for key, delta in deltas.items() if delta < 0]
+    with connection.cursor() as cursor:
+        for start in range(0, len(increments), UPSERT_BATCH_SIZE):
+            batch = increments[start:start + UPSERT_BATCH_SIZE]
+            params: list = []
+            for (animal_type_id, day, slot), delta in batch:
+                params += [animal_type_id, connection.ops.adapt_datefield_value(day), slot, delta]
+            cursor.execute(
+                f'INSERT INTO {table} (animal_type_id, day, slot, booked) '
+                f'VALUES {", ".join(["(%s, %s, %s, %s)"] * len(batch))} '
+                f'ON CONFLICT (animal_type_id, day, slot) DO UPDATE SET booked = {table}.booked + excluded.booked',
+                params,
+            )
+        for (animal_type_id, day, slot), delta in decrements:
+            cursor.execute(
+                f'UPDATE {table} SET booked = booked + %s WHERE animal_type_id = %s AND day = %s AND slot = %s',
+                [delta, animal_type_id, connection.ops.adapt_datefield_value(day), slot],
+            )
+    invalidate_busy_slots((animal_type_id, day) for (animal_type_id, day, _), delta in deltas.items() if delta)
+
+
+def occupancy_counts(keys: Iterable[OccupancyKey], using: str = 'default') -> Dict[OccupancyKey, int]:
+    """
+    Возвращает счетчики занятости строк одним запросом.
+
+    Запрос выбирает строки по декартову произведению видов животных, дней и слотов,
+    лишние строки отбрасываются в Python.
+
+    Args:
+        keys (Iterable[OccupancyKey]): Строки занятости.
+        using (str): Алиас БД.
+
+    Returns:
+        Dict[OccupancyKey, int]: Количество записей для существующих строк.
+    """
+    keys = set(keys)
+    if not keys:
+        return {}
+    rows = SlotOccupancy.objects.using(using).filter(
+        animal_type_id__in={animal_type_id for animal_type_id, _, _ in keys},
+        day__in={day for _, day, _ in keys},
+        slot__in={slot for _, _, slot in keys},
+    )
+    return {(animal_type_id, day, slot): booked
+            for animal_type_id, day, slot, booked in rows.values_list('animal_type_id', 'day', 'slot', 'booked')
+            if (animal_type_id, day, slot) in keys}
+
+
+def reserve_occupancy(deltas: Mapping[OccupancyKey, int], capacity: Callable[[int], int],
+                      using: str = 'default') -> None:
+    """
+    Применяет приращения счетчиков занятости, не превышая вместимость слотов. Вызывается в транзакции,
+    которая при ошибке откатывается.
+
+    Одна строка занимается одним условным INSERT ... ON CONFLICT DO UPDATE ... WHERE: у заполненного слота
+    счетчик не меняется. Несколько строк занимаются apply_occupancy, затем получившиеся счетчики проверяются
+    одним запросом: измененные строки заблокированы до конца транзакции, поэтому параллельная запись
+    на тот же слот увидит счетчик с этой записью.
+
+    Args:
+        deltas (Mapping[OccupancyKey, int]): Положительные приращения по строкам занятости.
+        capacity (Callable[[int], int]): Вместимость слота по ID вида животного (CompiledSchedule.capacity).
+        using (str): Алиас БД.
+
+    Raises:
+        SlotCapacityError: Если занятость хотя бы одного слота превышает вместимость.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta > 0}
+    overbooked: List[OccupancyKey] = [key for key, delta in deltas.items() if delta > capacity(key[0])]
+    if overbooked:
+        raise SlotCapacityError(overbooked)
+    if len(deltas) != 1:
+        apply_occupancy(deltas, using)
+        overbooked = [key for key, booked in occupancy_counts(deltas, using).items() if booked > capacity(key[0])]
+        if overbooked:
+            raise SlotCapacityError(overbooked)
+        return
+
+    connection = connections[using]
+    table: str = connection.ops.quote_name(SlotOccupancy._meta.db_table)
+    [((animal_type_id, day, slot), delta)] = deltas.items()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (animal_type_id, day, slot, booked) VALUES (%s, %s, %s, %s) '
+            f'ON CONFLICT (animal_type_id, day, slot) DO UPDATE SET booked = {table}.booked + excluded.booked '
+            f'WHERE {table}.booked + excluded.booked <= %s',
+            [animal_type_id, connection.ops.adapt_datefield_value(day), slot, delta, capacity(animal_type_id)],
+        )
+        if cursor.rowcount == 0:
+            raise SlotCapacityError([(animal_type_id, day, slot)])
+    invalidate_busy_slots([(animal_type_id, day)])
+
+
+def _busy_rows(days: List[date], animal_type_id: Optional[int], capacity: int) -> QuerySet:
+    """ Пары (день, слот) занятых слотов дней. """
+    rows = SlotOccupancy.objects.filter(day__in=days)
+    if animal_type_id is not None:
+        rows = rows.filter(animal_type_id=animal_type_id, booked__gte=capacity)
+    else:
+        rows = rows.filter(booked__gt=0)
+    return rows.order_by().values_list('day', 'slot').distinct()
+
+
+def load_busy_masks(days: List[date], animal_type_id: Optional[int] = None, capacity: int = 1) -> Dict[date, int]:
+    """
+    Собирает маски занятых слотов дней из предрасчитанных строк одним запросом.
+
+    Args:
+        days (List[date]): Дни.
+        animal_type_id (Optional[int]): ID вида животного. Без него слот занят при записи любого вида.
+        capacity (int): Вместимость слота вида животного: слот занят, когда записей не меньше.
+
+    Returns:
+        Dict[date, int]: Маски занятых слотов (дни без занятых слотов не возвращаются).
+    """
+    masks: Dict[date, int] = {}
+    for day, slot in _busy_rows(days, animal_type_id, capacity).iterator():
+        masks[day] = masks.get(day, 0) | (1 << slot)
+    return masks
+
+
+async def aload_busy_masks(days: List[date], animal_type_id: Optional[int] = None,
+                           capacity: int = 1) -> Dict[date, int]:
+    """ Async-версия load_busy_masks (строки читаются async-итерацией по QuerySet). """
+    masks: Dict[date, int] = {}
+    async for day, slot in _busy_rows(days, animal_type_id, capacity):
+        masks[day] = masks.get(day, 0) | (1 << slot)
+    return masks
+
+
+def load_availability(start_day: date, end_day: date, animal_type_id: Optional[int] = None) -> Availability:
+    """
+    Собирает занятость слотов диапазона дней: маски дней берутся из кеша (vetclinics.caches),
+    а отсутствующие в кеше дни загружаются одним запросом к предрасчитанным строкам.
+    Рабочие слоты и вместимость слота берутся из расписания клиники.
+
+    Args:
+        start_day (date): Первый день диапазона.
+        end_day (date): День, следующий за последним днем диапазона.
+        animal_type_id (Optional[int]): ID вида животного. Без него слот занят при записи любого вида.
+
+    Returns:
+        Availability: Занятость слотов в часовом поясе клиники.
+    """
+    schedule: CompiledSchedule = get_schedule()
+    capacity: int = schedule.capacity(animal_type_id) if animal_type_id is not None else 1
+    availability = Availability(timezone.get_default_timezone(), schedule.working_mask)
+    masks: Dict[date, int] = get_busy_masks(start_day, end_day, animal_type_id, schedule.version,
+                                            lambda days: load_busy_masks(days, animal_type_id, capacity))
+    for day, mask in masks.items():
+        availability.mark_busy_mask(day, mask)
+    return availability
+
+
+async def aload_availability(start_day: date, end_day: date, animal_type_id: Optional[int] = None) -> Availability:
+    """ Async-версия load_availability. """
+    schedule: CompiledSchedule = await aget_schedule()
+    capacity: int = schedule.capacity(animal_type_id) if animal_type_id is not None else 1
+    availability = Availability(timezone.get_default_timezone(), schedule.working_mask)
+    masks: Dict[date, int] = await aget_busy_masks(start_day, end_day, animal_type_id, schedule.version,
+                                                   lambda days: aload_busy_masks(days, animal_type_id, capacity))
+    for day, mask in masks.items():
+        availability.mark_busy_mask(day, mask)
+    return availability
+
+
+def rebuild_occupancy(start_day: Optional[date] = None, end_day: Optional[date] = None,
+                      chunk_size: int = 10_000) -> int:
+    """
+    Пересчитывает занятость слотов по записям на прием в одной транзакции и сбрасывает кеш занятых слотов
+    пересчитанных дней.
+
+    Args:
+        start_day (Optional[date]): Первый день диапазона, по умолчанию - без ограничения.
+        end_day (Optional[date]): День, следующий за последним днем диапазона, по умолчанию - без ограничения.
+        chunk_size (int): Размер порции при чтении записей на прием.
+
+    Returns:
+        int: Количество занятых строк после пересчета.
+    """
+    tz: tzinfo = timezone.get_default_timezone()
+    appointments = Appointment.objects.filter(is_active=True)
+    rows = SlotOccupancy.objects.all()
+    if start_day is not None:
+        appointments = appointments.filter(appointment_date__gte=datetime.combine(start_day, time.min, tzinfo=tz))
+        rows = rows.filter(day__gte=start_day)
+    if end_day is not None:
+        appointments = appointments.filter(appointment_date__lt=datetime.combine(end_day, time.min, tzinfo=tz))
+        rows = rows.filter(day__lt=end_day)
+
+    with transaction.atomic():
+        counts: Dict[OccupancyKey, int] = Counter()
+        for appointment_date, animal_type_id in appointments.order_by().values_list(
+                'appointment_date', 'animal_type_id').iterator(chunk_size=chunk_size):
+            key: Optional[OccupancyKey] = occupancy_key(appointment_date, animal_type_id, True, tz)
+            if key is not None:
+                counts[key] += 1
+        changed: Set[Tuple[int, date]] = set(rows.order_by().values_list('animal_type_id', 'day').distinct())
+        changed.update((animal_type_id, day) for animal_type_id, day, _ in counts)
+        rows.delete()
+        invalidate_busy_slots(changed)
+        SlotOccupancy.objects.bulk_create(
+            [SlotOccupancy(animal_type_id=animal_type_id, day=day, slot=slot, booked=booked)
+             for (animal_type_id, day, slot), booked in counts.items()],
+            batch_size=chunk_size,
+        )
+    return len(counts)
+
@@ -0,0 +1,445 @@
+"""
+Потоковый импорт и экспорт клиентов и записей на прием в файлах CSV и JSONL.
+
+Строки читаются и проверяются пачками: правила те же, что у сериализаторов API (AccountSerializer,
+AppointmentSerializer), существование связанных объектов и занятость слотов проверяются одним запросом
+на пачку. Пачка вставляется через bulk_create или COPY (PostgreSQL) в отдельной транзакции.
+"""
+import csv
+import io
+import json
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, TextIO, Tuple, Type
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, models, transaction
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from rest_framework import serializers
+
+from accounts.api.serializers import AccountSerializer
+from accounts.models import Account
+from vetclinics.api.serializers import AppointmentSerializer
+from vetclinics.formats import format_datetime
+from vetclinics.models import AnimalType, Appointment
+from vetclinics.occupancy import SlotCapacityError, occupancy_deltas, reserve_occupancy
+from vetclinics.schedule import CompiledSchedule, get_schedule
+from vetclinics.services import RelatedObjectNotFoundError, SlotAlreadyTakenError, slot_bookings
+
+RECORD_FORMATS: Tuple[str, ...] = ('csv', 'jsonl')
+DEFAULT_BATCH_SIZE: int = 1000
+COPY_NULL: str = '\\N'
+
+Row = Dict[str, Any]
+
+
+class Reject(NamedTuple):
+    """
+    Отклоненная строка файла.
+
+    Attributes:
+        line (int): Номер строки в файле.
+        row (Any): Исходные данные строки.
+        errors (Any): Ошибки валидации или вставки.
+    """
+    line: int
+    row: Any
+    errors: Any
+
+
+class ImportStats(NamedTuple):
+    """
+    Итоги импорта.
+
+    Attributes:
+        total (int): Прочитано строк.
+        imported (int): Загружено строк.
+        rejected (int): Отклонено строк.
+    """
+    total: int
+    imported: int
+    rejected: int
+
+
+Accepted = List[Tuple[int, Row, models.Model]]
+
+
+def detect_format(path: str, record_format: Optional[str] = None) -> str:
+    """
+    Определяет формат файла по явному указанию или расширению.
+
+    Raises:
+        ValueError: Если формат не удалось определить.
+    """
+    if record_format:
+        return record_format
+    if path.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if path.endswith('.csv'):
+        return 'csv'
+    raise ValueError(f'Не удалось определить формат файла {path}, укажите --format')
+
+
+def read_rows(stream: TextIO, record_format: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Лениво читает строки файла.
+
+    Args:
+        stream (TextIO): Открытый файл.
+        record_format (str): Формат файла (csv или jsonl).
+
+    Returns:
+        Iterator[Tuple[int, Any]]: Номер строки и словарь с данными
+            (для строки JSONL, которую не удалось разобрать, - исходный текст).
+    """
+    if record_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {key: value for key, value in row.items() if key is not None and value is not None}
+        return
+    for line, text in enumerate(stream, 1):
+        if not text.strip():
+            continue
+        try:
+            yield line, json.loads(text)
+        except ValueError:
+            yield line, text.rstrip('\n')
+
+
+def write_rows(stream: TextIO, record_format: str, columns: Iterable[str], rows: Iterable[Row]) -> int:
+    """
+    Записывает строки в файл по мере их получения.
+
+    Returns:
+        int: Количество записанных строк.
+    """
+    count: int = 0
+    if record_format == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=list(columns))
+        writer.writeheader()
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+        return count
+    for count, row in enumerate(rows, 1):
+        stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+    return count
+
+
+def _blank_to_missing(row: Row, *keys: str) -> Row:
+    """ Пустые значения необязательных колонок CSV считаются отсутствующими. """
+    return {key: value for key, value in row.items() if not (key in keys and value in ('', None))}
+
+
+class AccountImportSerializer(AccountSerializer):
+    """
+    Сериализатор строки импорта клиента: правила регистрации плюс необязательные ID и имя пользователя.
+    """
+    id = serializers.IntegerField(required=False, min_value=1)
+    username = serializers.CharField(required=False, max_length=150)
+
+    class Meta(AccountSerializer.Meta):
+        fields = AccountSerializer.Meta.fields + ['username']
+
+
+class AppointmentImportSerializer(AppointmentSerializer):
+    """
+    Сериализатор строки импорта записи на прием: правила записи через API плюс необязательные ID и активность.
+    """
+    id = serializers.IntegerField(required=False, min_value=1)
+    is_active = serializers.BooleanField(required=False, default=True)
+
+
+class Records:
+    """
+    Описание типа записей для импорта и экспорта.
+    """
+    model: Type[models.Model]
+    columns: Tuple[str, ...]
+    optional_columns: Tuple[str, ...] = ('id',)
+
+    def __init__(self, serializer: serializers.Serializer) -> None:
+        self.serializer: serializers.Serializer = serializer
+
+    def export_rows(self, chunk_size: int) -> Iterator[Row]:
+        """ Строки экспорта, выбираемые из БД порциями (на PostgreSQL - серверным курсором). """
+        raise NotImplementedError
+
+    def validate(self, batch: List[Tuple[int, Any]]) -> Tuple[List[Tuple[int, Row, Dict[str, Any]]], List[Reject]]:
+        """
+        Проверяет строки пачки сериализатором.
+
+        Returns:
+            Tuple: Провалидированные строки (номер, исходные данные, данные) и отклоненные строки.
+        """
+        valid: List[Tuple[int, Row, Dict[str, Any]]] = []
+        rejects: List[Reject] = []
+        for line, row in batch:
+            if not isinstance(row, dict):
+                rejects.append(Reject(line, row, 'Строка не является JSON-объектом'))
+                continue
+            try:
+                valid.append((line, row, self.serializer.run_validation(_blank_to_missing(row,
+                                                                                          *self.optional_columns))))
+            except serializers.ValidationError as e:
+                rejects.append(Reject(line, row, e.detail))
+        return valid, rejects
+
+    def build(self, batch: List[Tuple[int, Any]]) -> Tuple[Accepted, List[Reject]]:
+        """
+        Проверяет пачку строк и создает несохраненные объекты модели.
+
+        Returns:
+            Tuple[Accepted, List[Reject]]: Принятые строки с объектами и отклоненные строки.
+        """
+        raise NotImplementedError
+
+    def inserted(self, objs: List[models.Model]) -> None:
+        """ Вызывается в транзакции пачки после вставки объектов (bulk_create и COPY не отправляют сигналы). """
+
+
+class AccountRecords(Records):
+    """ Клиенты (аккаунты). """
+    model = Account
+    columns = ('id', 'username', 'first_name', 'last_name', 'phone', 'telegram_chat_id')
+    optional_columns = ('id', 'username')
+
+    def __init__(self) -> None:
+        super().__init__(AccountImportSerializer())
+
+    def export_rows(self, chunk_size: int) -> Iterator[Row]:
+        for values in Account.objects.order_by('id').values_list(*self.columns).iterator(chunk_size=chunk_size):
+            yield dict(zip(self.columns, values))
+
+    def build(self, batch: List[Tuple[int, Any]]) -> Tuple[Accepted, List[Reject]]:
+        valid, rejects = self.validate(batch)
+        ids: Set[int] = {data['id'] for _, _, data in valid if 'id' in data}
+        usernames: Set[str] = {data['username'] for _, _, data in valid if 'username' in data}
+        taken_ids: Set[int] = set(Account.objects.filter(id__in=ids).values_list('id', flat=True)) if ids else set()
+        taken_usernames: Set[str] = set(
+            Account.objects.filter(username__in=usernames).values_list('username', flat=True)
+        ) if usernames else set()
+        chat_ids: Set[str] = {data['telegram_chat_id'] for _, _, data in valid if data.get('telegram_chat_id')}
+        taken_chat_ids: Set[str] = set(
+            Account.objects.filter(telegram_chat_id__in=chat_ids).values_list('telegram_chat_id', flat=True)
+        ) if chat_ids else set()
+
+        accepted: Accepted = []
+        for line, row, data in valid:
+            if data.get('id') in taken_ids:
+                rejects.append(Reject(line, row, {'id': 'Пользователь с таким ID уже существует'}))
+                continue
+            if data.get('username') in taken_usernames:
+                rejects.append(Reject(line, row, {'username': 'Пользователь с таким именем уже существует'}))
+                continue
+            if data.get('telegram_chat_id') in taken_chat_ids:
+                rejects.append(Reject(line, row, {'telegram_chat_id': 'Пользователь с таким ID чата уже существует'}))
+                continue
+            data.setdefault('username', get_random_string(10))
+            if 'id' in data:
+                taken_ids.add(data['id'])
+            if data.get('telegram_chat_id'):
+                taken_chat_ids.add(data['telegram_chat_id'])
+            taken_usernames.add(data['username'])
+            accepted.append((line, row, Account(password=make_password(None), **data)))
+        return accepted, rejects
+
+
+class AppointmentRecords(Records):
+    """ Записи на прием. """
+    model = Appointment
+    columns = ('id', 'client', 'appointment_date', 'animal_type', 'is_active')
+    optional_columns = ('id', 'is_active')
+
+    def __init__(self, allow_past: bool = False) -> None:
+        """
+        Args:
+            allow_past (bool): Разрешить записи в прошедшем времени (перенос истории).
+        """
+        super().__init__(AppointmentImportSerializer(context={'allow_past': allow_past}))
+
+    def export_rows(self, chunk_size: int) -> Iterator[Row]:
+        queryset = Appointment.objects.order_by('id').values_list('id', 'client_id', 'appointment_date',
+                                                                  'animal_type_id', 'is_active')
+        for appointment_id, client_id, appointment_date, animal_type_id, is_active in queryset.iterator(
+                chunk_size=chunk_size):
+            yield {
+                'id': appointment_id,
+                'client': client_id,
+                'appointment_date': format_datetime(timezone.localtime(appointment_date)),
+                'animal_type': animal_type_id,
+                'is_active': is_active,
+            }
+
+    def build(self, batch: List[Tuple[int, Any]]) -> Tuple[Accepted, List[Reject]]:
+        valid, rejects = self.validate(batch)
+        client_ids: Set[int] = {data['client'] for _, _, data in valid}
+        animal_type_ids: Set[int] = {data['animal_type'] for _, _, data in valid}
+        ids: Set[int] = {data['id'] for _, _, data in valid if 'id' in data}
+
+        existing_clients: Set[int] = set(Account.objects.filter(id__in=client_ids).values_list('id', flat=True))
+        existing_types: Set[int] = set(AnimalType.objects.filter(id__in=animal_type_ids).values_list('id', flat=True))
+        schedule: CompiledSchedule = get_schedule()
+        bookings: Counter = slot_bookings(
+            (data['appointment_date'], data['animal_type']) for _, _, data in valid if data['is_active']
+        )
+        taken_ids: Set[int] = set(Appointment.objects.filter(id__in=ids).values_list('id', flat=True)) if ids else set()
+
+        accepted: Accepted = []
+        for line, row, data in valid:
+            slot: Tuple[datetime, int] = (data['appointment_date'], data['animal_type'])
+            if data['client'] not in existing_clients:
+                rejects.append(Reject(line, row, {'client': RelatedObjectNotFoundError(Account).message}))
+            elif data['animal_type'] not in existing_types:
+                rejects.append(Reject(line, row, {'animal_type': RelatedObjectNotFoundError(AnimalType).message}))
+            elif data['is_active'] and bookings[slot] >= schedule.capacity(data['animal_type']):
+                rejects.append(Reject(line, row, {'appointment_date': SlotAlreadyTakenError().message}))
+            elif data.get('id') in taken_ids:
+                rejects.append(Reject(line, row, {'id': 'Запись на прием с таким ID уже существует'}))
+            else:
+                if data['is_active']:
+                    bookings[slot] += 1
+                if 'id' in data:
+                    taken_ids.add(data['id'])
+                accepted.append((line, row, Appointment(
+                    id=data.get('id'),
+                    client_id=data['client'],
+                    appointment_date=data['appointment_date'],
+                    animal_type_id=data['animal_type'],
+                    is_active=data['is_active'],
+                )))
+        return accepted, rejects
+
+    def inserted(self, objs: List[models.Model]) -> None:
+        """
+        Занимает слоты записей с учетом вместимости: слот могла заполнить запись, сделанная после build().
+
+        Raises:
+            SlotCapacityError: Если хотя бы один слот заполнен.
+        """
+        reserve_occupancy(occupancy_deltas(objs), get_schedule().capacity)
+
+
+RECORDS: Dict[str, Callable[..., Records]] = {
+    'accounts': AccountRecords,
+    'appointments': AppointmentRecords,
+}
+
+
+def copy_insert(objs: List[models.Model]) -> None:
+    """
+    Вставляет объекты одной модели командой COPY ... FROM STDIN (только PostgreSQL).
+
+    Объекты с заданным и незаданным первичным ключом вставляются отдельными командами.
+    """
+    model: Type[models.Model] = type(objs[0])
+    quote: Callable[[str], str] = connection.ops.quote_name
+    for with_pk in (True, False):
+        group: List[models.Model] = [obj for obj in objs if (obj.pk is not None) == with_pk]
+        if not group:
+            continue
+        fields: List[models.Field] = [field for field in model._meta.concrete_fields
+                                      if with_pk or not field.primary_key]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for obj in group:
+            row: List[Any] = []
+            for field in fields:
+                value: Any = field.get_db_prep_save(field.pre_save(obj, True), connection)
+                row.append(COPY_NULL if value is None else value)
+            writer.writerow(row)
+        buffer.seek(0)
+        columns: str = ', '.join(quote(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                buffer,
+            )
+
+
+def _insert(model: Type[models.Model], objs: List[models.Model], use_copy: bool) -> None:
+    if use_copy:
+        copy_insert(objs)
+    else:
+        model.objects.bulk_create(objs)
+
+
+def reset_sequences(model: Type[models.Model]) -> None:
+    """ Сдвигает последовательность первичного ключа после вставки записей с явными ID. """
+    statements: List[str] = connection.ops.sequence_reset_sql(no_style(), [model])
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def import_records(records: Records, rows: Iterable[Tuple[int, Any]], batch_size: int = DEFAULT_BATCH_SIZE,
+                   use_copy: bool = False, on_reject: Optional[Callable[[Reject], None]] = None,
+                   on_batch: Optional[Callable[[int], None]] = None) -> ImportStats:
+    """
+    Загружает строки пачками по batch_size, каждая пачка - в своей транзакции.
+
+    Если вставка пачки нарушила ограничение целостности или заполнила слот сверх вместимости (параллельная
+    запись на тот же слот), пачка вставляется построчно, а ошибочные строки отклоняются.
+
+    Args:
+        records (Records): Тип записей.
+        rows (Iterable[Tuple[int, Any]]): Номера и данные строк (см. read_rows).
+        batch_size (int): Размер пачки.
+        use_copy (bool): Вставлять пачки через COPY (только PostgreSQL).
+        on_reject (Optional[Callable[[Reject], None]]): Вызывается для каждой отклоненной строки.
+        on_batch (Optional[Callable[[int], None]]): Вызывается после каждой пачки с ее размером.
+
+    Returns:
+        ImportStats: Итоги импорта.
+    """
+    total: int = 0
+    imported: int = 0
+    rejected: int = 0
+    has_explicit_ids: bool = False
+    rows = iter(rows)
+
+    def reject(item: Reject) -> None:
+        nonlocal rejected
+        rejected += 1
+        if on_reject is not None:
+            on_reject(item)
+
+    while True:
+        batch: List[Tuple[int, Any]] = [row for _, row in zip(range(batch_size), rows)]
+        if not batch:
+            break
+        total += len(batch)
+        accepted, rejects = records.build(batch)
+        for item in rejects:
+            reject(item)
+        objs: List[models.Model] = [obj for _, _, obj in accepted]
+        has_explicit_ids = has_explicit_ids or any(obj.pk is not None for obj in objs)
+        if objs:
+            explicit_ids: List[bool] = [obj.pk is not None for obj in objs]
+            try:
+                with transaction.atomic():
+                    _insert(records.model, objs, use_copy)
+                    records.inserted(objs)
+                imported += len(objs)
+            except (IntegrityError, SlotCapacityError):
+                for (line, row, obj), explicit_id in zip(accepted, explicit_ids):
+                    if not explicit_id:
+                        # ID, выданный откаченной вставкой пачки.
+                        obj.pk = None
+                    try:
+                        with transaction.atomic():
+                            records.model.objects.bulk_create([obj])
+                            records.inserted([obj])
+                        imported += 1
+                    except IntegrityError as e:
+                        reject(Reject(line, row, str(e)))
+                    except SlotCapacityError:
+                        reject(Reject(line, row, {'appointment_date': SlotAlreadyTakenError().message}))
+        if on_batch is not None:
+            on_batch(len(batch))
+
+    if has_explicit_ids:
+        reset_sequences(records.model)
+    return ImportStats(total=total, imported=imported, rejected=rejected)
@@ -0,0 +1,212 @@
+"""
+Расписание клиники, скомпилированное в таблицы для проверки записи на прием и расчета свободных слотов.
+
+Правила расписания (модели ClinicSchedule, WorkingHours, ScheduleBreak, Holiday, SlotCapacity) один раз
+компилируются в CompiledSchedule: маска начал приема для каждого дня недели, множество нерабочих дней,
+вместимость слота по видам животных и текст часов работы для сообщений об ошибках. Проверка времени записи
+и маска рабочих слотов дня - обращение к таблице, правила на каждый запрос заново не разбираются.
+
+Скомпилированное расписание хранится в памяти процесса, а его актуальность проверяется по версии в кеше Django
+(vetclinics.caches.get_schedule_version). Изменение моделей расписания заводит новую версию (vetclinics.signals),
+и каждый процесс перекомпилирует расписание при следующем обращении.
+
+Без активного расписания действует расписание по умолчанию: каждый день 09:00-18:00, прием 30 минут,
+в слот - одно животное каждого вида.
+"""
+from datetime import date, datetime, time
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from asgiref.sync import sync_to_async
+
+from divanru_vetclinic.db_routers import use_primary
+
+from .availability import SLOT_MINUTES, WORK_END_HOUR, WORK_START_HOUR, WORKING_MASK, slot_index
+from .caches import aget_schedule_version, get_schedule_version
+from .models import ClinicSchedule
+
+DEFAULT_SLOT_MINUTES: int = 30
+DEFAULT_CAPACITY: int = 1
+
+# Интервал [начало, конец) в минутах от полуночи.
+Interval = Tuple[int, int]
+
+
+def minute_of_day(value: time) -> int:
+    """ Минута от полуночи для времени. """
+    return value.hour * 60 + value.minute
+
+
+def format_interval(interval: Interval) -> str:
+    """ Форматирует интервал как 'чч:мм-чч:мм'. """
+    start, end = interval
+    return f'{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}'
+
+
+def starts_mask(hours: Interval, breaks: Sequence[Interval], slot_minutes: int) -> int:
+    """
+    Возвращает маску слотов, с которых может начаться прием длительностью slot_minutes.
+
+    Прием целиком помещается в часы работы и не пересекается с перерывами. Начала приемов идут
+    подряд от начала работы, а после перерыва - от его конца.
+
+    Args:
+        hours (Interval): Часы работы в минутах от полуночи.
+        breaks (Sequence[Interval]): Перерывы в минутах от полуночи.
+        slot_minutes (int): Длительность приема в минутах (кратна SLOT_MINUTES).
+
+    Returns:
+        int: Битовая маска слотов сетки SLOT_MINUTES.
+    """
+    opens, closes = hours
+    mask: int = 0
+    start: int = -(-opens // SLOT_MINUTES) * SLOT_MINUTES
+    while start + slot_minutes <= closes:
+        end: int = start + slot_minutes
+        overlap: Optional[int] = max((break_end for break_start, break_end in breaks
+                                      if break_start < end and start < break_end), default=None)
+        if overlap is None:
+            mask |= 1 << (start // SLOT_MINUTES)
+            start = end
+        else:
+            start = -(-overlap // SLOT_MINUTES) * SLOT_MINUTES
+    return mask
+
+
+class CompiledSchedule:
+    """
+    Расписание клиники в виде таблиц.
+
+    Attributes:
+        version (str): Версия расписания, под которой оно скомпилировано.
+        slot_minutes (int): Длительность приема в минутах.
+        weekday_masks (Tuple[int, ...]): Маски начал приема для дней недели (0 - понедельник).
+        weekday_hours (Tuple[str, ...]): Часы работы дней недели для сообщений ('' - выходной).
+        holidays (FrozenSet[date]): Нерабочие дни.
+        default_capacity (int): Вместимость слота, если для вида животного не задано иное.
+        capacities (Dict[int, int]): Вместимость слота по ID вида животного.
+    """
+
+    __slots__ = ('version', 'slot_minutes', 'weekday_masks', 'weekday_hours', 'holidays', 'default_capacity',
+                 'capacities')
+
+    def __init__(self, version: str, slot_minutes: int, weekday_masks: Sequence[int], weekday_hours: Sequence[str],
+                 holidays: FrozenSet[date] = frozenset(), default_capacity: int = DEFAULT_CAPACITY,
+                 capacities: Optional[Dict[int, int]] = None) -> None:
+        self.version: str = version
+        self.slot_minutes: int = slot_minutes
+        self.weekday_masks: Tuple[int, ...] = tuple(weekday_masks)
+        self.weekday_hours: Tuple[str, ...] = tuple(weekday_hours)
+        self.holidays: FrozenSet[date] = holidays
+        self.default_capacity: int = default_capacity
+        self.capacities: Dict[int, int] = capacities or {}
+
+    def working_mask(self, day: date) -> int:
+        """ Возвращает маску слотов дня, с которых может начаться прием. """
+        if day in self.holidays:
+            return 0
+        return self.weekday_masks[day.weekday()]
+
+    def is_working_slot(self, value: datetime) -> bool:
+        """
+        Проверяет, что с этого времени может начаться прием.
+
+        Args:
+            value (datetime): Дата и время (уже приведенные к местному времени клиники).
+
+        Returns:
+            bool: True, если на это время можно записаться.
+        """
+        index: Optional[int] = slot_index(value)
+        return index is not None and bool(self.working_mask(value.date()) >> index & 1)
+
+    def hours(self, day: date) -> str:
+        """ Возвращает часы работы дня для сообщений или пустую строку, если день нерабочий. """
+        if day in self.holidays:
+            return ''
+        return self.weekday_hours[day.weekday()]
+
+    def capacity(self, animal_type_id: int) -> int:
+        """ Возвращает вместимость слота для вида животного. """
+        return self.capacities.get(animal_type_id, self.default_capacity)
+
+
+def compile_schedule(schedule: Optional[ClinicSchedule], version: str) -> CompiledSchedule:
+    """
+    Компилирует расписание клиники в таблицы.
+
+    Args:
+        schedule (Optional[ClinicSchedule]): Расписание с предзагруженными связанными правилами
+            или None (расписание по умолчанию).
+        version (str): Версия расписания.
+
+    Returns:
+        CompiledSchedule: Скомпилированное расписание.
+    """
+    if schedule is None:
+        hours: Interval = (WORK_START_HOUR * 60, WORK_END_HOUR * 60)
+        return CompiledSchedule(version, DEFAULT_SLOT_MINUTES, [WORKING_MASK] * 7, [format_interval(hours)] * 7)
+
+    weekday_hours: Dict[int, Interval] = {
+        item.weekday: (minute_of_day(item.opens_at), minute_of_day(item.closes_at))
+        for item in schedule.working_hours.all()
+    }
+    masks: List[int] = []
+    texts: List[str] = []
+    for weekday in range(7):
+        if weekday not in weekday_hours:
+            masks.append(0)
+            texts.append('')
+            continue
+        breaks: List[Interval] = sorted(
+            (minute_of_day(item.starts_at), minute_of_day(item.ends_at))
+            for item in schedule.breaks.all() if item.weekday is None or item.weekday == weekday
+        )
+        masks.append(starts_mask(weekday_hours[weekday], breaks, schedule.slot_minutes))
+        texts.append(', '.join([format_interval(weekday_hours[weekday])]
+                               + [f'перерыв {format_interval(interval)}' for interval in breaks]))
+    return CompiledSchedule(
+        version, schedule.slot_minutes, masks, texts,
+        holidays=frozenset(item.day for item in schedule.holidays.all()),
+        default_capacity=schedule.capacity,
+        capacities={item.animal_type_id: item.capacity for item in schedule.capacities.all()},
+    )
+
+
+def load_schedule(version: str) -> CompiledSchedule:
+    """
+    Загружает активное расписание клиники со всеми правилами и компилирует его. Расписание живет в памяти
+    до следующего изменения, поэтому читается из основной БД, а не с реплики.
+    """
+    with use_primary():
+        schedule: Optional[ClinicSchedule] = ClinicSchedule.objects.filter(is_active=True).prefetch_related(
+            'working_hours', 'breaks', 'holidays', 'capacities').first()
+    return compile_schedule(schedule, version)
+
+
+_local_schedule: Optional[CompiledSchedule] = None
+
+
+def get_schedule() -> CompiledSchedule:
+    """
+    Возвращает скомпилированное расписание клиники из памяти процесса, перекомпилируя его,
+    если версия в кеше Django изменилась.
+
+    Returns:
+        CompiledSchedule: Действующее расписание.
+    """
+    global _local_schedule
+
+    version: str = get_schedule_version()
+    if _local_schedule is None or _local_schedule.version != version:
+        _local_schedule = load_schedule(version)
+    return _local_schedule
+
+
+async def aget_schedule() -> CompiledSchedule:
+    """ Async-версия get_schedule: версия читается из кеша async-методом, компиляция - в потоке. """
+    global _local_schedule
+
+    version: str = await aget_schedule_version()
+    if _local_schedule is None or _local_schedule.version != version:
+        _local_schedule = await sync_to_async(load_schedule)(version)
+    return _local_schedule
@@ -0,0 +1,256 @@
+import asyncio
+import random
+import time
+from datetime import datetime
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import Exists, QuerySet
+
+from accounts.models import Account
+from .models import AnimalType, Appointment
+from .occupancy import (OccupancyKey, SlotCapacityError, appointment_key, occupancy_counts, occupancy_deltas,
+                        occupancy_key, reserve_occupancy)
+from .schedule import CompiledSchedule, aget_schedule, get_schedule
+
+BOOKING_RETRIES: int = 5
+BOOKING_RETRY_DELAY: float = 0.01
+MAX_BOOKING_BATCH_SIZE: int = 500
+
+
+class BookingError(Exception):
+    """ Базовая ошибка записи на прием. Текст ошибки отдается клиенту API как есть. """
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+        self.message: str = message
+
+
+class SlotAlreadyTakenError(BookingError):
+    """ Слот уже заполнен активными записями того же вида животного (см. вместимость слота в расписании). """
+
+    def __init__(self) -> None:
+        super().__init__('Выбранный слот уже занят')
+
+
+class RelatedObjectNotFoundError(BookingError):
+    """ Клиент или вид животного с указанным ID не существует. """
+
+    def __init__(self, model) -> None:
+        super().__init__(f'{model._meta.verbose_name} с указанным ID не существует')
+
+
+def _related_objects_probe(client_id: int, animal_type_id: int) -> QuerySet:
+    """ Запрос, который возвращает строку, если клиент существует, со значением - существует ли вид животного. """
+    return (
+        Account.objects.filter(id=client_id)
+        .annotate(animal_type_exists=Exists(AnimalType.objects.filter(id=animal_type_id)))
+        .values_list('animal_type_exists', flat=True)[:1]
+    )
+
+
+def _check_related_objects(client_id: int, animal_type_id: int) -> None:
+    """
+    Проверяет существование клиента и вида животного одним запросом.
+
+    Raises:
+        RelatedObjectNotFoundError: Если клиента или вида животного не существует.
+    """
+    _check_probe(tuple(_related_objects_probe(client_id, animal_type_id)))
+
+
+def _check_probe(probe: Tuple[bool, ...]) -> None:
+    """
+    Проверяет результат запроса _related_objects_probe.
+
+    Raises:
+        RelatedObjectNotFoundError: Если клиента или вида животного не существует.
+    """
+    if not probe:
+        raise RelatedObjectNotFoundError(Account)
+    if not probe[0]:
+        raise RelatedObjectNotFoundError(AnimalType)
+
+
+def _insert(appointment: Appointment, capacity: Callable[[int], int]) -> None:
+    """
+    Занимает слот условным обновлением счетчика занятости и вставляет запись одним INSERT.
+    Гонку за слот разрешает счетчик: у заполненного слота он не меняется, поэтому отдельная проверка
+    занятости не нужна.
+
+    Занятие слота и INSERT выполняются в одной транзакции, внутри внешней транзакции - в точке сохранения,
+    чтобы ошибка не ломала внешнюю транзакцию.
+
+    Raises:
+        SlotAlreadyTakenError: Если слот заполнен.
+    """
+    key: Optional[OccupancyKey] = appointment_key(appointment)
+    with transaction.atomic():
+        if key is not None:
+            try:
+                reserve_occupancy({key: 1}, capacity)
+            except SlotCapacityError:
+                raise SlotAlreadyTakenError()
+            appointment._occupancy_reserved = True
+        appointment.save(force_insert=True)
+
+
+def book_appointment(client_id: int, appointment_date: datetime, animal_type_id: int,
+                     retries: int = BOOKING_RETRIES) -> Appointment:
+    """
+    Записывает клиента на прием за три обращения к БД: проверка клиента и вида животного, занятие слота
+    в счетчике занятости с учетом вместимости слота из расписания клиники и INSERT.
+
+    Конфликты блокировок и сериализации (OperationalError) повторяются с экспоненциальной задержкой.
+    Ошибка целостности означает, что клиент или вид животного удалены между проверкой и вставкой,
+    повторная попытка вернет понятную ошибку.
+
+    Args:
+        client_id (int): ID клиента.
+        appointment_date (datetime): Дата и время записи на прием (aware).
+        animal_type_id (int): ID вида животного.
+        retries (int): Количество повторных попыток при конфликтах.
+
+    Returns:
+        Appointment: Созданная запись на прием.
+
+    Raises:
+        RelatedObjectNotFoundError: Если клиента или вида животного не существует.
+        SlotAlreadyTakenError: Если слот уже занят.
+    """
+    schedule: CompiledSchedule = get_schedule()
+    attempt: int = 0
+    while True:
+        try:
+            _check_related_objects(client_id, animal_type_id)
+            appointment = Appointment(client_id=client_id, appointment_date=appointment_date,
+                                      animal_type_id=animal_type_id)
+            _insert(appointment, schedule.capacity)
+            return appointment
+        except IntegrityError:
+            if attempt >= retries:
+                raise
+        except OperationalError:
+            if attempt >= retries:
+                raise
+            time.sleep(_retry_delay(attempt))
+        attempt += 1
+
+
+async def abook_appointment(client_id: int, appointment_date: datetime, animal_type_id: int,
+                            retries: int = BOOKING_RETRIES) -> Appointment:
+    """
+    Async-версия book_appointment.
+
+    Клиент и вид животного проверяются async-итерацией по QuerySet. Занятие слота и INSERT выполняются
+    в потоке (sync_to_async), так как транзакции в Django 4.2 доступны только синхронному коду.
+    Задержка перед повторной попыткой не блокирует цикл событий.
+
+    Raises:
+        RelatedObjectNotFoundError: Если клиента или вида животного не существует.
+        SlotAlreadyTakenError: Если слот уже занят.
+    """
+    schedule: CompiledSchedule = await aget_schedule()
+    attempt: int = 0
+    while True:
+        try:
+            _check_probe(tuple([exists async for exists in _related_objects_probe(client_id, animal_type_id)]))
+            appointment = Appointment(client_id=client_id, appointment_date=appointment_date,
+                                      animal_type_id=animal_type_id)
+            await sync_to_async(_insert)(appointment, schedule.capacity)
+            return appointment
+        except IntegrityError:
+            if attempt >= retries:
+                raise
+        except OperationalError:
+            if attempt >= retries:
+                raise
+            await asyncio.sleep(_retry_delay(attempt))
+        attempt += 1
+
+
+def _retry_delay(attempt: int) -> float:
+    """ Экспоненциальная задержка перед повторной попыткой со случайным разбросом. """
+    return BOOKING_RETRY_DELAY * 2 ** attempt * random.uniform(0.5, 1.5)
+
+
+def slot_bookings(slots: Iterable[Tuple[datetime, int]]) -> Counter:
+    """
+    Возвращает количество активных записей на переданные слоты (дата и время, ID вида животного)
+    одним запросом к счетчикам занятости. Слоты без записей в результат не попадают.
+    """
+    keys: Dict[Tuple[datetime, int], OccupancyKey] = {}
+    for appointment_date, animal_type_id in set(slots):
+        key: Optional[OccupancyKey] = occupancy_key(appointment_date, animal_type_id, True)
+        if key is not None:
+            keys[appointment_date, animal_type_id] = key
+    counts: Dict[OccupancyKey, int] = occupancy_counts(keys.values())
+    return Counter({slot: counts[key] for slot, key in keys.items() if counts.get(key)})
+
+
+def _prepare_batch(items: List[Dict[str, Any]], schedule: CompiledSchedule) -> List[Union[Appointment, BookingError]]:
+    """
+    Проверяет пачку записей тремя запросами: клиенты, виды животных и занятость слотов.
+    Записи пачки на один слот принимаются по порядку, пока не заполнится вместимость слота.
+    """
+    client_ids: Set[int] = set(
+        Account.objects.filter(id__in={item['client'] for item in items}).values_list('id', flat=True)
+    )
+    animal_type_ids: Set[int] = set(
+        AnimalType.objects.filter(id__in={item['animal_type'] for item in items}).values_list('id', flat=True)
+    )
+    bookings: Counter = slot_bookings((item['appointment_date'], item['animal_type']) for item in items)
+
+    results: List[Union[Appointment, BookingError]] = []
+    for item in items:
+        slot: Tuple[datetime, int] = (item['appointment_date'], item['animal_type'])
+        if item['client'] not in client_ids:
+            results.append(RelatedObjectNotFoundError(Account))
+        elif item['animal_type'] not in animal_type_ids:
+            results.append(RelatedObjectNotFoundError(AnimalType))
+        elif bookings[slot] >= schedule.capacity(item['animal_type']):
+            results.append(SlotAlreadyTakenError())
+        else:
+            bookings[slot] += 1
+            results.append(Appointment(client_id=item['client'], appointment_date=item['appointment_date'],
+                                       animal_type_id=item['animal_type']))
+    return results
+
+
+def book_appointments(items: List[Dict[str, Any]],
+                      retries: int = BOOKING_RETRIES) -> List[Union[Appointment, BookingError]]:
+    """
+    Записывает на прием пачку клиентов: три проверочных запроса, один bulk_create, обновление занятости
+    слотов и проверка их вместимости в одной транзакции.
+
+    Если параллельная запись заполнила слот между проверкой и вставкой, транзакция откатывается
+    и пачка проверяется заново, тогда спорный слот вернется с ошибкой, а остальные записи будут созданы.
+
+    Args:
+        items (List[Dict[str, Any]]): Провалидированные AppointmentSerializer данные записей
+            (client, appointment_date, animal_type).
+        retries (int): Количество повторных попыток при конфликтах.
+
+    Returns:
+        List[Union[Appointment, BookingError]]: Для каждой записи пачки - созданная запись или ошибка.
+    """
+    schedule: CompiledSchedule = get_schedule()
+    attempt: int = 0
+    while True:
+        try:
+            with transaction.atomic():
+                results: List[Union[Appointment, BookingError]] = _prepare_batch(items, schedule)
+                appointments: List[Appointment] = [result for result in results if isinstance(result, Appointment)]
+                Appointment.objects.bulk_create(appointments)
+                reserve_occupancy(occupancy_deltas(appointments), schedule.capacity)
+            return results
+        except (IntegrityError, SlotCapacityError):
+            if attempt >= retries:
+                raise
+        except OperationalError:
+            if attempt >= retries:
+                raise
+            time.sleep(_retry_delay(attempt))
+        attempt += 1
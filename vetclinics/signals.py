@@ -0,0 +1,92 @@
+from typing import Optional, Tuple
+
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from .caches import invalidate_animal_type_catalogue, invalidate_schedule
+from .models import AnimalType, Appointment, ClinicSchedule, Holiday, ScheduleBreak, SlotCapacity, WorkingHours
+from .occupancy import OccupancyKey, apply_occupancy, occupancy_key
+
+OCCUPANCY_FIELDS: Tuple[str, ...] = ('appointment_date', 'animal_type_id', 'is_active')
+
+
+@receiver(post_save, sender=AnimalType)
+def animal_type_saved(sender, instance: AnimalType, **kwargs) -> None:
+    """ Сбрасывает кеш справочника видов животных после сохранения вида животного. """
+    invalidate_animal_type_catalogue()
+
+
+@receiver(post_delete, sender=AnimalType)
+def animal_type_deleted(sender, instance: AnimalType, **kwargs) -> None:
+    """ Сбрасывает кеш справочника видов животных после удаления вида животного. """
+    invalidate_animal_type_catalogue(deleted=True)
+
+
+@receiver(post_save, sender=ClinicSchedule)
+@receiver(post_delete, sender=ClinicSchedule)
+@receiver(post_save, sender=WorkingHours)
+@receiver(post_delete, sender=WorkingHours)
+@receiver(post_save, sender=ScheduleBreak)
+@receiver(post_delete, sender=ScheduleBreak)
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+@receiver(post_save, sender=SlotCapacity)
+@receiver(post_delete, sender=SlotCapacity)
+def schedule_changed(sender, **kwargs) -> None:
+    """ Заводит новую версию расписания клиники после изменения его правил. """
+    invalidate_schedule()
+
+
+def _occupancy_state(instance: Appointment) -> Optional[tuple]:
+    """ Значения полей записи, от которых зависит занятость слота, или None, если часть полей отложена. """
+    values: dict = instance.__dict__
+    if not all(field in values for field in OCCUPANCY_FIELDS):
+        return None
+    return tuple(values[field] for field in OCCUPANCY_FIELDS)
+
+
+@receiver(post_init, sender=Appointment)
+def appointment_initialized(sender, instance: Appointment, **kwargs) -> None:
+    """ Запоминает значения, с которыми запись на прием загружена из БД (для расчета приращения занятости). """
+    instance._occupancy_state = _occupancy_state(instance)
+
+
+@receiver(pre_save, sender=Appointment)
+def appointment_saving(sender, instance: Appointment, update_fields=None, using: str = 'default', **kwargs) -> None:
+    """ Дочитывает прежние значения записи, если она загружена с отложенными полями. """
+    if not instance._state.adding and instance.pk is not None and getattr(instance, '_occupancy_state', None) is None:
+        instance._occupancy_state = Appointment.objects.using(using).filter(pk=instance.pk).values_list(
+            *OCCUPANCY_FIELDS).first()
+
+
+@receiver(post_save, sender=Appointment)
+def appointment_saved(sender, instance: Appointment, created: bool, update_fields=None, using: str = 'default',
+                      **kwargs) -> None:
+    """
+    Переносит запись на прием в счетчиках занятости со старого слота на новый.
+    Новый слот, уже занятый через reserve_occupancy (vetclinics.services, AppointmentAdmin.save_model),
+    повторно не занимается.
+    """
+    old_state: Optional[tuple] = None if created else getattr(instance, '_occupancy_state', None)
+    new_state: tuple = tuple(getattr(instance, field) for field in OCCUPANCY_FIELDS)
+    if update_fields is not None and old_state is not None:
+        # Несохраненные поля остаются в БД прежними.
+        saved_fields = {Appointment._meta.get_field(name).attname for name in update_fields}
+        new_state = tuple(new if field in saved_fields else old
+                          for field, new, old in zip(OCCUPANCY_FIELDS, new_state, old_state))
+    instance._occupancy_state = new_state
+    reserved: bool = instance.__dict__.pop('_occupancy_reserved', False)
+
+    old_key: Optional[OccupancyKey] = occupancy_key(*old_state) if old_state is not None else None
+    new_key: Optional[OccupancyKey] = None if reserved else occupancy_key(*new_state)
+    if old_key != new_key:
+        apply_occupancy({key: delta for key, delta in ((old_key, -1), (new_key, 1)) if key is not None}, using)
+
+
+@receiver(post_delete, sender=Appointment)
+def appointment_deleted(sender, instance: Appointment, using: str = 'default', **kwargs) -> None:
+    """ Освобождает слот удаленной записи на прием в счетчиках занятости. """
+    state: Optional[tuple] = getattr(instance, '_occupancy_state', None) or _occupancy_state(instance)
+    key: Optional[OccupancyKey] = occupancy_key(*state) if state is not None else None
+    if key is not None:
+        apply_occupancy({key: -1}, using)
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.factories import AccountFactory
+
+from divanru_vetclinic.paginators import EstimatedCountPaginator
+from vetclinics.models import Appointment
+from vetclinics.factories import AnimalTypeFactory
+from vetclinics.templatetags.fast_date_hierarchy import probe_periods
+
+
+class AppointmentChangelistTests(TestCase):
+    """
+    Тесты списка записей на прием в админ-панели.
+    """
+
+    def setUp(self) -> None:
+        """
+        Установка записей на прием в трех днях двух месяцев.
+        """
+        tz = timezone.get_current_timezone()
+        self.client_account = AccountFactory()
+        self.animal_type = AnimalTypeFactory()
+        self.dates = [datetime(2024, 1, 31, 17, 30, tzinfo=tz), datetime(2024, 3, 1, 9, 0, tzinfo=tz),
+                      datetime(2024, 3, 5, 10, 0, tzinfo=tz)]
+        Appointment.objects.bulk_create([
+            Appointment(client=self.client_account, animal_type=self.animal_type, appointment_date=appointment_date)
+            for appointment_date in self.dates
+        ])
+        self.client.force_login(AccountFactory(is_staff=True, is_superuser=True))
+        self.url = reverse('admin:vetclinics_appointment_changelist')
+
+    def test_probe_periods(self) -> None:
+        """
+        Проверка, что навигация по датам показывает только непустые месяцы и дни в часовом поясе клиники.
+        """
+        queryset = Appointment.objects.all()
+        self.assertEqual([month.month for month in probe_periods(queryset, 'appointment_date', 'month')], [1, 3])
+        march = queryset.filter(appointment_date__gte=self.dates[1])
+        self.assertEqual([day.day for day in probe_periods(march, 'appointment_date', 'day')], [1, 5])
+        self.assertEqual(probe_periods(queryset.none(), 'appointment_date', 'year'), [])
+
+    def test_changelist(self) -> None:
+        """
+        Проверка отрисовки списка, поиска и навигации по датам.
+        """
+        response = self.client.get(self.url, {'appointment_date__year': 2024})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'appointment_date__month=3')
+        self.assertNotContains(response, 'appointment_date__month=2')
+
+        response = self.client.get(self.url, {'q': self.client_account.first_name})
+        self.assertEqual(len(response.context['cl'].result_list), 3)
+
+    def test_estimated_count(self) -> None:
+        """
+        Проверка, что для таблицы без фильтров количество строк берется из статистики БД.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        paginator = EstimatedCountPaginator(Appointment.objects.order_by('id'), 100)
+        paginator.estimate_threshold = 1
+        # Без COUNT(*): PostgreSQL - pg_class, SQLite - проверка наличия sqlite_stat1 и чтение статистики.
+        with self.assertNumQueries(1 if connection.vendor == 'postgresql' else 2):
+            self.assertEqual(paginator.count, 3)
+
+        march = Appointment.objects.filter(appointment_date__gte=self.dates[1]).order_by('id')
+        filtered = EstimatedCountPaginator(march, 100)
+        filtered.estimate_threshold = 1
+        self.assertEqual(filtered.count, 2)
@@ -0,0 +1,102 @@
+import json
+from datetime import timedelta
+from typing import Any, Dict
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+
+from accounts.factories import AccountFactory
+
+from vetclinics.caches import invalidate_animal_type_catalogue
+from vetclinics.factories import AnimalTypeFactory, AppointmentFactory, generate_valid_appointment_date
+from vetclinics.models import Appointment
+
+
+class VetclinicsAsyncAPITests(TestCase):
+    """
+    Тесты async-версий API ветклиники: ответы совпадают с sync-версиями.
+    """
+
+    def setUp(self) -> None:
+        """
+        Установка тестовых данных и сброс кешей, оставшихся от других тестов.
+        """
+        cache.clear()
+        invalidate_animal_type_catalogue()
+        self.account = AccountFactory()
+        self.animal_type = AnimalTypeFactory()
+        self.appointment = AppointmentFactory()
+
+    async def test_animal_types(self) -> None:
+        """
+        Проверяет справочник видов животных, заголовки ETag и Last-Modified и ответ 304.
+        """
+        sync_response = await self.async_client.get(reverse('vetclinics:animal-types'))
+        response = await self.async_client.get(reverse('vetclinics-async:animal-types'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), sync_response.json())
+        self.assertEqual(response['ETag'], sync_response['ETag'])
+        self.assertEqual(response['Last-Modified'], sync_response['Last-Modified'])
+
+        not_modified = await self.async_client.get(reverse('vetclinics-async:animal-types'),
+                                                   headers={'If-None-Match': response['ETag']})
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_free_slots(self) -> None:
+        """
+        Проверяет свободные слоты, постраничную выдачу и ошибки параметров.
+        """
+        day = timezone.localtime(self.appointment.appointment_date).date()
+        params: Dict[str, Any] = {'date_from': f'{day:%d.%m.%Y}', 'date_to': f'{day + timedelta(days=2):%d.%m.%Y}',
+                                  'animal_type': self.appointment.animal_type_id, 'limit': 5, 'page': 2}
+        sync_response = await self.async_client.get(reverse('vetclinics:free-slots'), params)
+        response = await self.async_client.get(reverse('vetclinics-async:free-slots'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), sync_response.json())
+        self.assertEqual(response['X-Total-Count'], sync_response['X-Total-Count'])
+
+        response = await self.async_client.get(reverse('vetclinics-async:free-slots'), {'date_from': 'завтра'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('date_from', response.json())
+
+    async def test_make_an_appointment(self) -> None:
+        """
+        Проверяет запись на прием, занятый слот, ошибки проверки данных и некорректный JSON.
+        """
+        url: str = reverse('vetclinics-async:make-an-appointment')
+        data: Dict[str, Any] = {
+            'client': self.account.id,
+            'appointment_date': generate_valid_appointment_date().strftime('%d.%m.%Y %H:%M'),
+            'animal_type': self.animal_type.id,
+        }
+        response = await self.async_client.post(url, data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json(), 'Запись на прием произошла успешно')
+        self.assertTrue(await Appointment.objects.filter(client=self.account).aexists())
+
+        sync_response = await self.async_client.post(reverse('vetclinics:make-an-appointment'), data,
+                                                     content_type='application/json')
+        response = await self.async_client.post(url, data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), sync_response.json())
+
+        response = await self.async_client.post(url, {**data, 'client': 0}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), 'Аккаунт с указанным ID не существует')
+
+        response = await self.async_client.post(url, '{', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual((await self.async_client.get(url)).status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_response_encoding(self) -> None:
+        """
+        Проверяет, что кириллица в ответе не экранируется, как в JSONRenderer DRF.
+        """
+        response = await self.async_client.post(reverse('vetclinics-async:make-an-appointment'), {},
+                                                content_type='application/json')
+        self.assertNotIn(b'\\u', response.content)
+        self.assertEqual(json.loads(response.content), response.json())
@@ -0,0 +1,103 @@
+from datetime import date, datetime, timedelta
+from typing import List
+from zoneinfo import ZoneInfo
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from vetclinics.availability import SLOTS_PER_DAY, Availability, aware_local, is_working_slot, slot_index
+from vetclinics.formats import format_datetime, format_slots
+
+
+class AvailabilityTests(SimpleTestCase):
+    """
+    Тесты движка доступности слотов на битовых масках.
+    """
+
+    def setUp(self) -> None:
+        """
+        Установка часового пояса клиники и первого дня расчета.
+        """
+        self.tz = timezone.get_current_timezone()
+        self.day: date = date(2024, 3, 25)
+
+    def local(self, hour: int, minute: int = 0) -> datetime:
+        return datetime(self.day.year, self.day.month, self.day.day, hour, minute, tzinfo=self.tz)
+
+    def test_slot_index(self) -> None:
+        """
+        Проверяет номер слота и проверку рабочего времени.
+        """
+        self.assertEqual(slot_index(self.local(9)), 18)
+        self.assertEqual(slot_index(self.local(17, 30)), 35)
+        self.assertIsNone(slot_index(self.local(10, 15)))
+        self.assertTrue(is_working_slot(self.local(9)))
+        self.assertTrue(is_working_slot(self.local(17, 30)))
+        self.assertFalse(is_working_slot(self.local(18)))
+        self.assertFalse(is_working_slot(self.local(8, 30)))
+
+    def test_free_slots_match_legacy_algorithm(self) -> None:
+        """
+        Проверяет, что движок выдает те же слоты, что и прежний перебор с шагом 30 минут.
+        """
+        start: datetime = self.local(0)
+        end: datetime = start + timedelta(days=7)
+        busy: List[datetime] = [self.local(9), self.local(13, 30), self.local(13, 30), self.local(10, 15),
+                                self.local(17, 30) + timedelta(days=3)]
+
+        expected: List[datetime] = []
+        current: datetime = start
+        while current < end:
+            if 9 <= current.hour < 18 and current not in busy:
+                expected.append(current)
+            current += timedelta(minutes=30)
+
+        availability = Availability(self.tz)
+        availability.mark_busy_many(busy)
+        self.assertEqual(list(availability.free_slots(start.date(), end.date())), expected)
+        self.assertFalse(availability.is_free(self.local(13, 30)))
+        self.assertTrue(availability.is_free(self.local(14)))
+
+    def test_free_slots_not_before(self) -> None:
+        """
+        Проверяет, что слоты в прошлом относительно переданного момента пропускаются.
+        """
+        availability = Availability(self.tz)
+        slots: List[datetime] = list(availability.free_slots(self.day, self.day + timedelta(days=1),
+                                                             not_before=self.local(17, 1)))
+        self.assertEqual(slots, [self.local(17, 30)])
+
+    def test_iter_free_slots_formatting(self) -> None:
+        """
+        Проверяет, что номера слотов с таблицей времени дают те же строки, что и форматирование datetime.
+        """
+        availability = Availability(self.tz)
+        availability.mark_busy(self.local(12))
+        end: date = self.day + timedelta(days=3)
+        not_before: datetime = self.local(11, 59)
+        self.assertEqual(list(format_slots(availability.iter_free_slots(self.day, end, not_before))),
+                         [format_datetime(slot) for slot in availability.free_slots(self.day, end, not_before)])
+
+    def test_offset_changes(self) -> None:
+        """
+        Проверяет слоты круглосуточной клиники в дни перевода часов: несуществующее время пропускается,
+        повторяющееся выдается один раз, прошедшие слоты отсекаются по реальному моменту.
+        """
+        tz = ZoneInfo('Europe/Berlin')
+        availability = Availability(tz, working_mask=(1 << SLOTS_PER_DAY) - 1)
+        spring, autumn = date(2024, 3, 31), date(2024, 10, 27)
+
+        slots: List[datetime] = list(availability.free_slots(spring, spring + timedelta(days=1)))
+        self.assertEqual(len(slots), SLOTS_PER_DAY - 2)
+        self.assertEqual((slots[3].hour, slots[4].hour), (1, 3))
+        not_before = datetime(2024, 3, 31, 1, 45, tzinfo=tz)
+        first: datetime = next(availability.free_slots(spring, spring + timedelta(days=1), not_before))
+        self.assertEqual((first.hour, first.minute), (3, 0))
+        self.assertEqual(availability.count_free(spring, spring + timedelta(days=1), not_before), 42)
+        with self.assertRaises(ValueError):
+            aware_local(datetime(2024, 3, 31, 2, 30), tz)
+
+        self.assertEqual(availability.count_free(autumn, autumn + timedelta(days=1)), SLOTS_PER_DAY)
+        not_before = datetime(2024, 10, 27, 2, 15, tzinfo=tz)
+        first = next(availability.free_slots(autumn, autumn + timedelta(days=1), not_before))
+        self.assertEqual((first.hour, first.minute), (2, 30))
@@ -0,0 +1,111 @@
+from datetime import timedelta
+from typing import Any, Dict, List
+from unittest import mock
+
+from django.db import IntegrityError, OperationalError
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from accounts.factories import AccountFactory
+
+from vetclinics.models import Appointment
+from vetclinics.occupancy import SlotCapacityError
+from vetclinics.factories import AppointmentFactory, AnimalTypeFactory, generate_valid_appointment_date
+from vetclinics.schedule import get_schedule
+
+
+class AppointmentBatchAPIViewTests(APITestCase):
+    """
+    Тесты для проверки пакетной записи на прием.
+    """
+
+    def setUp(self) -> None:
+        """
+        Установка тестовых данных с помощью фабрик и входа сотрудника клиники.
+        """
+        self.client.force_authenticate(AccountFactory(is_staff=True))
+        self.api_url = reverse('vetclinics:appointments-batch')
+        self.account = AccountFactory()
+        self.cat = AnimalTypeFactory()
+        self.dog = AnimalTypeFactory()
+        self.slot = generate_valid_appointment_date()
+
+    def item(self, slot=None, **kwargs) -> Dict[str, Any]:
+        return {
+            'client': self.account.id,
+            'appointment_date': (slot or self.slot).strftime('%d.%m.%Y %H:%M'),
+            'animal_type': self.cat.id,
+            **kwargs,
+        }
+
+    def test_batch_is_created_with_constant_number_of_queries(self) -> None:
+        """
+        Проверка, что пачка создается фиксированным числом запросов независимо от ее размера.
+        """
+        items: List[Dict[str, Any]] = [
+            self.item(self.slot - timedelta(minutes=30 * number), animal_type=animal_type.id)
+            for number in range(10) for animal_type in (self.cat, self.dog)
+        ]
+        # Точка сохранения, клиенты, виды животных, занятость слотов, INSERT, обновление и проверка
+        # занятости слотов, освобождение точки сохранения. Расписание клиники уже скомпилировано.
+        get_schedule()
+        with self.assertNumQueries(8):
+            response = self.client.post(self.api_url, items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([result['index'] for result in response.data], list(range(20)))
+        self.assertEqual(Appointment.objects.filter(client=self.account).count(), 20)
+        self.assertTrue(Appointment.objects.filter(id=response.data[0]['id'], animal_type=self.cat).exists())
+
+    def test_batch_with_errors(self) -> None:
+        """
+        Проверка результатов по каждой записи: ошибочные записи не мешают созданию остальных.
+        """
+        AppointmentFactory(client=self.account, animal_type=self.dog, appointment_date=self.slot)
+        items: List[Any] = [
+            self.item(),
+            self.item(),
+            self.item(animal_type=self.dog.id),
+            self.item(client=999999),
+            {**self.item(), 'appointment_date': '25.03.2024 10:15'},
+            'не запись',
+        ]
+        response = self.client.post(self.api_url, items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([result['status'] for result in response.data], [201, 400, 400, 400, 400, 400])
+        self.assertEqual(response.data[1]['errors'], 'Выбранный слот уже занят')
+        self.assertEqual(response.data[2]['errors'], 'Выбранный слот уже занят')
+        self.assertEqual(response.data[3]['errors'], 'Аккаунт с указанным ID не существует')
+        self.assertIn('appointment_date', response.data[4]['errors'])
+        self.assertEqual(Appointment.objects.filter(client=self.account).count(), 2)
+
+        for data in ([], {'client': self.account.id}, [self.item()] * 501):
+            response = self.client.post(self.api_url, data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_requires_staff(self) -> None:
+        """
+        Проверка, что пакетная запись недоступна анонимным пользователям и клиентам, не являющимся сотрудниками.
+        """
+        self.client.force_authenticate(None)
+        response = self.client.post(self.api_url, [self.item()], format='json')
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        self.client.force_authenticate(self.account)
+        response = self.client.post(self.api_url, [self.item()], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Appointment.objects.exists())
+
+    def test_batch_retries_exhausted(self) -> None:
+        """
+        Проверка ответа, если пачку не удалось создать за все повторные попытки: 409 при заполнении слотов
+        параллельными записями и 503 при конфликтах блокировок.
+        """
+        for error, expected_status in ((SlotCapacityError([]), status.HTTP_409_CONFLICT),
+                                       (IntegrityError(), status.HTTP_409_CONFLICT),
+                                       (OperationalError(), status.HTTP_503_SERVICE_UNAVAILABLE)):
+            with mock.patch('vetclinics.api.views.book_appointments', side_effect=error):
+                response = self.client.post(self.api_url, [self.item()], format='json')
+            self.assertEqual(response.status_code, expected_status)
@@ -0,0 +1,112 @@
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.factories import AccountFactory
+
+from vetclinics.caches import invalidate_schedule
+from vetclinics.factories import AnimalTypeFactory, ClinicScheduleFactory, generate_valid_appointment_date
+from vetclinics.models import Holiday, ScheduleBreak, SlotCapacity
+from vetclinics.schedule import CompiledSchedule, get_schedule, starts_mask
+from vetclinics.services import SlotAlreadyTakenError, book_appointment
+
+
+class ClinicScheduleTests(TestCase):
+    """
+    Тесты расписания клиники: компиляция правил, сброс при изменении, проверка записи и свободные слоты.
+    """
+
+    def setUp(self) -> None:
+        """
+        Установка расписания: будни 09:00-18:00 с перерывом 13:00-14:00, вместимость слота 1, для кошек - 2.
+        """
+        cache.clear()
+        self.tz = timezone.get_current_timezone()
+        self.cat = AnimalTypeFactory()
+        self.dog = AnimalTypeFactory()
+        self.schedule = ClinicScheduleFactory(working_hours=range(5))
+        ScheduleBreak.objects.create(schedule=self.schedule, starts_at=time(13), ends_at=time(14))
+        SlotCapacity.objects.create(schedule=self.schedule, animal_type=self.cat, capacity=2)
+        today: date = timezone.localdate()
+        self.monday: date = today + timedelta(days=7 - today.weekday())
+
+    def tearDown(self) -> None:
+        """
+        Сброс скомпилированного расписания: изменения правил откатываются вместе с транзакцией теста.
+        """
+        invalidate_schedule()
+
+    def local(self, day: date, hour: int, minute: int = 0) -> datetime:
+        return datetime.combine(day, time(hour, minute), tzinfo=self.tz)
+
+    def test_starts_mask(self) -> None:
+        """
+        Проверяет начала приемов: прием целиком в часах работы, после перерыва отсчет от его конца.
+        """
+        self.assertEqual(starts_mask((9 * 60, 12 * 60), [], 30), sum(1 << index for index in range(18, 24)))
+        self.assertEqual(starts_mask((9 * 60, 12 * 60), [(10 * 60, 10 * 60 + 30)], 60),
+                         (1 << 18) | (1 << 21))
+        self.assertEqual(starts_mask((9 * 60, 9 * 60 + 30), [], 60), 0)
+
+    def test_compiled_schedule(self) -> None:
+        """
+        Проверяет таблицы скомпилированного расписания и перекомпиляцию после изменения правил.
+        """
+        schedule: CompiledSchedule = get_schedule()
+        self.assertTrue(schedule.is_working_slot(self.local(self.monday, 12, 30)))
+        self.assertFalse(schedule.is_working_slot(self.local(self.monday, 13, 30)))
+        self.assertFalse(schedule.is_working_slot(self.local(self.monday + timedelta(days=5), 10)))
+        self.assertEqual(schedule.hours(self.monday), '09:00-18:00, перерыв 13:00-14:00')
+        self.assertEqual((schedule.capacity(self.cat.id), schedule.capacity(self.dog.id)), (2, 1))
+        self.assertIs(get_schedule(), schedule)
+
+        first: datetime = generate_valid_appointment_date()
+        self.assertEqual((first.weekday() < 5, first.hour, first.minute), (True, 17, 30))
+        Holiday.objects.create(schedule=self.schedule, day=first.date())
+        self.assertEqual(get_schedule().working_mask(first.date()), 0)
+        self.assertGreater(generate_valid_appointment_date(), first)
+
+    def test_booking_by_schedule(self) -> None:
+        """
+        Проверяет запись на прием по расписанию: выходной день, перерыв и вместимость слота по видам животных.
+        """
+        url: str = reverse('vetclinics:make-an-appointment')
+        account = AccountFactory()
+
+        def post(day: date, hour: int, animal_type) -> Any:
+            data: Dict[str, Any] = {'client': account.id, 'animal_type': animal_type.id,
+                                    'appointment_date': f'{day:%d.%m.%Y} {hour:02d}:00'}
+            return self.client.post(url, data, format='json')
+
+        response = post(self.monday + timedelta(days=6), 10, self.cat)
+        self.assertEqual(response.data['appointment_date'], ['В этот день клиника не работает'])
+        response = post(self.monday, 13, self.cat)
+        self.assertIn('перерыв 13:00-14:00', response.data['appointment_date'][0])
+
+        self.assertEqual([post(self.monday, 10, self.cat).status_code for _ in range(3)], [201, 201, 400])
+        self.assertEqual([post(self.monday, 10, self.dog).status_code for _ in range(2)], [201, 400])
+        with self.assertRaises(SlotAlreadyTakenError):
+            book_appointment(account.id, self.local(self.monday, 10), self.cat.id)
+
+    def test_free_slots_by_schedule(self) -> None:
+        """
+        Проверяет, что свободные слоты учитывают перерыв, выходные и заполнение вместимости слота.
+        """
+        account = AccountFactory()
+        book_appointment(account.id, self.local(self.monday, 10), self.cat.id)
+        url: str = reverse('vetclinics:free-slots')
+        params: Dict[str, Any] = {'date_from': f'{self.monday:%d.%m.%Y}',
+                                  'date_to': f'{self.monday + timedelta(days=6):%d.%m.%Y}'}
+
+        slots = self.client.get(url, {**params, 'animal_type': self.cat.id}).data
+        self.assertEqual(len(slots), 5 * 16)
+        self.assertIn(f'{self.monday:%d.%m.%Y} 10:00', slots)
+        self.assertNotIn(f'{self.monday:%d.%m.%Y} 13:30', slots)
+
+        book_appointment(account.id, self.local(self.monday, 10), self.cat.id)
+        slots = self.client.get(url, {**params, 'animal_type': self.cat.id}).data
+        self.assertNotIn(f'{self.monday:%d.%m.%Y} 10:00', slots)
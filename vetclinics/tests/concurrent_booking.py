@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List
+
+from django.db import connection
+from django.test import TransactionTestCase
+
+from accounts.factories import AccountFactory
+from vetclinics.factories import AnimalTypeFactory, generate_valid_appointment_date
+from vetclinics.models import Appointment
+from vetclinics.services import SlotAlreadyTakenError, book_appointment
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """
+    Нагрузочный тест записи на прием: параллельные запросы на один и тот же слот.
+    """
+
+    BOOKINGS: int = 200
+    WORKERS: int = 16
+    # SQLite блокирует таблицу целиком и не ждет освобождения блокировки, поэтому повторов нужно больше,
+    # чем достаточно для PostgreSQL.
+    RETRIES: int = 12
+
+    def setUp(self) -> None:
+        """
+        Установка тестовых данных с помощью фабрик.
+        """
+        self.accounts = AccountFactory.create_batch(self.WORKERS)
+        self.animal_type = AnimalTypeFactory()
+        self.appointment_date: datetime = generate_valid_appointment_date()
+
+    def book(self, number: int) -> str:
+        """
+        Пытается записать клиента на общий слот в отдельном потоке со своим соединением с БД.
+        """
+        try:
+            book_appointment(self.accounts[number % self.WORKERS].id, self.appointment_date, self.animal_type.id,
+                             retries=self.RETRIES)
+            return 'booked'
+        except SlotAlreadyTakenError:
+            return 'taken'
+        finally:
+            connection.close()
+
+    def test_only_one_booking_wins(self) -> None:
+        """
+        Проверяет, что из сотен параллельных записей на один слот успешна ровно одна.
+        """
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as executor:
+            results: List[str] = list(executor.map(self.book, range(self.BOOKINGS)))
+
+        self.assertEqual(results.count('booked'), 1)
+        self.assertEqual(results.count('taken'), self.BOOKINGS - 1)
+        self.assertEqual(Appointment.objects.filter(appointment_date=self.appointment_date,
+                                                    animal_type=self.animal_type).count(), 1)
@@ -9,6 +9,7 @@ from accounts.factories import AccountFactory
 
 from vetclinics.models import Appointment
 from vetclinics.factories import AppointmentFactory, AnimalTypeFactory, generate_valid_appointment_date
+from vetclinics.services import SlotAlreadyTakenError, book_appointment
 
 
 class AppointmentAPIViewTests(APITestCase):
@@ -46,3 +47,21 @@ class AppointmentAPIViewTests(APITestCase):
         self.assertEqual(valid_response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(invalid_response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertTrue(Appointment.objects.filter(id=self.appointment.id).exists())
+
+    def test_create_appointment_on_cancelled_slot(self) -> None:
+        """
+        Проверка, что неактивная (отмененная) запись не занимает слот, а активная заполняет его вместимость.
+        """
+        self.appointment.is_active = False
+        self.appointment.save()
+        data: Dict[str, Any] = {
+            'client': self.account.id,
+            'appointment_date': self.appointment.appointment_date.strftime('%d.%m.%Y %H:%M'),
+            'animal_type': self.appointment.animal_type_id,
+        }
+
+        response = self.client.post(self.api_url_make_an_appointment, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        with self.assertRaises(SlotAlreadyTakenError):
+            book_appointment(self.account.id, self.appointment.appointment_date, self.appointment.animal_type_id)
+        self.assertEqual(Appointment.objects.filter(appointment_date=self.appointment.appointment_date).count(), 2)
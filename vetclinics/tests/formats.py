@@ -0,0 +1,66 @@
+import random
+from datetime import datetime, timedelta
+from typing import Callable, List, Union
+
+from django.test import SimpleTestCase
+
+from vetclinics.formats import DATETIME_FORMAT, format_datetime, parse_datetime
+
+
+def outcome(func: Callable[[str], datetime], value: str) -> Union[datetime, type]:
+    """ Результат разбора или тип исключения. """
+    try:
+        return func(value)
+    except Exception as e:
+        return type(e)
+
+
+class DateTimeFormatTests(SimpleTestCase):
+    """
+    Тесты разбора и форматирования даты и времени на совпадение с strptime/strftime на случайных данных.
+    """
+
+    def setUp(self) -> None:
+        """
+        Установка генератора случайных чисел с фиксированным зерном.
+        """
+        self.rng = random.Random(20240325)
+
+    def random_datetime(self) -> datetime:
+        return datetime(1000, 1, 1) + timedelta(minutes=self.rng.randrange(8999 * 365 * 24 * 60))
+
+    def mutate(self, value: str) -> str:
+        """ Портит строку: замена, удаление или вставка символа, в том числе не-ASCII цифры. """
+        position: int = self.rng.randrange(len(value) + 1)
+        char: str = self.rng.choice('0123456789 .:-+_x٣\t')
+        action: int = self.rng.randrange(3)
+        if action == 0:
+            return value[:position] + char + value[position + 1:]
+        if action == 1:
+            return value[:position] + value[position + 1:]
+        return value[:position] + char + value[position:]
+
+    def test_format_matches_strftime(self) -> None:
+        """
+        Проверяет, что форматирование совпадает со strftime для дат 1000-9999 годов.
+        """
+        for _ in range(5000):
+            value: datetime = self.random_datetime()
+            self.assertEqual(format_datetime(value), value.strftime(DATETIME_FORMAT))
+
+    def test_parse_matches_strptime(self) -> None:
+        """
+        Проверяет, что разбор корректных, нестрогих и испорченных строк совпадает со strptime,
+        включая тип ошибки.
+        """
+        values: List[str] = ['31.12.2024 23:59', '29.02.2023 10:00', '1.3.2024 9:00', '01.03.2024  09:00',
+                             '00.01.2024 10:00', '01.13.2024 10:00', '01.01.2024 24:00', '01.01.0000 10:00', '']
+        for _ in range(5000):
+            value: str = self.random_datetime().strftime(DATETIME_FORMAT)
+            values.append(value)
+            for _ in range(self.rng.randrange(1, 3)):
+                value = self.mutate(value)
+            values.append(value)
+        for value in values:
+            expected: Union[datetime, type] = outcome(lambda s: datetime.strptime(s, DATETIME_FORMAT), value)
+            self.assertEqual(outcome(parse_datetime, value), expected, value)
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+
+from accounts.factories import AccountFactory
+
+from vetclinics.caches import busy_slots_counters
+from vetclinics.factories import AnimalTypeFactory, AppointmentFactory, generate_valid_appointment_date
+from vetclinics.occupancy import rebuild_occupancy
+from vetclinics.models import Appointment
+
+
+class FreeSlotsCacheTests(APITestCase):
+    """
+    Тесты кеша занятых слотов для свободных слотов.
+    """
+
+    def setUp(self) -> None:
+        """
+        Установка вида животного, слота завтра в 17:30 и пустого кеша.
+        """
+        cache.clear()
+        busy_slots_counters.reset()
+        self.url: str = reverse('vetclinics:free-slots')
+        self.cat = AnimalTypeFactory()
+        self.slot = generate_valid_appointment_date()
+        day: str = self.slot.strftime('%d.%m.%Y')
+        self.params = {'date_from': day, 'date_to': day, 'animal_type': self.cat.id}
+        self.formatted_slot: str = self.slot.strftime('%d.%m.%Y %H:%M')
+
+    def test_cache_hit_and_invalidation(self) -> None:
+        """
+        Проверка, что повторный запрос обслуживается кешем, а запись на прием и ее отмена сбрасывают кеш дня.
+        """
+        with self.assertNumQueries(1):
+            self.assertIn(self.formatted_slot, self.client.get(self.url, self.params).data)
+        with self.assertNumQueries(0):
+            self.assertIn(self.formatted_slot, self.client.get(self.url, self.params).data)
+        self.assertEqual(busy_slots_counters.as_dict(), {'hits': 1, 'misses': 1})
+
+        appointment = AppointmentFactory(animal_type=self.cat, appointment_date=self.slot)
+        self.assertNotIn(self.formatted_slot, self.client.get(self.url, self.params).data)
+        self.assertNotIn(self.formatted_slot, self.client.get(self.url, {'date_from': self.params['date_from'],
+                                                                         'date_to': self.params['date_to']}).data)
+
+        appointment.is_active = False
+        appointment.save()
+        self.assertIn(self.formatted_slot, self.client.get(self.url, self.params).data)
+
+    def test_admin_form_and_rebuild_invalidate_cache(self) -> None:
+        """
+        Проверка сброса кеша при записи через админ-панель и при пересчете занятости.
+        """
+        self.client.get(self.url, self.params)
+        self.client.force_login(get_user_model().objects.create_superuser(username='admin', password=None))
+        response = self.client.post(reverse('admin:vetclinics_appointment_add'), {
+            'client': AccountFactory().id,
+            'animal_type': self.cat.id,
+            'appointment_date_0': self.slot.strftime('%d.%m.%Y'),
+            'appointment_date_1': self.slot.strftime('%H:%M'),
+            'is_active': 'on',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn(self.formatted_slot, self.client.get(self.url, self.params).data)
+
+        Appointment.objects.update(appointment_date=self.slot - timedelta(minutes=30))
+        rebuild_occupancy()
+        data = self.client.get(self.url, self.params).data
+        self.assertIn(self.formatted_slot, data)
+        self.assertNotIn((self.slot - timedelta(minutes=30)).strftime('%d.%m.%Y %H:%M'), data)
@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.response import Response
+
+from vetclinics.caches import invalidate_animal_type_catalogue
+from vetclinics.factories import AnimalTypeFactory
+
+
+class AnimalTypeAPIViewTests(APITestCase):
+    """
+    Тесты для проверки функционала API для получения справочника видов животных.
+    """
+
+    def setUp(self) -> None:
+        """
+        Установка эндпойнта и сброс кеша справочника, оставшегося от других тестов.
+        """
+        self.api_url_animal_types: str = reverse('vetclinics:animal-types')
+        cache.clear()
+        invalidate_animal_type_catalogue()
+        self.animal_type = AnimalTypeFactory()
+
+    def test_get_animal_types_not_modified(self) -> None:
+        """
+        Проверяет выдачу ETag и ответ 304 без обращения к БД при совпадении If-None-Match.
+        """
+        response: Response = self.client.get(self.api_url_animal_types)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data], [self.animal_type.id])
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(0):
+            not_modified: Response = self.client.get(self.api_url_animal_types,
+                                                     HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_get_animal_types_invalidation(self) -> None:
+        """
+        Проверяет сброс кеша и смену ETag после изменения и удаления вида животного.
+        """
+        response: Response = self.client.get(self.api_url_animal_types)
+
+        self.animal_type.name = 'Хомяк'
+        self.animal_type.save()
+        renamed: Response = self.client.get(self.api_url_animal_types, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(renamed.status_code, status.HTTP_200_OK)
+        self.assertEqual(renamed.data[0]['name'], 'Хомяк')
+        self.assertNotEqual(renamed['ETag'], response['ETag'])
+
+        self.animal_type.delete()
+        deleted: Response = self.client.get(self.api_url_animal_types, HTTP_IF_NONE_MATCH=renamed['ETag'])
+        self.assertEqual(deleted.status_code, status.HTTP_200_OK)
+        self.assertEqual(deleted.data, [])
@@ -1,10 +1,13 @@
+from typing import Any, Dict
+
+from django.core.cache import cache
 from django.urls import reverse
 
 from rest_framework.test import APITestCase
 from rest_framework import status
 from rest_framework.response import Response
 
-from vetclinics.factories import AppointmentFactory
+from vetclinics.factories import AppointmentFactory, AnimalTypeFactory
 
 
 class FreeSlotsAPIViewTests(APITestCase):
@@ -17,6 +20,7 @@ class FreeSlotsAPIViewTests(APITestCase):
         Уставнока эндпойнта для тестов.
         """
         self.api_url_free_slots: str = reverse('vetclinics:free-slots')
+        cache.clear()
 
     def test_get_free_slots(self) -> None:
         """
@@ -27,3 +31,47 @@ class FreeSlotsAPIViewTests(APITestCase):
         response: Response = self.client.get(self.api_url_free_slots)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(len(response.data) > 0)
+
+    def test_get_free_slots_for_animal_type(self) -> None:
+        """
+        Проверяет, что слот занят только для вида животного, на который есть запись.
+        """
+        appointment = AppointmentFactory()
+        other_animal_type = AnimalTypeFactory()
+        slot: str = appointment.appointment_date.strftime('%d.%m.%Y %H:%M')
+        params: Dict[str, Any] = {
+            'date_from': appointment.appointment_date.strftime('%d.%m.%Y'),
+            'date_to': appointment.appointment_date.strftime('%d.%m.%Y'),
+        }
+
+        busy_response: Response = self.client.get(
+            self.api_url_free_slots, {**params, 'animal_type': appointment.animal_type_id}
+        )
+        free_response: Response = self.client.get(
+            self.api_url_free_slots, {**params, 'animal_type': other_animal_type.id}
+        )
+        self.assertEqual(busy_response.status_code, status.HTTP_200_OK)
+        self.assertNotIn(slot, busy_response.data)
+        self.assertIn(slot, free_response.data)
+        self.assertEqual(len(free_response.data), len(busy_response.data) + 1)
+
+    def test_get_free_slots_pagination(self) -> None:
+        """
+        Проверяет постраничную выдачу и заголовок с общим количеством слотов.
+        """
+        response: Response = self.client.get(self.api_url_free_slots)
+        first_page: Response = self.client.get(self.api_url_free_slots, {'limit': 5})
+        second_page: Response = self.client.get(self.api_url_free_slots, {'limit': 5, 'page': 2})
+
+        self.assertEqual(first_page.data, response.data[:5])
+        self.assertEqual(second_page.data, response.data[5:10])
+        self.assertEqual(first_page['X-Total-Count'], str(len(response.data)))
+
+    def test_get_free_slots_invalid_period(self) -> None:
+        """
+        Проверяет ошибку при некорректном периоде.
+        """
+        response: Response = self.client.get(
+            self.api_url_free_slots, {'date_from': '10.03.2024', 'date_to': '01.03.2024'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
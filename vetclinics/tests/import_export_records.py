@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from typing import List
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.factories import AccountFactory
+from accounts.models import Account
+
+from vetclinics.factories import AnimalTypeFactory, generate_valid_appointment_date
+from vetclinics.models import Appointment
+
+
+class ImportExportRecordsTests(TestCase):
+    """
+    Тесты команд потоковой загрузки и выгрузки клиентов и записей на прием.
+    """
+
+    def setUp(self) -> None:
+        """
+        Установка тестовых данных и временного каталога для файлов.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory: str = directory.name
+        self.animal_type = AnimalTypeFactory()
+        self.slot: str = generate_valid_appointment_date().strftime('%d.%m.%Y %H:%M')
+
+    def write(self, name: str, content: str) -> str:
+        path: str = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def call(self, *args: str) -> str:
+        stdout, stderr = StringIO(), StringIO()
+        call_command(*args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue()
+
+    def test_import_accounts_and_appointments(self) -> None:
+        """
+        Проверяет загрузку пачками и отклонение строк, не проходящих правила записи на прием.
+        """
+        accounts: str = self.write('accounts.csv', (
+            'id,first_name,last_name,phone,telegram_chat_id\n'
+            '501,Иван,Иванов,+79000000001,\n'
+            ',Петр,Петров,+79000000002,123\n'
+            ',Без,Телефона\n'
+        ))
+        output: str = self.call('import_records', 'accounts', accounts, '--batch-size', '2')
+        self.assertIn('загружено: 2, отклонено: 1', output)
+        self.assertTrue(Account.objects.filter(id=501, first_name='Иван').exists())
+        self.assertGreater(AccountFactory().id, Account.objects.get(first_name='Петр').id)
+
+        rows: List[dict] = [
+            {'id': 900, 'client': 501, 'appointment_date': self.slot, 'animal_type': self.animal_type.id},
+            {'client': 501, 'appointment_date': self.slot, 'animal_type': self.animal_type.id},
+            {'client': 501, 'appointment_date': self.slot, 'animal_type': self.animal_type.id, 'is_active': False},
+            {'client': 501, 'appointment_date': '01.01.2020 10:00', 'animal_type': self.animal_type.id},
+            {'client': 501, 'appointment_date': self.slot.replace(':30', ':15'), 'animal_type': self.animal_type.id},
+            {'client': 999, 'appointment_date': self.slot, 'animal_type': self.animal_type.id},
+        ]
+        appointments: str = self.write('appointments.jsonl', '\n'.join(json.dumps(row) for row in rows) + '\n{\n')
+        rejects: str = os.path.join(self.directory, 'rejects.jsonl')
+        output = self.call('import_records', 'appointments', appointments, '--batch-size', '4', '--rejects', rejects)
+        self.assertIn('Прочитано строк: 7, загружено: 2, отклонено: 5', output)
+        self.assertEqual(Appointment.objects.filter(is_active=True).count(), 1)
+        self.assertEqual(Appointment.objects.get(id=900).client_id, 501)
+        with open(rejects, encoding='utf-8') as file:
+            errors = [json.loads(line)['errors'] for line in file]
+        self.assertIn({'appointment_date': 'Выбранный слот уже занят'}, errors)
+
+        output = self.call('import_records', 'appointments', appointments, '--allow-past')
+        self.assertIn('загружено: 2,', output)
+        self.assertTrue(Appointment.objects.filter(appointment_date__lt=timezone.now()).exists())
+
+    def test_export_import_roundtrip(self) -> None:
+        """
+        Проверяет, что выгруженный файл загружается обратно в пустую БД без потерь.
+        """
+        client = AccountFactory(telegram_chat_id='42')
+        Appointment.objects.create(client=client, animal_type=self.animal_type,
+                                   appointment_date=generate_valid_appointment_date())
+        accounts: str = os.path.join(self.directory, 'accounts.jsonl')
+        appointments: str = os.path.join(self.directory, 'appointments.csv')
+        self.assertIn('Выгружено строк: 1', self.call('export_records', 'accounts', accounts))
+        self.call('export_records', 'appointments', appointments, '--chunk-size', '1')
+        expected = list(Appointment.objects.values_list('id', 'client_id', 'appointment_date', 'animal_type_id'))
+
+        Account.objects.all().delete()
+        self.call('import_records', 'accounts', accounts)
+        self.call('import_records', 'appointments', appointments)
+
+        self.assertEqual(Account.objects.get(id=client.id).telegram_chat_id, '42')
+        self.assertEqual(
+            list(Appointment.objects.values_list('id', 'client_id', 'appointment_date', 'animal_type_id')), expected
+        )
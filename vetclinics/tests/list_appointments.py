@@ -0,0 +1,85 @@
+from datetime import timedelta
+from typing import List
+
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from accounts.factories import AccountFactory
+
+from vetclinics.models import Appointment
+from vetclinics.factories import AnimalTypeFactory
+
+
+class AppointmentListAPIViewTests(APITestCase):
+    """
+    Тесты для проверки списка записей на прием с keyset-пагинацией.
+    """
+
+    def setUp(self) -> None:
+        """
+        Установка тестовых данных: 15 слотов по 2 записи (разные виды животных на одно время),
+        вход сотрудника клиники.
+        """
+        self.client.force_authenticate(AccountFactory(is_staff=True))
+        self.api_url = reverse('vetclinics:appointments')
+        self.clients = [AccountFactory(), AccountFactory()]
+        self.animal_types = [AnimalTypeFactory(), AnimalTypeFactory()]
+        start = timezone.localtime().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        Appointment.objects.bulk_create([
+            Appointment(client=self.clients[number % 2], animal_type=animal_type,
+                        appointment_date=start + timedelta(minutes=30 * number))
+            for number in range(15) for animal_type in self.animal_types
+        ])
+        self.day = start.strftime('%d.%m.%Y')
+
+    def fetch_all(self, url: str, pages_expected: int) -> List[dict]:
+        results: List[dict] = []
+        for _ in range(pages_expected):
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            results += response.data['results']
+            url = response.data['next']
+        self.assertIsNone(url)
+        return results
+
+    def test_keyset_pagination(self) -> None:
+        """
+        Проверка, что страницы выбираются одним запросом и вместе дают все записи по порядку без повторов.
+        """
+        results = self.fetch_all(f'{self.api_url}?limit=7', pages_expected=5)
+        expected = list(Appointment.objects.order_by('appointment_date', 'id').values_list('id', flat=True))
+        self.assertEqual([result['id'] for result in results], expected)
+        self.assertEqual(results[0]['appointment_date'], f'{self.day} 09:00')
+        self.assertEqual(results[0]['client_name'], self.clients[0].get_full_name())
+        self.assertEqual(results[0]['animal_type_name'], self.animal_types[0].name)
+
+    def test_filters(self) -> None:
+        """
+        Проверка фильтров по клиенту, виду животного и периоду.
+        """
+        url = f'{self.api_url}?client={self.clients[1].id}&animal_type={self.animal_types[0].id}&limit=5'
+        results = self.fetch_all(url, pages_expected=2)
+        self.assertEqual(len(results), 7)
+        self.assertTrue(all(result['client'] == self.clients[1].id for result in results))
+
+        response = self.client.get(self.api_url, {'date_from': self.day, 'date_to': self.day, 'is_active': 'false'})
+        self.assertEqual(response.data['results'], [])
+
+        for params in ({'cursor': 'не курсор'}, {'date_from': self.day, 'date_to': '01.01.2020'}, {'limit': 0}):
+            response = self.client.get(self.api_url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_requires_staff(self) -> None:
+        """
+        Проверка, что список недоступен анонимным пользователям и клиентам, не являющимся сотрудниками.
+        """
+        self.client.force_authenticate(None)
+        self.assertIn(self.client.get(self.api_url).status_code,
+                      (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        self.client.force_authenticate(self.clients[0])
+        response = self.client.get(self.api_url, {'client': self.clients[0].id})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
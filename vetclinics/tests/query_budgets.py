@@ -0,0 +1,84 @@
+from datetime import timedelta
+from typing import Any, Dict
+
+import factory
+
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.factories import AccountFactory
+from divanru_vetclinic.testing import QueryBudgetMixin, dataset_sizes
+
+from vetclinics.factories import AnimalTypeFactory, AppointmentFactory, generate_working_slots
+from vetclinics.models import AnimalType
+
+DATASET_SIZES = (10, 300, 1000)
+
+
+class VetclinicsQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """
+    Бюджеты SQL-запросов и времени API ветклиники на разных объемах записей на прием:
+    количество запросов не должно зависеть от объема данных, а время - расти быстрее него.
+    """
+
+    def setUp(self) -> None:
+        """
+        Установка клиента и двух видов животных.
+        """
+        self.account = AccountFactory()
+        self.cat = AnimalTypeFactory()
+        self.dog = AnimalTypeFactory()
+
+    def populate(self, size: int) -> None:
+        """
+        Создает size записей на прием: по слотам расписания подряд, попеременно для двух видов животных.
+        """
+        slots = generate_working_slots(-(-size // 2))
+        AppointmentFactory.create_batch(
+            size, client=self.account,
+            appointment_date=factory.Iterator(slot for slot in slots for _ in range(2)),
+            animal_type=factory.Iterator([self.cat, self.dog]),
+        )
+
+    @dataset_sizes(*DATASET_SIZES)
+    def test_free_slots(self, size: int) -> None:
+        """
+        Свободные слоты за 60 дней с холодным и прогретым кешем занятости слотов.
+        """
+        self.populate(size)
+        today = timezone.localdate()
+        params: Dict[str, Any] = {'date_from': f'{today:%d.%m.%Y}', 'date_to': f'{today + timedelta(days=59):%d.%m.%Y}',
+                                  'animal_type': self.cat.id}
+        with self.assertQueryBudget(queries=1, seconds=0.5):
+            response = self.client.get(reverse('vetclinics:free-slots'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertQueryBudget(queries=0, seconds=0.25):
+            self.client.get(reverse('vetclinics:free-slots'), params)
+
+    @dataset_sizes(*DATASET_SIZES)
+    def test_make_an_appointment(self, size: int) -> None:
+        """
+        Запись на прием в свободный слот после size занятых.
+        """
+        self.populate(size)
+        slot = generate_working_slots(size + 1)[-1]
+        data: Dict[str, Any] = {'client': self.account.id, 'appointment_date': slot.strftime('%d.%m.%Y %H:%M'),
+                                'animal_type': self.cat.id}
+        with self.assertQueryBudget(queries=5, seconds=0.5):
+            response = self.client.post(reverse('vetclinics:make-an-appointment'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @dataset_sizes(*DATASET_SIZES)
+    def test_animal_types(self, size: int) -> None:
+        """
+        Справочник видов животных: при холодном кеше - из БД, при прогретом и для 304 - без запросов.
+        """
+        self.populate(size)
+        with self.assertQueryBudget(queries=2, seconds=0.5):
+            response = self.client.get(reverse('vetclinics:animal-types'))
+        self.assertEqual(len(response.data), AnimalType.objects.count())
+        with self.assertQueryBudget(queries=0, seconds=0.25):
+            self.client.get(reverse('vetclinics:animal-types'), HTTP_IF_NONE_MATCH=response['ETag'])
@@ -0,0 +1,129 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from contextlib import closing
+from datetime import date
+from unittest import skipUnless
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+
+from accounts.factories import AccountFactory
+from accounts.models import Account
+from divanru_vetclinic.db_routers import (REPLICA_DATABASE_ALIAS, read_from_replica, replica_cache_timeout,
+                                          use_replica)
+
+from vetclinics.factories import AnimalTypeFactory, generate_valid_appointment_date
+from vetclinics.models import Appointment, SlotOccupancy
+
+
+@skipUnless(settings.DATABASES[DEFAULT_DB_ALIAS]['ENGINE'] == 'django.db.backends.sqlite3'
+            and REPLICA_DATABASE_ALIAS not in settings.DATABASES,
+            'Реплику заменяет вторая БД SQLite: нужна основная БД SQLite без настроенной реплики')
+class ReadReplicaTests(TestCase):
+    """
+    Тесты маршрутизации чтения на реплику. Реплику заменяет вторая БД SQLite - копия основной БД SQLite
+    на момент запуска тестов класса: данные, созданные в тесте, на нее не попадают, как при отставании реплики.
+    Реплика подключается после настройки TestCase и в его транзакцию не входит, поэтому перед каждым тестом
+    восстанавливается из исходной копии.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Копирование основной БД во временный файл и подключение реплики.
+        """
+        super().setUpClass()
+        cls.replica_dir: str = tempfile.mkdtemp()
+        cls.snapshot: str = os.path.join(cls.replica_dir, 'snapshot.sqlite3')
+        connections[DEFAULT_DB_ALIAS].ensure_connection()
+        with closing(sqlite3.connect(cls.snapshot)) as snapshot:
+            connections[DEFAULT_DB_ALIAS].connection.backup(snapshot)
+        connections.settings[REPLICA_DATABASE_ALIAS] = connections.configure_settings({
+            DEFAULT_DB_ALIAS: {},
+            REPLICA_DATABASE_ALIAS: {'ENGINE': 'django.db.backends.sqlite3',
+                                     'NAME': os.path.join(cls.replica_dir, 'replica.sqlite3')},
+        })[REPLICA_DATABASE_ALIAS]
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        connections[REPLICA_DATABASE_ALIAS].close()
+        del connections[REPLICA_DATABASE_ALIAS]
+        del connections.settings[REPLICA_DATABASE_ALIAS]
+        shutil.rmtree(cls.replica_dir)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        """
+        Восстановление реплики, установка клиента и вида животного в основной БД и сброс кеша.
+        """
+        connections[REPLICA_DATABASE_ALIAS].close()
+        shutil.copyfile(self.snapshot, connections[REPLICA_DATABASE_ALIAS].settings_dict['NAME'])
+        cache.clear()
+        self.account = AccountFactory()
+        self.animal_type = AnimalTypeFactory()
+
+    def test_router(self) -> None:
+        """
+        Проверяет, что чтение уходит на реплику только внутри use_replica, а запись - всегда в основную БД.
+        """
+        self.assertEqual(router.db_for_read(Account), DEFAULT_DB_ALIAS)
+        with use_replica():
+            self.assertEqual(router.db_for_read(Account), REPLICA_DATABASE_ALIAS)
+            self.assertEqual(router.db_for_write(Account), DEFAULT_DB_ALIAS)
+            self.assertEqual(replica_cache_timeout(None), replica_cache_timeout(24 * 60 * 60))
+            self.assertFalse(Account.objects.filter(id=self.account.id).exists())
+        self.assertEqual(replica_cache_timeout(None), None)
+        self.assertTrue(Account.objects.filter(id=self.account.id).exists())
+
+        @read_from_replica
+        async def read() -> bool:
+            return await Account.objects.filter(id=self.account.id).aexists()
+
+        self.assertFalse(async_to_sync(read)())
+
+    def test_user_detail(self) -> None:
+        """
+        Проверяет, что клиент по ID читается с реплики в sync- и async-версиях API.
+        """
+        for url_name in ('accounts:user-detail', 'accounts-async:user-detail'):
+            url: str = reverse(url_name, args=[self.account.id])
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.account.save(using=REPLICA_DATABASE_ALIAS)
+        for url_name in ('accounts:user-detail', 'accounts-async:user-detail'):
+            url = reverse(url_name, args=[self.account.id])
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_free_slots_and_booking(self) -> None:
+        """
+        Проверяет, что запись на прием идет в основную БД, а свободные слоты читаются с реплики.
+        """
+        appointment_date = generate_valid_appointment_date()
+        response = self.client.post(reverse('vetclinics:make-an-appointment'), {
+            'client': self.account.id,
+            'appointment_date': appointment_date.strftime('%d.%m.%Y %H:%M'),
+            'animal_type': self.animal_type.id,
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Appointment.objects.filter(client=self.account).exists())
+        self.assertFalse(Appointment.objects.using(REPLICA_DATABASE_ALIAS).exists())
+
+        day: date = timezone.localtime(appointment_date).date()
+        slot: str = appointment_date.strftime('%d.%m.%Y %H:%M')
+        params = {'date_from': f'{day:%d.%m.%Y}', 'date_to': f'{day:%d.%m.%Y}', 'animal_type': self.animal_type.id}
+        for url_name in ('vetclinics:free-slots', 'vetclinics-async:free-slots'):
+            cache.clear()
+            self.assertIn(slot, self.client.get(reverse(url_name), params).json())
+
+        self.animal_type.save(using=REPLICA_DATABASE_ALIAS)
+        SlotOccupancy.objects.get(animal_type=self.animal_type).save(using=REPLICA_DATABASE_ALIAS)
+        cache.clear()
+        self.assertNotIn(slot, self.client.get(reverse('vetclinics:free-slots'), params).json())
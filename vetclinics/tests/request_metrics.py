@@ -0,0 +1,129 @@
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+
+from accounts.factories import AccountFactory
+from divanru_vetclinic.middleware import (Histogram, mark_process_dead, process_snapshot_path, registry,
+                                         write_snapshot)
+
+from vetclinics.caches import busy_slots_counters
+from vetclinics.factories import AnimalTypeFactory
+
+
+class RequestMetricsTests(TestCase):
+    """
+    Тесты метрик запросов: заголовок Server-Timing, гистограммы по маршрутам и выключение настройкой.
+    """
+
+    def setUp(self) -> None:
+        """
+        Сброс накопленных метрик и кеша.
+        """
+        registry.reset()
+        cache.clear()
+        self.account = AccountFactory()
+
+    @override_settings(REQUEST_METRICS=True)
+    def test_server_timing(self) -> None:
+        """
+        Проверяет количество SQL-запросов, время отрисовки и общее время в заголовке Server-Timing.
+        """
+        response = self.client.get(reverse('accounts:user-detail', args=[self.account.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(response['Server-Timing'],
+                         r'^db;dur=[\d.]+;desc="1 queries", render;dur=[\d.]+, total;dur=[\d.]+$')
+
+    @override_settings(REQUEST_METRICS=True)
+    def test_metrics(self) -> None:
+        """
+        Проверяет гистограммы по маршрутам и счетчики кеша свободных слотов в /metrics.
+        """
+        AnimalTypeFactory()
+        for _ in range(2):
+            self.client.get(reverse('accounts:user-detail', args=[self.account.id]))
+        self.client.get(reverse('vetclinics:free-slots'))
+        self.client.get('/not-found/')
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics: str = response.content.decode()
+        user_labels: str = 'method="GET",route="api/accounts/users/<int:user_id>/"'
+        self.assertIn(f'http_request_db_queries_count{{{user_labels}}} 2', metrics)
+        self.assertIn(f'http_request_db_queries_bucket{{{user_labels},le="1"}} 2', metrics)
+        self.assertIn(f'http_request_db_queries_sum{{{user_labels}}} 2', metrics)
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="<unmatched>"} 1', metrics)
+        self.assertRegex(metrics, r'vetclinics_busy_slots_cache_requests_total\{result="miss"\} [1-9]')
+        self.assertIn('http_response_size_bytes_count{method="GET",route="api/vetclinics/free-slots/"} 1', metrics)
+
+    @override_settings(REQUEST_METRICS=True)
+    async def test_async_view(self) -> None:
+        """
+        Проверяет заголовок Server-Timing и гистограммы async-представлений.
+        """
+        response = await self.async_client.get(reverse('accounts-async:user-detail', args=[self.account.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('total;dur=', response['Server-Timing'])
+        self.assertIn('route="api/async/accounts/users/<int:user_id>/"', '\n'.join(registry.render()))
+
+    @override_settings(REQUEST_METRICS=True, METRICS_ALLOWED_IPS=['10.0.0.0/8'])
+    def test_metrics_access(self) -> None:
+        """
+        Проверяет, что /metrics отдается только адресам из METRICS_ALLOWED_IPS и сотрудникам.
+        """
+        url: str = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='10.1.2.3').status_code, status.HTTP_200_OK)
+        self.client.force_login(self.account)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_login(AccountFactory(is_staff=True))
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    @override_settings(REQUEST_METRICS=True)
+    def test_metrics_of_all_processes(self) -> None:
+        """
+        Проверяет, что /metrics отдает сумму метрик всех процессов из METRICS_DIR, включая архив
+        завершившихся процессов.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        route: str = '["http_request_db_queries", "GET", "api/accounts/users/<int:user_id>/"]'
+        other_worker = {'histograms': {route: [[0, 3] + [0] * 9, 3, 3]},
+                        'counters': {'vetclinics_busy_slots_cache_requests_total{result="hit"}': 5}}
+        busy_slots_counters.reset()
+        write_snapshot(process_snapshot_path(directory.name, 1), other_worker)
+        write_snapshot(process_snapshot_path(directory.name, 2), other_worker)
+        mark_process_dead(2, directory.name)
+        self.assertEqual(sorted(os.listdir(directory.name)), ['archive.json', 'process-1.json'])
+
+        with self.settings(METRICS_DIR=directory.name):
+            self.client.get(reverse('accounts:user-detail', args=[self.account.id]))
+            metrics: str = self.client.get(reverse('metrics')).content.decode()
+        user_labels: str = 'method="GET",route="api/accounts/users/<int:user_id>/"'
+        self.assertIn(f'http_request_db_queries_count{{{user_labels}}} 7', metrics)
+        self.assertIn(f'http_request_db_queries_bucket{{{user_labels},le="1"}} 7', metrics)
+        self.assertIn(f'http_request_db_queries_sum{{{user_labels}}} 7', metrics)
+        self.assertIn('vetclinics_busy_slots_cache_requests_total{result="hit"} 10', metrics)
+        self.assertIn(f'process-{os.getpid()}.json', os.listdir(directory.name))
+
+    def test_disabled(self) -> None:
+        """
+        Проверяет, что выключенные метрики не добавляют заголовок и /metrics не отдается.
+        """
+        response = self.client.get(reverse('accounts:user-detail', args=[self.account.id]))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('_count{', '\n'.join(registry.render()))
+
+    def test_histogram(self) -> None:
+        """
+        Проверяет распределение наблюдений по корзинам: граница корзины включается в нее.
+        """
+        histogram = Histogram((1, 5))
+        for value in (0, 1, 3, 5, 8):
+            histogram.observe(value)
+        self.assertEqual((histogram.counts, histogram.sum, histogram.count), ([2, 2, 1], 17, 5))
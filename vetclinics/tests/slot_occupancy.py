@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta
+from io import StringIO
+from typing import Any, Dict, List, Tuple
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.factories import AccountFactory
+
+from vetclinics.factories import AnimalTypeFactory, generate_valid_appointment_date
+from vetclinics.models import Appointment, SlotOccupancy
+from vetclinics.occupancy import OccupancyKey, rebuild_occupancy
+from vetclinics.records import Accepted, AppointmentRecords, Reject, import_records
+from vetclinics.services import book_appointment, book_appointments
+
+
+class SlotOccupancyTests(TestCase):
+    """
+    Тесты предрасчитанной занятости слотов.
+    """
+
+    def setUp(self) -> None:
+        """
+        Установка клиента, двух видов животных и слота завтра в 17:30.
+        """
+        self.client_account = AccountFactory()
+        self.cat = AnimalTypeFactory()
+        self.dog = AnimalTypeFactory()
+        self.slot: datetime = generate_valid_appointment_date()
+        self.key: OccupancyKey = (self.cat.id, self.slot.date(), 35)
+        cache.clear()
+
+    def occupancy(self) -> Dict[OccupancyKey, int]:
+        return {(animal_type_id, day, slot): booked for animal_type_id, day, slot, booked in
+                SlotOccupancy.objects.filter(booked__gt=0).values_list('animal_type_id', 'day', 'slot', 'booked')}
+
+    def book(self, **kwargs) -> Appointment:
+        return book_appointment(**{'client_id': self.client_account.id, 'appointment_date': self.slot,
+                                   'animal_type_id': self.cat.id, **kwargs})
+
+    def test_signals(self) -> None:
+        """
+        Проверка, что сохранение, перенос, отмена и удаление записи меняют счетчики занятости.
+        """
+        appointment = self.book()
+        self.assertEqual(self.occupancy(), {self.key: 1})
+
+        appointment.appointment_date = self.slot - timedelta(minutes=30)
+        appointment.save()
+        self.assertEqual(self.occupancy(), {(self.cat.id, self.slot.date(), 34): 1})
+
+        # Запись загружена с отложенными полями, прежний слот дочитывается перед сохранением.
+        appointment = Appointment.objects.only('id').get(id=appointment.id)
+        appointment.is_active = False
+        appointment.save(update_fields=['is_active'])
+        self.assertEqual(self.occupancy(), {})
+
+        Appointment.objects.get(id=appointment.id).delete()
+        self.assertEqual(self.occupancy(), {})
+
+        appointment = self.book(animal_type_id=self.dog.id)
+        Appointment.objects.filter(id=appointment.id).delete()
+        self.assertEqual(self.occupancy(), {})
+
+        # Запись не по сетке слотов слот не занимает.
+        self.book(appointment_date=self.slot + timedelta(minutes=10))
+        self.assertEqual(self.occupancy(), {})
+
+    def test_bulk_paths(self) -> None:
+        """
+        Проверка занятости после пакетной записи и импорта, а также совпадения с полным пересчетом.
+        """
+        book_appointments([{'client': self.client_account.id, 'appointment_date': self.slot,
+                            'animal_type': animal_type.id} for animal_type in (self.cat, self.dog)])
+        rows = [(1, {'client': self.client_account.id, 'appointment_date': (self.slot - timedelta(hours=1))
+                     .strftime('%d.%m.%Y %H:%M'), 'animal_type': self.cat.id})]
+        import_records(AppointmentRecords(), rows)
+        expected: Dict[OccupancyKey, int] = {
+            self.key: 1, (self.dog.id, self.slot.date(), 35): 1, (self.cat.id, self.slot.date(), 33): 1,
+        }
+        self.assertEqual(self.occupancy(), expected)
+
+        # QuerySet.update() сигналы не отправляет, занятость восстанавливается пересчетом.
+        Appointment.objects.filter(animal_type=self.dog).update(is_active=False)
+        self.assertEqual(rebuild_occupancy(), 2)
+        del expected[self.dog.id, self.slot.date(), 35]
+        self.assertEqual(self.occupancy(), expected)
+
+        stdout = StringIO()
+        call_command('rebuild_slot_occupancy', '--date-from', self.slot.strftime('%d.%m.%Y'), stdout=stdout)
+        self.assertIn('Занятых слотов: 2', stdout.getvalue())
+        self.assertEqual(self.occupancy(), expected)
+
+    def test_free_slots_read_occupancy(self) -> None:
+        """
+        Проверка, что свободные слоты считаются одним запросом к таблице занятости.
+        """
+        self.book()
+        day: str = self.slot.strftime('%d.%m.%Y')
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('vetclinics:free-slots'),
+                                       {'date_from': day, 'date_to': day, 'animal_type': self.cat.id})
+        self.assertNotIn(self.slot.strftime('%d.%m.%Y %H:%M'), response.data)
+        self.assertIn((self.slot - timedelta(minutes=30)).strftime('%d.%m.%Y %H:%M'), response.data)
+
+    def test_import_race(self) -> None:
+        """
+        Проверка, что импорт не переполняет слот, который заняла запись, сделанная после проверки пачки:
+        пачка вставляется построчно, а строка на заполненный слот отклоняется.
+        """
+        test = self
+
+        class RacingRecords(AppointmentRecords):
+            def build(self, batch: List[Tuple[int, Any]]) -> Tuple[Accepted, List[Reject]]:
+                result = super().build(batch)
+                test.book()
+                return result
+
+        day: str = self.slot.strftime('%d.%m.%Y')
+        rows = [(1, {'client': self.client_account.id, 'appointment_date': f'{day} {self.slot:%H:%M}',
+                     'animal_type': self.cat.id}),
+                (2, {'client': self.client_account.id, 'appointment_date': f'{day} {self.slot:%H:%M}',
+                     'animal_type': self.dog.id})]
+        rejects: List[Reject] = []
+        stats = import_records(RacingRecords(), rows, on_reject=rejects.append)
+        self.assertEqual((stats.imported, stats.rejected), (1, 1))
+        self.assertEqual(rejects[0].errors, {'appointment_date': 'Выбранный слот уже занят'})
+        self.assertEqual(self.occupancy(), {self.key: 1, (self.dog.id, self.slot.date(), 35): 1})
+        self.assertEqual(Appointment.objects.count(), 2)
+
+    def test_admin_race(self) -> None:
+        """
+        Проверка, что сохранение в админ-панели занимает слот с учетом вместимости, даже если проверка формы
+        прочитала занятость до параллельной записи, а перенос записи переносит ее занятость.
+        """
+        self.client.force_login(AccountFactory(is_staff=True, is_superuser=True))
+        data: Dict[str, Any] = {'client': self.client_account.id, 'animal_type': self.cat.id, 'is_active': 'on',
+                                'appointment_date_0': self.slot.strftime('%d.%m.%Y'),
+                                'appointment_date_1': self.slot.strftime('%H:%M')}
+        url: str = reverse('admin:vetclinics_appointment_add')
+        self.book()
+        with mock.patch('vetclinics.forms.occupancy_counts', return_value={}):
+            response = self.client.post(url, data, follow=True)
+        self.assertEqual(response.redirect_chain, [(url, 302)])
+        self.assertContains(response, 'Выбранный слот уже занят')
+        self.assertEqual(Appointment.objects.count(), 1)
+        self.assertEqual(self.occupancy(), {self.key: 1})
+
+        earlier: datetime = self.slot - timedelta(minutes=30)
+        response = self.client.post(url, {**data, 'appointment_date_1': earlier.strftime('%H:%M')})
+        self.assertEqual(response.status_code, 302)
+        appointment = Appointment.objects.get(appointment_date=earlier)
+        change_url: str = reverse('admin:vetclinics_appointment_change', args=[appointment.id])
+        response = self.client.post(change_url, {**data, 'appointment_date_1': (earlier - timedelta(minutes=30))
+                                                 .strftime('%H:%M')})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.occupancy(), {self.key: 1, (self.cat.id, self.slot.date(), 33): 1})